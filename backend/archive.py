@@ -0,0 +1,255 @@
+import logging
+import os
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import bson
+from bson import Binary
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database import DatabaseManager, decode_cursor, encode_cursor
+from executors import run_threaded
+from models import Match, MatchSummary
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+# Running totals kept for archived matches, per subject
+TEAM_TOTALS = ("total_matches", "wins", "draws", "losses", "goals_scored", "goals_conceded")
+USER_TOTALS = (
+    "total_matches", "total_wins", "total_draws", "total_losses", "total_goals_scored", "total_goals_conceded",
+    "total_goals", "total_assists", "total_cards",
+)
+
+
+class ArchiveConfig:
+    """Match archival settings, read from .env
+
+    ARCHIVE_AFTER_DAYS           completed matches older than this move to the archive
+    ARCHIVE_BATCH_SIZE           most matches per compressed archive segment
+    ARCHIVE_SEGMENT_MAX_BYTES    most BSON bytes of matches per segment (a segment document must stay under 16MB)
+    ARCHIVE_COMPRESSION_LEVEL    zlib level for segments
+    """
+
+    def __init__(self):
+        self.after_days = float(os.environ.get("ARCHIVE_AFTER_DAYS", "180"))
+        self.batch_size = int(os.environ.get("ARCHIVE_BATCH_SIZE", "1000"))
+        self.segment_max_bytes = int(os.environ.get("ARCHIVE_SEGMENT_MAX_BYTES", str(8 * 1024 * 1024)))
+        self.compression_level = int(os.environ.get("ARCHIVE_COMPRESSION_LEVEL", "6"))
+
+
+def _team_result(scored: int, conceded: int) -> Dict[str, int]:
+    return {
+        "total_matches": 1, "wins": int(scored > conceded), "draws": int(scored == conceded),
+        "losses": int(scored < conceded), "goals_scored": scored, "goals_conceded": conceded,
+    }
+
+
+def segment_totals(matches: List[dict]) -> List[Dict[str, Any]]:
+    """What a batch of matches adds to each team's and user's archived totals
+
+    Teams count like get_team_stats; users count as the home side, like the
+    statistics backfill, plus the per-match statistics get_user_match_totals sums.
+    """
+    totals: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def add(subject_type: str, subject_id: str, values: Dict[str, int]):
+        current = totals.setdefault((subject_type, subject_id), dict.fromkeys(TEAM_TOTALS if subject_type == "team" else USER_TOTALS, 0))
+        for key, value in values.items():
+            current[key] += value
+
+    for match in matches:
+        home, away = match["home_score"], match["away_score"]
+        add("team", match["home_team_id"], _team_result(home, away))
+        add("team", match["away_team_id"], _team_result(away, home))
+        if match.get("player_id"):
+            statistics = match.get("statistics") or {}
+            add("user", match["player_id"], {
+                "total_matches": 1, "total_wins": int(home > away), "total_draws": int(home == away),
+                "total_losses": int(home < away), "total_goals_scored": home, "total_goals_conceded": away,
+                "total_goals": statistics.get("goals_scored", 0), "total_assists": statistics.get("assists", 0),
+                "total_cards": statistics.get("cards", 0),
+            })
+    return [{"subject_type": key[0], "subject_id": key[1], "values": values} for key, values in totals.items()]
+
+
+def pack_segment(matches: List[dict], max_bytes: int, level: int) -> Tuple[int, bytes]:
+    """How many of the matches (at least one) fit in max_bytes of BSON, and those matches compressed"""
+    count = size = 0
+    for match in matches:
+        size += len(bson.encode(match))
+        if count and size > max_bytes:
+            break
+        count += 1
+    return count, zlib.compress(bson.encode({"matches": matches[:count]}), level)
+
+
+class MatchArchive:
+    """Moves old completed matches out of `matches` into compressed segments
+
+    A segment (`match_archive`) holds one batch of match documents as zlib'd
+    BSON, cut at ARCHIVE_SEGMENT_MAX_BYTES so it stays under MongoDB's
+    document limit, plus the ids of the teams and players in it so archive
+    reads only open segments that matter. The batch's effect on standings
+    and stats is added to `archived_totals`, which the stats queries merge
+    with the (now bounded) hot collection.
+
+    Each batch runs in steps that are safe to repeat: the segment is written
+    as pending first, totals are applied at most once per segment (guarded by
+    its sequence number), the hot copies are deleted, then the segment is
+    sealed. A crashed run resumes the pending segment.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, config: Optional[ArchiveConfig] = None):
+        self.db_manager = db_manager
+        self.config = config or ArchiveConfig()
+
+    @property
+    def db(self):
+        return self.db_manager.db
+
+    async def ensure_indexes(self):
+        await self.db.match_archive.create_index("seq", unique=True)
+        await self.db.match_archive.create_index("match_ids")
+        await self.db.match_archive.create_index([("team_ids", ASCENDING), ("to_created_at", DESCENDING)])
+        await self.db.match_archive.create_index([("player_ids", ASCENDING), ("to_created_at", DESCENDING)])
+        await self.db.archived_totals.create_index([("subject_type", ASCENDING), ("subject_id", ASCENDING)], unique=True)
+        await self.db.matches.create_index([("completed", ASCENDING), ("created_at", ASCENDING)])
+
+    async def archive(self, older_than_days: Optional[float] = None, progress=None) -> Dict[str, int]:
+        """Archive every completed match older than the cutoff, one segment at a time"""
+        days = self.config.after_days if older_than_days is None else older_than_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        archived = segments = 0
+        while True:
+            count = await self.archive_batch(cutoff)
+            if not count:
+                break
+            archived += count
+            segments += 1
+            if progress:
+                await progress(min(0.99, 0.05 * segments), f"Archived {archived} matches in {segments} segments")
+        if archived:
+            logger.info(f"Archived {archived} matches older than {days:g} days in {segments} segments")
+        return {"archived": archived, "segments": segments}
+
+    async def archive_batch(self, cutoff: datetime) -> int:
+        segment = await self.db.match_archive.find_one({"state": "pending"})
+        if segment is None:
+            matches = await self.db.matches.find(
+                {"completed": True, "created_at": {"$lt": cutoff}}, {"_id": 0}
+            ).sort([("created_at", ASCENDING), ("id", ASCENDING)]).limit(self.config.batch_size).to_list(length=None)
+            if not matches:
+                return 0
+            last = await self.db.match_archive.find_one({}, {"seq": 1}, sort=[("seq", DESCENDING)])
+            segment = await self._build_segment(matches, (last["seq"] + 1) if last else 1)
+            # The unique seq index turns a concurrent archiver's duplicate segment into an error here
+            await self.db.match_archive.insert_one(segment)
+
+        await self._apply_totals(segment)
+        await self.db.matches.delete_many({"id": {"$in": segment["match_ids"]}})
+        await self.db.match_archive.update_one(
+            {"id": segment["id"]}, {"$set": {"state": "sealed", "sealed_at": datetime.utcnow()}}
+        )
+        return segment["count"]
+
+    async def _build_segment(self, matches: List[dict], seq: int) -> Dict[str, Any]:
+        count, blob = await run_threaded(pack_segment, matches, self.config.segment_max_bytes, self.config.compression_level)
+        matches = matches[:count]
+        return {
+            "id": str(uuid.uuid4()),
+            "seq": seq,
+            "state": "pending",
+            "count": len(matches),
+            "match_ids": [match["id"] for match in matches],
+            "team_ids": sorted({team for match in matches for team in (match["home_team_id"], match["away_team_id"])}),
+            "player_ids": sorted({player for match in matches for player in (match.get("player_id"), match.get("away_player_id")) if player}),
+            "from_created_at": matches[0]["created_at"],
+            "to_created_at": matches[-1]["created_at"],
+            "totals": segment_totals(matches),
+            "blob": Binary(blob),
+            "created_at": datetime.utcnow(),
+        }
+
+    async def _apply_totals(self, segment: Dict[str, Any]):
+        operations = [
+            UpdateOne(
+                {"subject_type": total["subject_type"], "subject_id": total["subject_id"], "applied_through": {"$lt": segment["seq"]}},
+                {"$inc": total["values"], "$set": {"applied_through": segment["seq"]}},
+                upsert=True
+            )
+            for total in segment["totals"]
+        ]
+        if not operations:
+            return
+        try:
+            await self.db.archived_totals.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Subjects this segment was already applied to fail the filter, and the upsert then hits the unique index
+            if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+
+    async def _segment_matches(self, segment: Dict[str, Any]) -> List[dict]:
+        raw = await run_threaded(zlib.decompress, segment["blob"])
+        return bson.decode(raw)["matches"]
+
+    async def iter_matches(self, projection: Optional[List[str]] = None) -> AsyncIterator[dict]:
+        """Every archived match, oldest segment first"""
+        cursor = self.db.match_archive.find({"state": "sealed"}, {"blob": 1}).sort("seq", ASCENDING)
+        async for segment in cursor:
+            for match in await self._segment_matches(segment):
+                yield {key: match[key] for key in projection if key in match} if projection else match
+
+    async def find(
+        self,
+        team_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Newest-first archived match summaries (projected dicts) for a team or user, with a cursor like get_match_page"""
+        query: Dict[str, Any] = {"state": "sealed"}
+        if team_id:
+            query["team_ids"] = team_id
+        if user_id:
+            query["player_ids"] = user_id
+        before = decode_cursor(cursor) if cursor else None
+        if before:
+            query["from_created_at"] = {"$lte": before[0]}
+
+        found: List[dict] = []
+        newest_first = lambda match: (match["created_at"], match["id"])
+        segments = self.db.match_archive.find(query, {"blob": 1, "to_created_at": 1}).sort("to_created_at", DESCENDING)
+        async for segment in segments:
+            if len(found) > limit:
+                found.sort(key=newest_first, reverse=True)
+                # Nothing in this or any later segment is newer than what the page already holds
+                if segment["to_created_at"] < found[limit]["created_at"]:
+                    break
+            for match in await self._segment_matches(segment):
+                if team_id and team_id not in (match["home_team_id"], match["away_team_id"]):
+                    continue
+                if user_id and user_id not in (match.get("player_id"), match.get("away_player_id")):
+                    continue
+                if before and (match["created_at"], match["id"]) >= before:
+                    continue
+                found.append(match)
+        found.sort(key=newest_first, reverse=True)
+        next_cursor = None
+        if len(found) > limit:
+            found = found[:limit]
+            next_cursor = encode_cursor(found[-1]["created_at"], found[-1]["id"])
+        return [{field: match[field] for field in MatchSummary.model_fields if field in match} for match in found], next_cursor
+
+    async def get_match(self, match_id: str) -> Optional[Match]:
+        segment = await self.db.match_archive.find_one({"match_ids": match_id, "state": "sealed"}, {"blob": 1})
+        if segment is None:
+            return None
+        for match in await self._segment_matches(segment):
+            if match["id"] == match_id:
+                return Match(**self.db_manager._unpack_events(match))
+        return None
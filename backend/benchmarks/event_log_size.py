@@ -0,0 +1,93 @@
+"""Event log size report
+
+Builds a synthetic 90-minute event log (positional events from 22 players)
+and compares how big it is stored the way match_events used to be (a BSON
+list of dicts) against the columnar binary log from event_codec, with and
+without zlib, plus encode and decode times. Prints JSON.
+
+    cd backend
+    python benchmarks/event_log_size.py
+    python benchmarks/event_log_size.py --events 5000 --runs 20
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import bson
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from event_codec import EventLog, decode_events, encode_events  # noqa: E402
+from live import EVENT_TYPES  # noqa: E402
+
+# Most of a match log is positional chatter; goals and cards are rare
+EVENT_WEIGHTS = {"shot": 8, "save": 4, "foul": 6, "corner": 3, "offside": 2, "goal": 1, "yellow_card": 1, "substitution": 1}
+
+
+def synthetic_log(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    players = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(22)]
+    types = [event_type for event_type in EVENT_TYPES if event_type in EVENT_WEIGHTS]
+    weights = [EVENT_WEIGHTS[event_type] for event_type in types]
+    events = []
+    for row in range(count):
+        event_type = rng.choices(types, weights)[0]
+        events.append({
+            "event_type": event_type,
+            "game_time": round(90 * row / count, 2),
+            "position": [round(rng.uniform(-52.5, 52.5), 2), round(rng.uniform(-34, 34), 2), round(rng.uniform(0, 2), 2)],
+            "player_id": rng.choice(players),
+            "description": "Goal!" if event_type == "goal" else "",
+        })
+    return events
+
+
+def median_ms(call: Callable[[], Any], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def run(count: int, runs: int) -> Dict[str, Any]:
+    events = synthetic_log(count)
+    dict_list = len(bson.encode({"match_events": events}))
+    report: Dict[str, Any] = {
+        "events": count,
+        "bson_dict_list_bytes": dict_list,
+        "json_dict_list_bytes": len(json.dumps(events)),
+        "codec": {},
+    }
+    for level in (0, 6):
+        blob = encode_events(events, level)
+        stored = len(bson.encode({"events_blob": bson.Binary(blob), "match_events": []}))
+        report["codec"][f"zlib_{level}"] = {
+            "bson_bytes": stored,
+            "ratio": round(dict_list / stored, 1),
+            "encode_ms": median_ms(lambda: encode_events(events, level), runs),
+            "decode_all_ms": median_ms(lambda: decode_events(blob), runs),
+            "first_100_ms": median_ms(lambda: list(EventLog(blob).iter(0, 100)), runs),
+        }
+    report["bson_dict_list_decode_ms"] = median_ms(lambda: bson.decode(bson.encode({"match_events": events})), runs)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Football Master event log size report")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.events, args.runs), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Worker cold-start report
+
+Measures what a fresh uvicorn worker pays before serving: `python -X importtime`
+for `import server` (total and the heaviest modules) and the startup phases
+(import, connect, cache, seed) recorded in server.startup_timings. Each run is a
+fresh interpreter; medians over --runs are reported as JSON.
+
+    cd backend
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --seed --runs 3
+    python benchmarks/import_time.py --update-baseline
+
+Exits with status 1 if import or startup time regresses past --tolerance
+against benchmarks/import_baseline.json, or if a module listed in
+HEAVY_MODULES is loaded by a worker that starts against a seeded database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+DEFAULT_BASELINE = BENCH_DIR / "import_baseline.json"
+
+# Must only ever be imported on demand by the feature that needs them
+HEAVY_MODULES = ("numpy", "pandas", "boto3", "mongomock_motor")
+# The benchmark connects to the in-memory stand-in, so startup legitimately loads it
+STANDIN_MODULES = ("mongomock_motor",)
+# Phases this short are dominated by scheduler noise; ignore smaller absolute changes
+MIN_REGRESSION_MS = 25.0
+
+_STARTUP_SCRIPT = """
+import asyncio, json, sys
+import server
+async def main():
+    await server.app.router.startup()
+    await server.app.router.shutdown()
+asyncio.run(main())
+print(json.dumps({
+    "timings": server.startup_timings,
+    "heavy_imported": sorted(name for name in %r if name in sys.modules),
+}))
+"""
+
+
+def _environment(seed: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongomock://")
+    env.setdefault("DB_NAME", "football_master_bench")
+    env["SEED_ON_STARTUP"] = "true" if seed else "false"
+    return env
+
+
+def measure_imports(env: Dict[str, str]) -> Dict[str, Any]:
+    """Run `python -X importtime -c 'import server'` and parse its report (µs)"""
+    probe = f"import sys, server; print(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    modules: List[Dict[str, Any]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    server_entry = next(module for module in modules if module["module"] == "server")
+    return {
+        "total_us": server_entry["cumulative_us"],
+        "module_count": len(modules),
+        "top_self": sorted(modules, key=lambda module: module["self_us"], reverse=True)[:15],
+        "heavy_imported": json.loads(result.stdout.strip().splitlines()[-1].replace("'", '"')),
+    }
+
+
+def measure_startup(env: Dict[str, str]) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SCRIPT % (tuple(name for name in HEAVY_MODULES if name not in STANDIN_MODULES),)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int, seed: bool) -> Dict[str, Any]:
+    env = _environment(seed)
+    imports = [measure_imports(env) for _ in range(runs)]
+    startups = [measure_startup(env) for _ in range(runs)]
+    phases = sorted({phase for startup in startups for phase in startup["timings"]})
+    return {
+        "import_total_ms": round(statistics.median(run["total_us"] for run in imports) / 1000, 2),
+        "module_count": imports[-1]["module_count"],
+        "top_self": imports[-1]["top_self"],
+        "startup_ms": {
+            phase: statistics.median(startup["timings"].get(phase, 0.0) for startup in startups)
+            for phase in phases
+        },
+        "heavy_imported": sorted(set(imports[-1]["heavy_imported"]) | set(startups[-1]["heavy_imported"])),
+    }
+
+
+def _regressed(previous: float, current: float, tolerance: float) -> bool:
+    return current > previous * (1 + tolerance) and current - previous > MIN_REGRESSION_MS
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    if _regressed(baseline["import_total_ms"], report["import_total_ms"], tolerance):
+        regressions.append(f"import server: {baseline['import_total_ms']}ms -> {report['import_total_ms']}ms")
+    for phase, previous in baseline.get("startup_ms", {}).items():
+        current = report["startup_ms"].get(phase)
+        if current is not None and _regressed(previous, current, tolerance):
+            regressions.append(f"startup phase {phase}: {previous}ms -> {current}ms")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Football Master worker cold-start report")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", action="store_true", help="Include the seed phase (fresh stand-in database)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.seed)
+    status = 0
+    # Seeding generates rosters and ratings, which is what numpy is for
+    if report["heavy_imported"] and not args.seed:
+        report["regressions"] = [f"heavy modules imported at startup: {', '.join(report['heavy_imported'])}"]
+        status = 1
+    if args.update_baseline and not status:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+    elif args.baseline.exists():
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        report["regressions"] = report.get("regressions", []) + regressions
+        status = 1 if report["regressions"] else status
+
+    print(json.dumps(report, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""Football Master API load test
+
+Runs the FastAPI app in-process against the mongomock stand-in (or a real
+MongoDB / running server), seeded by DatabaseManager.initialize_data, drives a
+weighted mix of realistic requests and reports RPS and latency percentiles per
+endpoint as JSON.
+
+    cd backend
+    python benchmarks/load_test.py --requests 2000 --concurrency 32
+    python benchmarks/load_test.py --update-baseline
+    python benchmarks/load_test.py --mongo-url mongodb://localhost:27017
+    python benchmarks/load_test.py --base-url http://localhost:8001
+    python benchmarks/load_test.py --extra-teams 2000   # large reproducible league
+
+Exits with status 1 when an endpoint regresses past --tolerance against
+benchmarks/baseline.json.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+class Fixtures:
+    """Ids discovered from the seeded catalog, shared by all scenarios"""
+
+    def __init__(self):
+        self.team_ids: List[str] = []
+        self.leagues: List[str] = []
+        self.stadium_ids: List[str] = []
+        self.open_matches: List[str] = []
+
+
+async def discover(http, fixtures: Fixtures) -> None:
+    teams = (await http.get("/api/teams", params={"limit": 100})).json()
+    fixtures.team_ids = [team["id"] for team in teams]
+    fixtures.leagues = (await http.get("/api/leagues")).json()["leagues"]
+    fixtures.stadium_ids = [stadium["id"] for stadium in (await http.get("/api/stadiums")).json()]
+
+
+# Each scenario issues one request and returns (endpoint label, response)
+async def get_teams(http, fixtures):
+    return "GET /api/teams", await http.get("/api/teams")
+
+
+async def get_team(http, fixtures):
+    team_id = random.choice(fixtures.team_ids)
+    return "GET /api/teams/{team_id}", await http.get(f"/api/teams/{team_id}")
+
+
+async def get_team_players(http, fixtures):
+    team_id = random.choice(fixtures.team_ids)
+    return "GET /api/teams/{team_id}/players", await http.get(f"/api/teams/{team_id}/players")
+
+
+async def get_stadiums(http, fixtures):
+    return "GET /api/stadiums", await http.get("/api/stadiums")
+
+
+async def get_achievements(http, fixtures):
+    return "GET /api/achievements", await http.get("/api/achievements")
+
+
+async def search_players(http, fixtures):
+    query = random.choice(["silva", "mar", "santos", "al", "ez"])
+    return "GET /api/search/players", await http.get("/api/search/players", params={"query": query})
+
+
+async def search_teams(http, fixtures):
+    query = random.choice(["madrid", "league", "england", "red"])
+    return "GET /api/search/teams", await http.get("/api/search/teams", params={"query": query})
+
+
+async def league_table(http, fixtures):
+    league = quote(random.choice(fixtures.leagues), safe="")
+    return "GET /api/leagues/{league}/table", await http.get(f"/api/leagues/{league}/table")
+
+
+async def create_match(http, fixtures):
+    home, away = random.sample(fixtures.team_ids, 2)
+    response = await http.post("/api/matches", json={
+        "home_team_id": home,
+        "away_team_id": away,
+        "stadium_id": random.choice(fixtures.stadium_ids) if fixtures.stadium_ids else "bench",
+        "game_mode": "quick_match",
+        "player_id": f"bench-user-{random.randint(1, 50)}",
+    })
+    if response.status_code == 200:
+        fixtures.open_matches.append(response.json()["match_id"])
+    return "POST /api/matches", response
+
+
+async def complete_match(http, fixtures):
+    if not fixtures.open_matches:
+        return await create_match(http, fixtures)
+    match_id = fixtures.open_matches.pop()
+    response = await http.put(f"/api/matches/{match_id}/complete", json={
+        "home_score": random.randint(0, 4),
+        "away_score": random.randint(0, 4),
+        "statistics": {"goals_scored": random.randint(0, 4), "assists": random.randint(0, 3), "cards": random.randint(0, 2)},
+        "events": [{"type": "goal", "minute": random.randint(1, 90)}],
+    })
+    return "PUT /api/matches/{match_id}/complete", response
+
+
+# Scenario mixes; weights are relative request frequencies
+MIXES = {
+    "default": [
+        (get_teams, 10), (get_team, 15), (get_team_players, 10), (get_stadiums, 5), (get_achievements, 5),
+        (search_players, 10), (search_teams, 5), (league_table, 10), (create_match, 8), (complete_match, 8),
+    ],
+    "catalog": [(get_teams, 30), (get_team, 40), (get_team_players, 20), (get_stadiums, 5), (get_achievements, 5)],
+    "search": [(search_players, 70), (search_teams, 30)],
+    "matches": [(create_match, 40), (complete_match, 40), (league_table, 20)],
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    endpoints = {}
+    for name in sorted(samples):
+        latencies = sorted(samples[name])
+        endpoints[name] = {
+            "count": len(latencies),
+            "errors": errors.get(name, 0),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        }
+    all_latencies = sorted(value for values in samples.values() for value in values)
+    return {
+        "endpoints": endpoints,
+        "total": {
+            "count": len(all_latencies),
+            "errors": sum(errors.values()),
+            "elapsed_s": round(elapsed, 3),
+            "rps": round(len(all_latencies) / elapsed, 2),
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(all_latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 3),
+        },
+    }
+
+
+async def drive(http, mix, total_requests: int, concurrency: int, duration: Optional[float]) -> Dict[str, Any]:
+    fixtures = Fixtures()
+    await discover(http, fixtures)
+
+    scenarios = [scenario for scenario, _ in mix]
+    weights = [weight for _, weight in mix]
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal issued
+        while (deadline is None and issued < total_requests) or (deadline is not None and time.perf_counter() < deadline):
+            issued += 1
+            scenario = random.choices(scenarios, weights)[0]
+            started = time.perf_counter()
+            name, response = await scenario(http, fixtures)
+            samples.setdefault(name, []).append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, errors, time.perf_counter() - started)
+
+
+async def seed_extra_teams(db_manager, count: int, seed: int) -> None:
+    """Add count generated teams (20 per league) with reproducible rosters"""
+    from models import Team
+    from player_generator import generate_rosters
+
+    teams = [(f"Bench Club {i}", 60 + i % 30) for i in range(count)]
+    rosters = generate_rosters(teams, base_seed=seed)
+    documents = []
+    for i, ((name, rating), players) in enumerate(zip(teams, rosters)):
+        documents.append(Team(
+            name=name, short_name=f"B{i:04d}"[:5], country="Benchland", league=f"Bench League {i // 20}",
+            overall_rating=rating, attack_rating=rating, midfield_rating=rating, defense_rating=rating,
+            stadium_name=f"Bench Ground {i}", stadium_capacity=20000, players=players,
+        ).model_dump())
+    await db_manager.db.teams.insert_many(documents)
+    await db_manager.cache.invalidate("teams")
+    await db_manager.recalculate_team_ratings()
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    mix = MIXES[args.mix]
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as http:
+            return await drive(http, mix, args.requests, args.concurrency, args.duration)
+
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ.setdefault("DB_NAME", "football_master_bench")
+    # Every in-process request comes from one client, so the limiter would only measure fast 429s
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.chdir(BACKEND_DIR)
+    import server
+
+    await server.app.router.startup()
+    if args.extra_teams:
+        await seed_extra_teams(server.db_manager, args.extra_teams, args.seed)
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as http:
+            return await drive(http, mix, args.requests, args.concurrency, args.duration)
+    finally:
+        await server.app.router.shutdown()
+
+
+def error_rate(stats: Dict[str, Any]) -> float:
+    return stats.get("errors", 0) / stats["count"] if stats.get("count") else 0.0
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List endpoints whose p95 latency grew, throughput dropped or error rate rose by more than tolerance
+
+    Any rise in error rate over the baseline counts: a run that fails fast
+    looks faster, so errors are checked before latency is trusted.
+    """
+    regressions = []
+    previous_total, current_total = baseline.get("total"), report["total"]
+    if previous_total and error_rate(current_total) > error_rate(previous_total):
+        regressions.append(
+            f"total: errors {previous_total.get('errors', 0)}/{previous_total['count']} -> {current_total['errors']}/{current_total['count']}"
+        )
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            if current["errors"]:
+                regressions.append(f"{name}: {current['errors']} errors (not in baseline)")
+            continue
+        if error_rate(current) > error_rate(previous):
+            regressions.append(f"{name}: errors {previous.get('errors', 0)}/{previous['count']} -> {current['errors']}/{current['count']}")
+        if previous["p95_ms"] > 0 and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["rps"] > 0 and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Football Master API load test")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--mongo-url", default="mongomock://", help="MongoDB URL for the in-process app")
+    parser.add_argument("--base-url", default=None, help="Benchmark an already running server instead")
+    parser.add_argument("--extra-teams", type=int, default=0, help="Seed this many generated teams on top of the catalog")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    report = asyncio.run(run(args))
+    report["meta"] = {
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "extra_teams": args.extra_teams,
+        "mongo_url": None if args.base_url else args.mongo_url,
+        "base_url": args.base_url,
+        "python": sys.version.split()[0],
+    }
+
+    status = 0
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+    elif args.baseline.exists():
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        report["regressions"] = regressions
+        status = 1 if regressions else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "football_master:cache:invalidate"
+
+# Separates namespace and key in a single-entry invalidation message
+KEY_SEPARATOR = "#"
+
+# Sentinel for "not cached", since None is a legitimate cached value (e.g. unknown team id)
+MISSING = object()
+
+
+class LRUCache:
+    """In-process L1 cache: bounded LRU with per-entry TTL, grouped by namespace"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._namespaces: Dict[str, Set[str]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def get(self, namespace: str, key: str) -> Any:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._discard(namespace, key)
+            return MISSING
+        self._entries.move_to_end((namespace, key))
+        return value
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end((namespace, key))
+        self._namespaces.setdefault(namespace, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            (old_namespace, old_key), _ = self._entries.popitem(last=False)
+            self._namespaces.get(old_namespace, set()).discard(old_key)
+
+    def version(self, namespace: str) -> int:
+        """Counter bumped on every invalidation, used to drop fills that raced one"""
+        return self._versions.get(namespace, 0)
+
+    def invalidate(self, namespace: str) -> None:
+        self._versions[namespace] = self.version(namespace) + 1
+        for key in self._namespaces.pop(namespace, set()):
+            self._entries.pop((namespace, key), None)
+
+    def discard(self, namespace: str, key: str) -> None:
+        """Drop one entry without bumping the namespace version"""
+        self._discard(namespace, key)
+
+    def clear(self) -> None:
+        for namespace in set(self._namespaces) | set(self._versions):
+            self.invalidate(namespace)
+
+    def _discard(self, namespace: str, key: str) -> None:
+        self._entries.pop((namespace, key), None)
+        self._namespaces.get(namespace, set()).discard(key)
+
+
+class RedisCache:
+    """Shared L2 cache over any Redis-protocol asyncio client (redis-py, fakeredis)
+
+    Each entry is its own key with its own TTL. A namespace keeps a small meta
+    hash of two counters: `generation`, bumped by invalidate, is stamped into
+    every entry so a whole namespace is dropped by one HINCRBY (older entries
+    read as misses and expire on their own); `writes`, bumped by invalidate and
+    discard, versions fills. A fill passes the `writes` it read before loading,
+    and set() skips the write (WATCH/MULTI) if the namespace changed since.
+    """
+
+    def __init__(self, client, ttl: float = 300.0, prefix: str = "football_master:cache"):
+        self.client = client
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def _meta_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:meta"
+
+    def _entry_key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:entry:{key}"
+
+    async def get(self, namespace: str, key: str) -> Tuple[Optional[bytes], int]:
+        """An entry (None if missing or from before the last invalidation) and the namespace's write stamp"""
+        return (await self.get_many([(namespace, key)]))[0]
+
+    async def get_many(self, entries: List[Tuple[str, str]]) -> List[Tuple[Optional[bytes], int]]:
+        namespaces = list(dict.fromkeys(namespace for namespace, _ in entries))
+        async with self.client.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.hmget(self._meta_key(namespace), "generation", "writes")
+            for namespace, key in entries:
+                pipe.get(self._entry_key(namespace, key))
+            results = await pipe.execute()
+        meta = {
+            namespace: (int(generation or 0), int(writes or 0))
+            for namespace, (generation, writes) in zip(namespaces, results[:len(namespaces)])
+        }
+        found = []
+        for (namespace, _), stored in zip(entries, results[len(namespaces):]):
+            generation, writes = meta[namespace]
+            raw = None
+            if stored is not None:
+                stamp, _, value = stored.partition(b":")
+                if int(stamp) == generation:
+                    raw = value
+            found.append((raw, writes))
+        return found
+
+    async def set(self, namespace: str, key: str, raw: str, writes: int) -> bool:
+        """Store an entry unless the namespace was invalidated or discarded from since `writes` was read"""
+        from redis.exceptions import WatchError
+
+        meta_key = self._meta_key(namespace)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(meta_key)
+                generation, current = await pipe.hmget(meta_key, "generation", "writes")
+                if int(current or 0) != writes:
+                    return False
+                pipe.multi()
+                pipe.set(self._entry_key(namespace, key), f"{int(generation or 0)}:{raw}", ex=self.ttl)
+                await pipe.execute()
+                return True
+        except WatchError:
+            return False
+
+    async def invalidate(self, namespace: str, origin: str) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hincrby(self._meta_key(namespace), "generation", 1)
+            pipe.hincrby(self._meta_key(namespace), "writes", 1)
+            pipe.publish(INVALIDATION_CHANNEL, f"{origin}:{namespace}")
+            await pipe.execute()
+
+    async def discard(self, namespace: str, keys: Tuple[str, ...], origin: str) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(*[self._entry_key(namespace, key) for key in keys])
+            pipe.hincrby(self._meta_key(namespace), "writes", 1)
+            for key in keys:
+                pipe.publish(INVALIDATION_CHANNEL, f"{origin}:{namespace}{KEY_SEPARATOR}{key}")
+            await pipe.execute()
+
+
+class TieredCache:
+    """L1 in-process LRU in front of an optional shared L2
+
+    Invalidations are published on INVALIDATION_CHANNEL so every worker drops its
+    L1 copy. Any L2 failure degrades to L1-only instead of failing the request.
+    """
+
+    def __init__(self, l1: Optional[LRUCache] = None, l2: Optional[RedisCache] = None):
+        self.l1 = l1 or LRUCache()
+        self.l2 = l2
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], str],
+        decode: Callable[[bytes], Any],
+    ) -> Any:
+        value = self.l1.get(namespace, key)
+        if value is not MISSING:
+            return value
+
+        version = self.l1.version(namespace)
+        writes = None
+        if self.l2 is not None:
+            try:
+                raw, writes = await self.l2.get(namespace, key)
+            except Exception as e:
+                logger.warning(f"L2 cache read failed, falling back to database: {e}")
+                raw = None
+            if raw is not None:
+                value = decode(raw)
+                if self.l1.version(namespace) == version:
+                    self.l1.set(namespace, key, value)
+                return value
+
+        value = await loader()
+        if self.l1.version(namespace) != version:
+            # Invalidated while loading; serve the value but do not cache it
+            return value
+        self.l1.set(namespace, key, value)
+        await self._fill_l2(namespace, key, value, encode, writes)
+        return value
+
+    async def get_or_load_many(
+        self,
+        entries: List[Tuple[str, str]],
+        loader: Callable[[List[Tuple[str, str]]], Awaitable[Dict[Tuple[str, str], Any]]],
+        encode: Callable[[Any], str],
+        decode: Callable[[bytes], Any],
+    ) -> Dict[Tuple[str, str], Any]:
+        """get_or_load for many (namespace, key) entries: one L2 round-trip and one loader call for the misses
+
+        The loader gets the missing entries and returns a value for each of them.
+        """
+        found: Dict[Tuple[str, str], Any] = {}
+        missing = []
+        for namespace, key in entries:
+            value = self.l1.get(namespace, key)
+            if value is MISSING:
+                missing.append((namespace, key))
+            else:
+                found[(namespace, key)] = value
+        if not missing:
+            return found
+
+        versions = {entry: self.l1.version(entry[0]) for entry in missing}
+        writes: Dict[Tuple[str, str], Optional[int]] = dict.fromkeys(missing)
+        if self.l2 is not None:
+            try:
+                stored = await self.l2.get_many(missing)
+            except Exception as e:
+                logger.warning(f"L2 cache read failed, falling back to database: {e}")
+                stored = [(None, None)] * len(missing)
+            still_missing = []
+            for entry, (raw, writes[entry]) in zip(missing, stored):
+                if raw is None:
+                    still_missing.append(entry)
+                    continue
+                found[entry] = decode(raw)
+                if self.l1.version(entry[0]) == versions[entry]:
+                    self.l1.set(entry[0], entry[1], found[entry])
+            missing = still_missing
+        if not missing:
+            return found
+
+        loaded = await loader(missing)
+        for entry in missing:
+            value = found[entry] = loaded[entry]
+            if self.l1.version(entry[0]) != versions[entry]:
+                continue
+            self.l1.set(entry[0], entry[1], value)
+            await self._fill_l2(entry[0], entry[1], value, encode, writes[entry])
+        return found
+
+    async def _fill_l2(self, namespace: str, key: str, value: Any, encode: Callable[[Any], str], writes: Optional[int]) -> None:
+        # Without a write stamp (no L2 or its read failed) there is nothing to version the fill against
+        if self.l2 is None or writes is None:
+            return
+        try:
+            await self.l2.set(namespace, key, encode(value), writes)
+        except Exception as e:
+            logger.warning(f"L2 cache write failed: {e}")
+
+    def version(self, namespace: str) -> int:
+        """Changes whenever namespace is invalidated here or by another worker"""
+        return self.l1.version(namespace)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.l1.invalidate(namespace)
+            if self.l2 is not None:
+                try:
+                    await self.l2.invalidate(namespace, self.instance_id)
+                except Exception as e:
+                    logger.warning(f"L2 cache invalidation failed for {namespace}: {e}")
+
+    async def discard(self, namespace: str, *keys: str) -> None:
+        """Drop single entries everywhere, leaving the rest of the namespace (and its version) alone
+
+        For updates that touch a field of a few cached documents, where a
+        namespace invalidation would needlessly empty every list and rebuild
+        everything keyed on the namespace version.
+        """
+        for key in keys:
+            self.l1.discard(namespace, key)
+        if self.l2 is not None and keys:
+            try:
+                await self.l2.discard(namespace, keys, self.instance_id)
+            except Exception as e:
+                logger.warning(f"L2 cache discard failed for {namespace}: {e}")
+
+    async def start(self) -> None:
+        """Start listening for invalidations broadcast by other workers"""
+        if self.l2 is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.l2.client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were disconnected is lost, so start clean
+                self.l1.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    origin, _, namespace = data.partition(":")
+                    if origin == self.instance_id:
+                        continue
+                    namespace, separator, key = namespace.partition(KEY_SEPARATOR)
+                    if separator:
+                        self.l1.discard(namespace, key)
+                    else:
+                        self.l1.invalidate(namespace)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+
+def create_cache() -> TieredCache:
+    """Build the cache from CACHE_* / REDIS_URL settings; L2 is used only if configured"""
+    ttl = float(os.environ.get("CACHE_TTL_SECONDS", "300"))
+    l1 = LRUCache(max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", "1024")), ttl=ttl)
+
+    redis_url = os.environ.get("REDIS_URL")
+    if not redis_url:
+        return TieredCache(l1)
+
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using local cache only")
+        return TieredCache(l1)
+
+    return TieredCache(l1, RedisCache(aioredis.from_url(redis_url), ttl=ttl))
@@ -0,0 +1,45 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CATALOG_VERSION = 1
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "data" / "catalog.json"
+
+
+class CatalogError(Exception):
+    pass
+
+
+@lru_cache(maxsize=1)
+def load_catalog() -> Dict[str, Any]:
+    """Load the seed catalog (teams, star rosters, stadiums, achievements) on first use
+
+    Only seeding needs it, so workers that start against an already seeded
+    database never parse it.
+    """
+    path = Path(os.environ.get("CATALOG_PATH", DEFAULT_CATALOG_PATH))
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    if catalog.get("version") != CATALOG_VERSION:
+        raise CatalogError(f"Unsupported catalog version {catalog.get('version')} in {path}, expected {CATALOG_VERSION}")
+    return catalog
+
+
+def default_teams() -> List[Dict[str, Any]]:
+    return [dict(team) for team in load_catalog()["teams"]]
+
+
+def default_stadiums() -> List[Dict[str, Any]]:
+    return [dict(stadium) for stadium in load_catalog()["stadiums"]]
+
+
+def default_achievements() -> List[Dict[str, Any]]:
+    return [dict(achievement) for achievement in load_catalog()["achievements"]]
+
+
+def star_roster(team_name: str) -> Optional[List[Dict[str, Any]]]:
+    """Hand-made roster for a featured team, or None if it uses generated players"""
+    roster = load_catalog()["star_rosters"].get(team_name)
+    return [dict(player) for player in roster] if roster is not None else None
@@ -0,0 +1,202 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Layout: HEADER (magic, version, flags, event count), then the body, zlib'd when flags has COMPRESSED:
+#   strings  u32 length + JSON list (event types, player ids, descriptions; referenced by index)
+#   columns  type, player, description (string indexes), time, position kind, x, y, z
+#   extras   u32 length + JSON {row: {key: value}} for keys outside the columns
+#
+# Times and positions are fixed-point with SCALE (1/100 precision). Decoded events
+# always carry all five column keys (None when absent). An event whose known fields
+# have unexpected types is stored whole in extras and comes back exactly as it was.
+MAGIC = b"EV"
+VERSION = 1
+HEADER = struct.Struct("<2sBBI")
+LENGTH = struct.Struct("<I")
+COMPRESSED, WIDE_INDEX = 1, 2
+SCALE = 100
+COLUMN_KEYS = ("event_type", "game_time", "position", "player_id", "description")
+# Position kinds
+NO_POSITION, POSITION_2D, POSITION_3D = 0, 2, 3
+
+_INT16_MAX = 2 ** 15 - 1
+
+
+def _fixed(value: float, limit: int) -> int:
+    return max(-limit, min(limit, int(round(value * SCALE))))
+
+
+def _column_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(typecode: str, body: memoryview, offset: int, count: int):
+    column = array(typecode)
+    end = offset + column.itemsize * count
+    column.frombytes(body[offset:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _columnar(event: Dict[str, Any]) -> bool:
+    """Whether the event's known fields fit the columns exactly enough to round-trip"""
+    position = event.get("position")
+    return (
+        isinstance(event.get("event_type"), str)
+        and _is_number(event.get("game_time", 0))
+        and (position is None or (isinstance(position, (list, tuple)) and len(position) in (2, 3) and all(map(_is_number, position))))
+        and isinstance(event.get("player_id") or "", str)
+        and isinstance(event.get("description") or "", str)
+    )
+
+
+def encode_events(events: Sequence[Dict[str, Any]], compression_level: int = 6) -> bytes:
+    """Pack a list of event dicts into the columnar binary form (compression_level 0 = no zlib)"""
+    strings: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    rows = []
+    extras: Dict[str, Dict[str, Any]] = {}
+    for row, event in enumerate(events):
+        if not _columnar(event):
+            extras[str(row)] = dict(event)
+            rows.append(None)
+            continue
+        leftover = {key: value for key, value in event.items() if key not in COLUMN_KEYS}
+        if leftover:
+            extras[str(row)] = leftover
+        rows.append((
+            intern(event["event_type"]),
+            intern(event.get("player_id")),
+            intern(event.get("description")),
+            event.get("game_time", 0),
+            event.get("position"),
+        ))
+
+    wide = len(strings) >= 0xFFFF
+    index_type, missing = ("I", 0xFFFFFFFF) if wide else ("H", 0xFFFF)
+    types, players, descriptions = array(index_type), array(index_type), array(index_type)
+    times, kinds = array("i"), array("B")
+    xs, ys, zs = array("h"), array("h"), array("h")
+    for values in rows:
+        if values is None:
+            # Stored whole in extras; the columns only hold placeholders
+            for column in (types, players, descriptions):
+                column.append(missing)
+            for column in (times, kinds, xs, ys, zs):
+                column.append(0)
+            continue
+        event_type, player, description, game_time, position = values
+        types.append(event_type)
+        players.append(missing if player is None else player)
+        descriptions.append(missing if description is None else description)
+        times.append(_fixed(game_time, 2 ** 31 - 1))
+        kinds.append(len(position) if position else NO_POSITION)
+        position = list(position or ()) + [0, 0, 0]
+        xs.append(_fixed(position[0], _INT16_MAX))
+        ys.append(_fixed(position[1], _INT16_MAX))
+        zs.append(_fixed(position[2], _INT16_MAX))
+
+    string_table = json.dumps(list(strings), separators=(",", ":")).encode()
+    extra_table = json.dumps(extras, separators=(",", ":"), default=str).encode() if extras else b""
+    body = b"".join([
+        LENGTH.pack(len(string_table)), string_table,
+        *(_column_bytes(column) for column in (types, players, descriptions, times, kinds, xs, ys, zs)),
+        LENGTH.pack(len(extra_table)), extra_table,
+    ])
+    flags = WIDE_INDEX if wide else 0
+    if compression_level > 0:
+        compressed = zlib.compress(body, compression_level)
+        if len(compressed) < len(body):
+            body, flags = compressed, flags | COMPRESSED
+    return HEADER.pack(MAGIC, VERSION, flags, len(rows)) + body
+
+
+def event_count(blob: bytes) -> int:
+    """Number of events, read from the header without decoding anything"""
+    return HEADER.unpack_from(blob)[3]
+
+
+class EventLog:
+    """Read-only view of an encoded event log
+
+    Only the header is parsed up front; the body is decompressed and split
+    into columns on first access, and event dicts are built one at a time as
+    they are iterated or sliced, so a replay can stream a long log.
+    """
+
+    def __init__(self, blob: bytes):
+        magic, version, self.flags, self.count = HEADER.unpack_from(blob)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not an encoded event log")
+        self._blob = blob
+        self._columns = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _load(self):
+        if self._columns is not None:
+            return self._columns
+        body = memoryview(self._blob)[HEADER.size:]
+        if self.flags & COMPRESSED:
+            body = memoryview(zlib.decompress(body))
+        (length,) = LENGTH.unpack_from(body)
+        strings = json.loads(bytes(body[LENGTH.size:LENGTH.size + length]))
+        offset = LENGTH.size + length
+        columns = []
+        index_type = "I" if self.flags & WIDE_INDEX else "H"
+        for typecode in (index_type, index_type, index_type, "i", "B", "h", "h", "h"):
+            column, offset = _read_column(typecode, body, offset, self.count)
+            columns.append(column)
+        (length,) = LENGTH.unpack_from(body, offset)
+        extras = json.loads(bytes(body[offset + LENGTH.size:offset + LENGTH.size + length])) if length else {}
+        self._columns = (strings, columns, extras, 0xFFFFFFFF if self.flags & WIDE_INDEX else 0xFFFF)
+        return self._columns
+
+    def iter(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        strings, (types, players, descriptions, times, kinds, xs, ys, zs), extras, missing = self._load()
+        for row in range(max(0, start), min(self.count, self.count if stop is None else stop)):
+            extra = extras.get(str(row))
+            if types[row] == missing:
+                yield dict(extra)
+                continue
+            kind = kinds[row]
+            event = {
+                "event_type": strings[types[row]],
+                "game_time": times[row] / SCALE,
+                "position": [xs[row] / SCALE, ys[row] / SCALE, zs[row] / SCALE][:kind] if kind else None,
+                "player_id": None if players[row] == missing else strings[players[row]],
+                "description": None if descriptions[row] == missing else strings[descriptions[row]],
+            }
+            if extra:
+                event.update(extra)
+            yield event
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter()
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self.iter())
+
+
+def decode_events(blob: bytes) -> List[Dict[str, Any]]:
+    return EventLog(blob).to_list()
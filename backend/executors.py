@@ -0,0 +1,168 @@
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from metrics import event_loop_blocked, event_loop_lag, offloaded_call_duration
+from profiling import fold_stack
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorConfig:
+    """Executor settings, read from .env
+
+    CPU_PROCESSES           process pool size for pure-Python CPU work (0 = CPU count)
+    THREAD_POOL_SIZE        thread pool size for GIL-releasing work (NumPy, zlib, file IO)
+    LOOP_LAG_INTERVAL_MS    how often the lag monitor probes the event loop
+    LOOP_LAG_THRESHOLD_MS   stalls at least this long are logged with the blocking stack (0 disables)
+    """
+
+    def __init__(self):
+        self.cpu_processes = int(os.environ.get("CPU_PROCESSES", "0")) or os.cpu_count() or 1
+        self.thread_pool_size = int(os.environ.get("THREAD_POOL_SIZE", "0")) or min(32, (os.cpu_count() or 1) + 4)
+        self.lag_interval_ms = float(os.environ.get("LOOP_LAG_INTERVAL_MS", "50"))
+        self.lag_threshold_ms = float(os.environ.get("LOOP_LAG_THRESHOLD_MS", "100"))
+
+
+_config: Optional[ExecutorConfig] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_config() -> ExecutorConfig:
+    global _config
+    if _config is None:
+        _config = ExecutorConfig()
+    return _config
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=get_config().thread_pool_size, thread_name_prefix="offload")
+        return _thread_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Process-wide CPU pool, started on first use
+
+    spawn, not fork: the serving process has Motor and logging threads whose
+    locks a fork could copy while held.
+    """
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=get_config().cpu_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_executors():
+    global _thread_pool, _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=False, cancel_futures=True)
+            _thread_pool = None
+
+
+async def _offload(pool_name: str, executor, call: Callable[[], Any], function_name: str):
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+    finally:
+        offloaded_call_duration.observe(time.perf_counter() - started, pool_name, function_name)
+
+
+async def run_threaded(fn: Callable, *args, **kwargs):
+    """Run fn in the shared thread pool; for work that releases the GIL (NumPy, zlib)
+
+    The caller's contextvars travel with the call, so profiler attribution holds.
+    """
+    context = contextvars.copy_context()
+    return await _offload("thread", get_thread_pool(), partial(context.run, fn, *args, **kwargs), fn.__name__)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs):
+    """Run fn in the shared process pool; for pure-Python CPU work that holds the GIL
+
+    fn and its arguments must be picklable (module-level function, plain data),
+    and both ways cost a pickle, so it pays off for work well above a millisecond.
+    """
+    return await _offload("process", get_process_pool(), partial(fn, *args, **kwargs), fn.__name__)
+
+
+class LoopLagMonitor:
+    """Detects a blocked event loop and logs what was blocking it
+
+    A probe on the loop stamps a heartbeat every interval and records how late
+    it ran. A watchdog thread checks the heartbeat, and once it is older than
+    the threshold captures the loop thread's stack mid-stall, so the warning
+    names the blocking code rather than whatever ran next.
+    """
+
+    def __init__(self, config: Optional[ExecutorConfig] = None):
+        self.config = config or get_config()
+        self.interval = self.config.lag_interval_ms / 1000
+        self.threshold = self.config.lag_threshold_ms / 1000
+        self._heartbeat = time.perf_counter()
+        self._loop_thread_id: Optional[int] = None
+        self._stalled_stack: Optional[str] = None
+        self._probe: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def start(self):
+        if not self.enabled or self._probe is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stopped.clear()
+        self._probe = asyncio.create_task(self._run_probe())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._probe is not None:
+            self._probe.cancel()
+            await asyncio.gather(self._probe, return_exceptions=True)
+            self._probe = None
+
+    async def _run_probe(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            event_loop_lag.observe(lag)
+            if lag >= self.threshold:
+                event_loop_blocked.inc()
+                stack, self._stalled_stack = self._stalled_stack, None
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms" + (f"; blocking stack: {stack}" if stack else ""))
+
+    def _run_watchdog(self):
+        while not self._stopped.wait(self.interval):
+            if self._stalled_stack is None and time.perf_counter() - self._heartbeat > self.threshold + self.interval:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._stalled_stack = fold_stack(frame)
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from database import DatabaseManager
+from models import GameMode, Match
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUND_INTERVAL_DAYS = 7
+
+
+def double_round_robin(team_ids: List[str]) -> List[List[Tuple[str, str]]]:
+    """Berger-table double round-robin: rounds of (home, away) pairs
+
+    The last team (the bye placeholder, for an odd number of teams) stays
+    fixed while the rest rotate one place per round. The fixed team's game
+    flips home and away by round parity and every other pairing by its slot,
+    so each rotating team alternates except around its game with the fixed
+    team. No team plays three in a row at home or away, and home counts in
+    each half differ by at most one (with an odd number of teams, where each
+    team has one bye per half, they are equal). The second half swaps home
+    and away, opening with the first half's last round so the turn of the
+    season does not make a third game in a row either; over the season each
+    team plays everyone once at each ground.
+    """
+    teams: List[Optional[str]] = list(team_ids)
+    if len(teams) < 2:
+        return []
+    if len(teams) % 2:
+        teams.append(None)
+    count = len(teams)
+    fixed, rotating = teams[-1], teams[:-1]
+    first_half = []
+    for round_index in range(count - 1):
+        home, away = (fixed, rotating[0]) if round_index % 2 == 0 else (rotating[0], fixed)
+        pairs = [(home, away)]
+        for slot in range(1, count // 2):
+            home, away = rotating[slot], rotating[count - 1 - slot]
+            if slot % 2:
+                home, away = away, home
+            pairs.append((home, away))
+        first_half.append([(home, away) for home, away in pairs if home is not None and away is not None])
+        rotating = rotating[1:] + rotating[:1]
+    second_half = [[(away, home) for home, away in pairs] for pairs in first_half]
+    return first_half + second_half[-1:] + second_half[:-1]
+
+
+def fixture_id(league: str, season: int, home_team_id: str, away_team_id: str) -> str:
+    """Deterministic match id, so regenerating a season never duplicates a fixture"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"league:{league}:{season}:{home_team_id}:{away_team_id}"))
+
+
+class FixtureGenerator:
+    """Builds league seasons: every fixture of every league as scheduled Match documents
+
+    Each league's season is written with one bulk_write, and leagues are
+    written concurrently. Fixtures are upserted with $setOnInsert on
+    deterministic ids, so rerunning a season (a retried job) leaves played
+    fixtures untouched. Matches are played at the home team's stadium,
+    resolved from Team.stadium_name against the stadiums collection; a team
+    whose stadium has no document plays at a default one (as matchmaking does).
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    @property
+    def db(self):
+        return self.db_manager.db
+
+    async def ensure_indexes(self):
+        await self.db.matches.create_index([("league", ASCENDING), ("season", ASCENDING), ("round", ASCENDING)])
+
+    async def generate_season(
+        self,
+        season: int,
+        leagues: Optional[List[str]] = None,
+        start_date: Optional[datetime] = None,
+        round_interval_days: float = DEFAULT_ROUND_INTERVAL_DAYS
+    ) -> Dict[str, Any]:
+        """Schedule a double round-robin season for the given leagues (default: every league)"""
+        query: Dict[str, Any] = {"league": {"$in": leagues}} if leagues else {}
+        teams = await self.db.teams.find(query, {"_id": 0, "id": 1, "name": 1, "league": 1, "stadium_name": 1}).to_list(length=None)
+        stadiums = {
+            stadium["name"]: stadium["id"]
+            async for stadium in self.db.stadiums.find(
+                {"name": {"$in": list({team.get("stadium_name") for team in teams})}}, {"_id": 0, "id": 1, "name": 1}
+            )
+        }
+        default_stadium = await self.db.stadiums.find_one({}, {"_id": 0, "id": 1}, sort=[("id", ASCENDING)])
+        default_stadium_id = default_stadium["id"] if default_stadium else ""
+        by_league: Dict[str, List[dict]] = {}
+        for team in sorted(teams, key=lambda team: team["name"]):
+            by_league.setdefault(team["league"], []).append(team)
+
+        start = start_date or datetime.utcnow()
+        interval = timedelta(days=round_interval_days)
+        results = await asyncio.gather(*[
+            self._write_league(league, league_teams, season, stadiums, default_stadium_id, start, interval)
+            for league, league_teams in by_league.items()
+        ])
+        scheduled = dict(zip(by_league, results))
+        logger.info(f"Scheduled season {season}: {sum(scheduled.values())} fixtures across {len(scheduled)} leagues")
+        return {"season": season, "leagues": len(scheduled), "fixtures": sum(scheduled.values()), "by_league": scheduled}
+
+    async def _write_league(
+        self,
+        league: str,
+        teams: List[dict],
+        season: int,
+        stadiums: Dict[str, str],
+        default_stadium_id: str,
+        start: datetime,
+        interval: timedelta
+    ) -> int:
+        stadium_of = {team["id"]: stadiums.get(team.get("stadium_name"), default_stadium_id) for team in teams}
+        operations = []
+        for round_index, pairs in enumerate(double_round_robin([team["id"] for team in teams])):
+            for home_team_id, away_team_id in pairs:
+                match = Match(
+                    id=fixture_id(league, season, home_team_id, away_team_id),
+                    home_team_id=home_team_id,
+                    away_team_id=away_team_id,
+                    stadium_id=stadium_of[home_team_id],
+                    game_mode=GameMode.LEAGUE,
+                    league=league,
+                    season=season,
+                    round=round_index + 1,
+                    scheduled_at=start + interval * round_index,
+                )
+                operations.append(UpdateOne({"id": match.id}, {"$setOnInsert": match.model_dump()}, upsert=True))
+        if operations:
+            await self.db.matches.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def get_fixtures(self, league: str, season: int, round_number: Optional[int] = None) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {"league": league, "season": season}
+        if round_number is not None:
+            query["round"] = round_number
+        cursor = self.db.matches.find(
+            query, {"_id": 0, "match_events": 0, "events_blob": 0, "statistics": 0}
+        ).sort([("round", ASCENDING), ("scheduled_at", ASCENDING), ("id", ASCENDING)])
+        return await cursor.to_list(length=None)
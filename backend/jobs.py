@@ -0,0 +1,625 @@
+import argparse
+import asyncio
+import logging
+import math
+import os
+import signal
+import socket
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from archive import MatchArchive
+from database import DatabaseManager
+from executors import LoopLagMonitor, run_cpu, shutdown_executors
+from fixtures import FixtureGenerator
+from models import GameMode, Job, JobStatus, Match
+from ratings import RatingService
+from saves import SaveSync
+from transfers import TransferMarket
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobContext"], Awaitable[Optional[Dict[str, Any]]]]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str):
+    """Register a coroutine as the handler for job_type"""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = handler
+        return handler
+    return register
+
+
+class JobError(Exception):
+    """A job failure that retrying cannot fix (bad payload, missing documents)"""
+
+
+class JobConfig:
+    """Job runner settings, read from .env
+
+    JOB_WORKERS                 asyncio workers started inside each API process (0 disables)
+    JOB_LEASE_SECONDS           a claimed job is reclaimable once its lease lapses without a heartbeat
+    JOB_POLL_INTERVAL_SECONDS   idle workers poll the queue this often
+    JOB_RETRY_BACKOFF_SECONDS   base delay before a failed attempt is retried (doubles per attempt)
+    JOB_SHUTDOWN_GRACE_SECONDS  how long shutdown waits for running jobs before requeueing them
+    """
+
+    def __init__(self):
+        self.workers = int(os.environ.get("JOB_WORKERS", "1"))
+        self.lease_seconds = float(os.environ.get("JOB_LEASE_SECONDS", "60"))
+        self.poll_interval = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1"))
+        self.retry_backoff = float(os.environ.get("JOB_RETRY_BACKOFF_SECONDS", "5"))
+        self.shutdown_grace = float(os.environ.get("JOB_SHUTDOWN_GRACE_SECONDS", "10"))
+
+
+class JobQueue:
+    """The `jobs` collection: enqueue, lease-based claiming, heartbeats and retries
+
+    Every state change after a claim is conditioned on lease_owner, so a worker
+    whose lease lapsed (and whose job was reclaimed) cannot overwrite the new
+    owner's progress or result.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, config: JobConfig):
+        self.db_manager = db_manager
+        self.config = config
+        self._wakeup = asyncio.Event()
+
+    @property
+    def collection(self):
+        return self.db_manager.db.jobs
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+        await self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        await self.db_manager.db.transfer_windows.create_index("id", unique=True)
+
+    async def enqueue(self, job_type: str, payload: Optional[Dict[str, Any]] = None, max_attempts: int = 3) -> Job:
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type '{job_type}'")
+        job = Job(job_type=job_type, payload=payload or {}, max_attempts=max_attempts)
+        await self.collection.insert_one(job.model_dump())
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job_data = await self.collection.find_one({"id": job_id}, {"_id": 0})
+        return Job(**job_data) if job_data else None
+
+    async def wait(self, timeout: float):
+        """Sleep until a job is enqueued in this process or the poll interval passes"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _lease_expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.config.lease_seconds)
+
+    async def claim(self, worker_id: str) -> Optional[Job]:
+        """Atomically take the oldest runnable job: queued and due, or running with a lapsed lease"""
+        while True:
+            now = datetime.utcnow()
+            job_data = await self.collection.find_one_and_update(
+                {"$or": [
+                    {"status": JobStatus.QUEUED.value, "run_at": {"$lte": now}},
+                    {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}},
+                ]},
+                {
+                    "$set": {
+                        "status": JobStatus.RUNNING.value,
+                        "lease_owner": worker_id,
+                        "lease_expires_at": self._lease_expiry(),
+                        "started_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("run_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if job_data is None:
+                return None
+            job = Job(**job_data)
+            if job.attempts <= job.max_attempts:
+                return job
+            # Reclaimed after its last attempt's worker died mid-run
+            await self._finish(job, worker_id, {"status": JobStatus.FAILED.value, "error": "Lease expired on the final attempt"})
+
+    async def heartbeat(self, job: Job, worker_id: str, progress: Optional[float] = None, message: Optional[str] = None) -> bool:
+        """Extend the lease (and record progress); False if the lease was lost"""
+        update: Dict[str, Any] = {"lease_expires_at": self._lease_expiry()}
+        if progress is not None:
+            update["progress"] = min(1.0, max(0.0, progress))
+        if message is not None:
+            update["progress_message"] = message
+        result = await self.collection.update_one(
+            {"id": job.id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value},
+            {"$set": update}
+        )
+        return result.matched_count > 0
+
+    async def complete(self, job: Job, worker_id: str, result: Dict[str, Any]) -> bool:
+        return await self._finish(job, worker_id, {"status": JobStatus.SUCCEEDED.value, "progress": 1.0, "result": result, "error": None})
+
+    async def fail(self, job: Job, worker_id: str, error: str, retry: bool = True) -> bool:
+        """Requeue with exponential backoff, or mark failed once attempts are used up"""
+        if retry and job.attempts < job.max_attempts:
+            delay = self.config.retry_backoff * 2 ** (job.attempts - 1)
+            return await self._finish(job, worker_id, {
+                "status": JobStatus.QUEUED.value,
+                "run_at": datetime.utcnow() + timedelta(seconds=delay),
+                "error": error,
+            }, finished=False)
+        return await self._finish(job, worker_id, {"status": JobStatus.FAILED.value, "error": error})
+
+    async def release(self, job: Job, worker_id: str) -> bool:
+        """Hand an interrupted job back without spending an attempt (worker shutdown)"""
+        result = await self.collection.update_one(
+            {"id": job.id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value},
+            {"$set": {"status": JobStatus.QUEUED.value, "lease_owner": None, "lease_expires_at": None}, "$inc": {"attempts": -1}}
+        )
+        return result.modified_count > 0
+
+    async def _finish(self, job: Job, worker_id: str, update: Dict[str, Any], finished: bool = True) -> bool:
+        update.update({"lease_owner": None, "lease_expires_at": None})
+        if finished:
+            update["finished_at"] = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"id": job.id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value},
+            {"$set": update}
+        )
+        if not result.modified_count:
+            logger.warning(f"Job {job.id} ({job.job_type}) lost its lease before finishing; result discarded")
+        return result.modified_count > 0
+
+
+class JobContext:
+    """What a handler sees: its job, the database, progress reporting and the CPU pool"""
+
+    def __init__(self, job: Job, worker_id: str, runner: "JobRunner"):
+        self.job = job
+        self.worker_id = worker_id
+        self.runner = runner
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return self.job.payload
+
+    @property
+    def db_manager(self) -> DatabaseManager:
+        return self.runner.db_manager
+
+    async def progress(self, fraction: float, message: Optional[str] = None):
+        await self.runner.queue.heartbeat(self.job, self.worker_id, fraction, message)
+
+    async def run_cpu(self, fn, *args):
+        """Run a picklable, module-level function in the shared process pool"""
+        return await run_cpu(fn, *args)
+
+
+class JobRunner:
+    """Asyncio job workers for one process (the API server or `python jobs.py`)"""
+
+    def __init__(self, db_manager: DatabaseManager, config: Optional[JobConfig] = None):
+        self.db_manager = db_manager
+        self.config = config or JobConfig()
+        self.queue = JobQueue(db_manager, self.config)
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self, workers: Optional[int] = None):
+        workers = self.config.workers if workers is None else workers
+        if workers <= 0:
+            return
+        await self.queue.ensure_indexes()
+        self._stopping.clear()
+        for number in range(workers):
+            self._tasks.append(asyncio.create_task(self._work(f"{self.worker_prefix}:{number}")))
+        logger.info(f"Started {workers} job workers")
+
+    async def stop(self):
+        """Let running jobs finish within the grace period, then requeue whatever is left"""
+        self._stopping.set()
+        self.queue.wake()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=self.config.shutdown_grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+    async def _work(self, worker_id: str):
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} could not claim a job: {e}")
+                job = None
+            if job is None:
+                await self.queue.wait(self.config.poll_interval)
+                continue
+            await self.run_job(job, worker_id)
+
+    async def run_job(self, job: Job, worker_id: str):
+        context = JobContext(job, worker_id, self)
+        heartbeat = asyncio.create_task(self._heartbeat(job, worker_id))
+        try:
+            handler = JOB_HANDLERS.get(job.job_type)
+            if handler is None:
+                raise JobError(f"No handler registered for job type '{job.job_type}'")
+            result = await handler(context)
+            await self.queue.complete(job, worker_id, result or {})
+        except asyncio.CancelledError:
+            await self.queue.release(job, worker_id)
+            raise
+        except Exception as e:
+            logger.warning(f"Job {job.id} ({job.job_type}) attempt {job.attempts}/{job.max_attempts} failed: {e}")
+            await self.queue.fail(job, worker_id, str(e), retry=not isinstance(e, JobError))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: Job, worker_id: str):
+        while True:
+            await asyncio.sleep(self.config.lease_seconds / 3)
+            if not await self.queue.heartbeat(job, worker_id):
+                logger.warning(f"Job {job.id} ({job.job_type}) lease lost by {worker_id}")
+                return
+
+
+# ============ JOB HANDLERS ============
+
+@job_handler("recalculate_ratings")
+async def recalculate_ratings(context: JobContext) -> Dict[str, Any]:
+    """Recompute derived team ratings for payload team_ids (default: every team)"""
+    updated = await context.db_manager.recalculate_team_ratings(context.payload.get("team_ids"))
+    return {"teams_updated": updated}
+
+
+@job_handler("rebuild_ratings")
+async def rebuild_ratings(context: JobContext) -> Dict[str, Any]:
+    """Recompute every Elo rating and the rating history by replaying all completed matches"""
+    return await RatingService(context.db_manager).rebuild(context.progress)
+
+
+@job_handler("archive_matches")
+async def archive_matches(context: JobContext) -> Dict[str, Any]:
+    """Move completed matches older than payload older_than_days (default ARCHIVE_AFTER_DAYS) to the archive"""
+    return await MatchArchive(context.db_manager).archive(context.payload.get("older_than_days"), context.progress)
+
+
+@job_handler("generate_fixtures")
+async def generate_fixtures(context: JobContext) -> Dict[str, Any]:
+    """Schedule payload season's double round-robin fixtures for payload leagues (default: every league)"""
+    payload = context.payload
+    start_date = datetime.fromisoformat(payload["start_date"]) if payload.get("start_date") else None
+    return await FixtureGenerator(context.db_manager).generate_season(
+        int(payload["season"]), payload.get("leagues"), start_date, float(payload.get("round_interval_days", 7))
+    )
+
+
+@job_handler("advance_season")
+async def advance_season(context: JobContext) -> Dict[str, Any]:
+    """Move a career to its next season and refresh its team's ratings
+
+    Guarded on payload from_season, so a retried or duplicated job advances once.
+    """
+    db_manager = context.db_manager
+    career = await db_manager.get_career(context.payload["career_id"])
+    if career is None:
+        raise JobError(f"Career {context.payload['career_id']} not found")
+    from_season = context.payload.get("from_season", career.current_season)
+
+    result = await db_manager.db.careers.update_one(
+        {"id": career.id, "current_season": from_season},
+        {"$inc": {"current_season": 1}, "$set": {"season_stats": {}}}
+    )
+    await context.progress(0.5, "Season advanced")
+    await db_manager.recalculate_team_ratings([career.current_team_id])
+    return {"career_id": career.id, "current_season": from_season + 1, "advanced": result.modified_count > 0}
+
+
+def _round_winner(match: dict) -> str:
+    if match["home_score"] != match["away_score"]:
+        return match["home_team_id"] if match["home_score"] > match["away_score"] else match["away_team_id"]
+    # Level after play: the penalty winner, when the client recorded one, else the home side
+    return match.get("statistics", {}).get("winner_id") or match["home_team_id"]
+
+
+@job_handler("tournament_round")
+async def tournament_round(context: JobContext) -> Dict[str, Any]:
+    """Draw the next knockout round of a tournament, optionally simulating the current one first
+
+    Round matches get deterministic ids and are upserted, so a retry never
+    draws a round twice. Odd entrants give the last team a bye.
+    """
+    from simulation import simulate_knockout
+
+    db_manager = context.db_manager
+    tournament_id = context.payload["tournament_id"]
+    tournament = await db_manager.db.tournaments.find_one({"id": tournament_id}, {"_id": 0})
+    if tournament is None:
+        raise JobError(f"Tournament {tournament_id} not found")
+    if tournament["status"] == "completed":
+        return {"tournament_id": tournament_id, "winner_id": tournament.get("winner_id"), "drawn": False}
+
+    matches = await db_manager.db.matches.find({"tournament_id": tournament_id}, {"_id": 0}).to_list(length=None)
+    drawn_rounds = max((match["round"] for match in matches), default=0)
+
+    if drawn_rounds and context.payload.get("simulate"):
+        pending = [match for match in matches if match["round"] == drawn_rounds and not match["completed"]]
+        if pending:
+            await context.progress(0.2, f"Simulating {len(pending)} matches")
+            await _simulate_matches(context, pending, zlib.crc32(f"{tournament_id}:{drawn_rounds}".encode()), simulate_knockout)
+
+    # Replay the bracket: each round's entrants are the previous round's winners plus its bye
+    entrants = list(tournament["participating_teams"])
+    for round_number in range(1, drawn_rounds + 1):
+        round_matches = [match for match in matches if match["round"] == round_number]
+        if not all(match["completed"] for match in round_matches):
+            raise JobError(f"Round {round_number} of tournament {tournament_id} has unplayed matches")
+        playing = {team for match in round_matches for team in (match["home_team_id"], match["away_team_id"])}
+        entrants = [_round_winner(match) for match in round_matches] + [team for team in entrants if team not in playing]
+
+    if len(entrants) < 2:
+        winner_id = entrants[0] if entrants else None
+        await db_manager.update_tournament(tournament_id, {"status": "completed", "winner_id": winner_id})
+        return {"tournament_id": tournament_id, "winner_id": winner_id, "drawn": False}
+
+    round_number = drawn_rounds + 1
+    await context.progress(0.6, f"Drawing round {round_number}")
+    new_matches = await _draw_round(db_manager, tournament_id, round_number, entrants)
+    await db_manager.update_tournament(tournament_id, {
+        "status": "in_progress",
+        "current_round": round_number,
+        "total_rounds": max(tournament["total_rounds"], drawn_rounds + math.ceil(math.log2(len(entrants)))),
+        "matches": tournament["matches"] + [match_id for match_id in new_matches if match_id not in tournament["matches"]],
+    })
+    return {"tournament_id": tournament_id, "round": round_number, "matches": new_matches, "drawn": True}
+
+
+async def _simulate_matches(context: JobContext, pending: List[dict], seed: int, simulate):
+    db = context.db_manager.db
+    team_ids = {team for match in pending for team in (match["home_team_id"], match["away_team_id"])}
+    ratings = {
+        team["id"]: team
+        async for team in db.teams.find({"id": {"$in": list(team_ids)}}, {"_id": 0, "id": 1, "attack_rating": 1, "defense_rating": 1})
+    }
+    fixtures = [
+        (ratings[match["home_team_id"]]["attack_rating"], ratings[match["home_team_id"]]["defense_rating"],
+         ratings[match["away_team_id"]]["attack_rating"], ratings[match["away_team_id"]]["defense_rating"])
+        for match in pending
+    ]
+    outcomes = await context.run_cpu(simulate, fixtures, seed)
+    operations = []
+    for match, (home_goals, away_goals, home_advances) in zip(pending, outcomes):
+        result = {
+            "completed": True,
+            "completed_at": datetime.utcnow(),
+            "home_score": home_goals,
+            "away_score": away_goals,
+            "statistics": {"simulated": True, "winner_id": match["home_team_id"] if home_advances else match["away_team_id"]},
+        }
+        match.update(result)
+        operations.append(UpdateOne({"id": match["id"]}, {"$set": result}))
+    await db.matches.bulk_write(operations, ordered=False)
+    ratings = RatingService(context.db_manager)
+    for match in pending:
+        await ratings.apply_match(match["id"])
+
+
+async def _draw_round(db_manager: DatabaseManager, tournament_id: str, round_number: int, entrants: List[str]) -> List[str]:
+    teams = {
+        team["id"]: team
+        async for team in db_manager.db.teams.find({"id": {"$in": entrants}}, {"_id": 0, "id": 1, "stadium_name": 1})
+    }
+    stadiums = {
+        stadium["name"]: stadium["id"]
+        async for stadium in db_manager.db.stadiums.find(
+            {"name": {"$in": [team.get("stadium_name") for team in teams.values()]}}, {"_id": 0, "id": 1, "name": 1}
+        )
+    }
+    operations, match_ids = [], []
+    for slot in range(len(entrants) // 2):
+        home_team_id, away_team_id = entrants[2 * slot], entrants[2 * slot + 1]
+        match = Match(
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"tournament:{tournament_id}:{round_number}:{slot}")),
+            home_team_id=home_team_id,
+            away_team_id=away_team_id,
+            stadium_id=stadiums.get(teams.get(home_team_id, {}).get("stadium_name"), ""),
+            game_mode=GameMode.TOURNAMENT,
+            tournament_id=tournament_id,
+            round=round_number,
+        )
+        operations.append(UpdateOne({"id": match.id}, {"$setOnInsert": match.model_dump()}, upsert=True))
+        match_ids.append(match.id)
+    await db_manager.db.matches.bulk_write(operations, ordered=False)
+    return match_ids
+
+
+USER_PROFILE_TOTALS = (
+    "total_matches", "total_wins", "total_draws", "total_losses", "total_goals_scored", "total_goals_conceded",
+)
+
+
+@job_handler("statistics_backfill")
+async def statistics_backfill(context: JobContext) -> Dict[str, Any]:
+    """Rebuild user profile match totals from completed matches
+
+    The user plays the home side. Totals are recomputed (hot matches plus the
+    archived totals) and overwritten, so the job is safe to rerun. payload
+    user_ids limits it to some users.
+    """
+    db = context.db_manager.db
+    query: Dict[str, Any] = {"completed": True, "player_id": {"$ne": None}}
+    if context.payload.get("user_ids"):
+        query["player_id"] = {"$in": context.payload["user_ids"]}
+    total = await db.matches.count_documents(query)
+
+    totals: Dict[str, Dict[str, int]] = {}
+    processed = 0
+    cursor = db.matches.find(query, {"_id": 0, "player_id": 1, "home_score": 1, "away_score": 1}).batch_size(1000)
+    async for match in cursor:
+        user = totals.setdefault(match["player_id"], dict.fromkeys(USER_PROFILE_TOTALS, 0))
+        scored, conceded = match["home_score"], match["away_score"]
+        user["total_matches"] += 1
+        user["total_wins"] += scored > conceded
+        user["total_draws"] += scored == conceded
+        user["total_losses"] += scored < conceded
+        user["total_goals_scored"] += scored
+        user["total_goals_conceded"] += conceded
+        processed += 1
+        if processed % 5000 == 0:
+            await context.progress(0.9 * processed / max(1, total), f"Scanned {processed}/{total} matches")
+
+    # Archived matches are gone from `matches`; add the totals kept for them
+    archived_query: Dict[str, Any] = {"subject_type": "user"}
+    if context.payload.get("user_ids"):
+        archived_query["subject_id"] = {"$in": context.payload["user_ids"]}
+    async for archived in db.archived_totals.find(archived_query, {"_id": 0}):
+        user = totals.setdefault(archived["subject_id"], dict.fromkeys(USER_PROFILE_TOTALS, 0))
+        for key in USER_PROFILE_TOTALS:
+            user[key] += archived.get(key, 0)
+
+    if totals:
+        await db.user_profiles.bulk_write(
+            [UpdateOne({"id": user_id}, {"$set": values}) for user_id, values in totals.items()],
+            ordered=False
+        )
+    return {"matches_scanned": processed, "users_updated": len(totals)}
+
+
+@job_handler("transfer_window")
+async def transfer_window(context: JobContext) -> Dict[str, Any]:
+    """Simulate a transfer window between AI clubs: plan in the CPU pool, commit transfer by transfer
+
+    payload max_per_team caps purchases per club (default 3); payload seed
+    makes the plan reproducible. Clubs managed by a career are left alone.
+    The plan is stored in `transfer_windows` under the job id before it is
+    applied, and each transfer commits through TransferMarket.club_transfer
+    (the buyer's write depends on the seller's), so a retried job re-applies
+    the same window instead of planning a second one.
+    """
+    from roster import POSITIONS
+    from transfer_window import plan_transfer_window
+
+    db_manager = context.db_manager
+    db = db_manager.db
+    window = await db.transfer_windows.find_one({"id": context.job.id}, {"_id": 0})
+    if window is None:
+        index = await db_manager.get_roster_index()
+        budgets = {team["id"]: team.get("budget", 0) async for team in db.teams.find({}, {"_id": 0, "id": 1, "budget": 1})}
+        managed = set(await db.careers.distinct("current_team_id"))
+        players = index.players
+        fees = players["value"].astype("int64")
+        for row in (fees == 0).nonzero()[0]:
+            fees[row] = db_manager.calculate_player_value(int(players["overall_rating"][row]), POSITIONS[players["position"][row]], int(players["age"][row]))
+        await context.progress(0.2, f"Planning across {len(index.team_ids)} clubs")
+        plan = await context.run_cpu(
+            plan_transfer_window,
+            players["team"], players["position"], players["overall_rating"], fees,
+            [budgets.get(team_id, 0) for team_id in index.team_ids],
+            [team_id in managed for team_id in index.team_ids],
+            int(context.payload.get("max_per_team", 3)),
+            int(context.payload.get("seed", zlib.crc32(context.job.id.encode()))),
+        )
+        window = {
+            "id": context.job.id,
+            "state": "pending",
+            "transfers": [
+                {
+                    "player_id": index.player_ids[row],
+                    "player_name": str(index.names[row]),
+                    "from_team_id": index.team_of(row)[0],
+                    "to_team_id": index.team_ids[buyer],
+                    "fee": fee,
+                }
+                for row, buyer, fee in plan
+            ],
+            "created_at": datetime.utcnow(),
+        }
+        await db.transfer_windows.insert_one(dict(window))
+
+    transfers = window["transfers"]
+    if window["state"] == "pending" and transfers:
+        await context.progress(0.6, f"Committing {len(transfers)} transfers")
+        clubs = list({team for transfer in transfers for team in (transfer["from_team_id"], transfer["to_team_id"])})
+        # Rosters are read again at commit time for the players' current documents. Each transfer
+        # then commits on its own, conditional on the player still being at the seller and the
+        # buyer's budget covering the fee, so a career transfer since planning skips it cleanly
+        current = {}
+        async for team in db.teams.find({"id": {"$in": clubs}}, {"_id": 0, "id": 1, "players": 1}):
+            current.update({player["id"]: (team["id"], player) for player in team.get("players", [])})
+        market = TransferMarket(db_manager)
+        applied = []
+        for transfer in transfers:
+            player_id, seller = transfer["player_id"], transfer["from_team_id"]
+            if current.get(player_id, (None,))[0] != seller:
+                continue
+            if await market.club_transfer(current[player_id][1], seller, transfer["to_team_id"], transfer["fee"]):
+                current[player_id] = (transfer["to_team_id"], current[player_id][1])
+                applied.append(transfer)
+        transfers = applied
+        await db_manager.cache.invalidate("teams")
+        await db_manager.recalculate_team_ratings(clubs)
+    await db.transfer_windows.update_one({"id": window["id"]}, {"$set": {"state": "applied"}})
+
+    spent = sum(transfer["fee"] for transfer in transfers)
+    logger.info(f"Transfer window {window['id']}: {len(transfers)} transfers, {spent} spent")
+    return {"window_id": window["id"], "transfers": len(transfers), "total_fees": spent, "clubs": len({transfer["to_team_id"] for transfer in transfers})}
+
+
+@job_handler("compact_saves")
+async def compact_saves(context: JobContext) -> Dict[str, Any]:
+    """Fold save delta chains into new snapshots for payload save_ids (default: every save past the thresholds)"""
+    return await SaveSync(context.db_manager).compact_all(context.payload.get("save_ids"), context.progress)
+
+# ============ WORKER ENTRY POINT ============
+
+async def run_worker(workers: int):
+    """Run job workers outside the API (python jobs.py) until SIGINT/SIGTERM"""
+    db_manager = DatabaseManager()
+    await db_manager.connect()
+    await db_manager.cache.start()
+    loop_monitor = LoopLagMonitor()
+    loop_monitor.start()
+    runner = JobRunner(db_manager)
+    await runner.start(workers)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+
+    logger.info("Stopping job workers...")
+    await runner.stop()
+    await db_manager.close()
+    await loop_monitor.stop()
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / ".env")
+    parser = argparse.ArgumentParser(description="Football Master background job worker")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent jobs (default: JOB_WORKERS, at least 1)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(run_worker(args.workers or max(1, JobConfig().workers)))
@@ -0,0 +1,108 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import DatabaseManager
+from models import UniformKit
+
+# Order in which an away side tries its kits when its first choice clashes
+KIT_PREFERENCE = ("home", "away", "third")
+
+
+def parse_color(color: str) -> Tuple[int, int, int]:
+    """'#RRGGBB' or '#RGB' to an (r, g, b) tuple; anything unparseable counts as black"""
+    value = color.strip().lstrip("#")
+    if len(value) == 3:
+        value = "".join(channel * 2 for channel in value)
+    try:
+        return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+    except ValueError:
+        return 0, 0, 0
+
+
+def color_distance(first: str, second: str) -> float:
+    """'Redmean' weighted RGB distance: a cheap perceptual approximation (0 to ~765)"""
+    (r1, g1, b1), (r2, g2, b2) = parse_color(first), parse_color(second)
+    mean_red = (r1 + r2) / 2
+    dr, dg, db = r1 - r2, g1 - g2, b1 - b2
+    return ((2 + mean_red / 256) * dr * dr + 4 * dg * dg + (2 + (255 - mean_red) / 256) * db * db) ** 0.5
+
+
+def resolve_kits(home_kits: List[UniformKit], away_kits: List[UniformKit], min_distance: float) -> Dict[str, Any]:
+    """Home side wears its home kit; the away side wears its first kit whose primary color is far enough from it
+
+    If every away kit clashes, the one furthest from the home kit is worn.
+    """
+    home = _preferred(home_kits)[0]
+    candidates = _preferred(away_kits)
+    distances = [color_distance(home.primary_color, kit.primary_color) for kit in candidates]
+    choice = next((index for index, distance in enumerate(distances) if distance >= min_distance), None)
+    if choice is None:
+        choice = max(range(len(candidates)), key=distances.__getitem__)
+    return {
+        "home": home,
+        "away": candidates[choice],
+        "clash": choice != 0,
+        "distance": round(distances[choice], 1),
+    }
+
+
+def _preferred(kits: List[UniformKit]) -> List[UniformKit]:
+    rank = {kit_type: index for index, kit_type in enumerate(KIT_PREFERENCE)}
+    return sorted(kits, key=lambda kit: (rank.get(kit.kit_type, len(rank)), kit.created_at))
+
+
+class KitResolver:
+    """Kit choice for a fixture, memoized per (home, away) team pair
+
+    A memoized pair is reused until either team's kits are invalidated (its
+    `uniforms:<team_id>` cache version moves) or teams change. Teams without stored kits wear
+    a home kit in Team.primary_color / secondary_color and an away kit with
+    the two swapped.
+
+    KIT_CLASH_MIN_DISTANCE     primary colors closer than this (redmean RGB distance) clash
+    KIT_MATCHUP_CACHE_SIZE     team pairs kept
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self.min_distance = float(os.environ.get("KIT_CLASH_MIN_DISTANCE", "150"))
+        self.max_pairs = int(os.environ.get("KIT_MATCHUP_CACHE_SIZE", "4096"))
+        self._pairs: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int, int], Dict[str, Any]]]" = OrderedDict()
+
+    def _versions(self, home_team_id: str, away_team_id: str) -> Tuple[int, int, int]:
+        cache = self.db_manager.cache
+        return cache.version(f"uniforms:{home_team_id}"), cache.version(f"uniforms:{away_team_id}"), cache.version("teams")
+
+    async def matchup(self, home_team_id: str, away_team_id: str) -> Optional[Dict[str, Any]]:
+        """Kits for home vs away, or None if either team does not exist"""
+        pair = (home_team_id, away_team_id)
+        versions = self._versions(home_team_id, away_team_id)
+        memo = self._pairs.get(pair)
+        if memo is not None and memo[0] == versions:
+            self._pairs.move_to_end(pair)
+            return memo[1]
+
+        kits = await self.db_manager.get_uniforms_for_teams([home_team_id, away_team_id])
+        for team_id in pair:
+            if not kits[team_id]:
+                kits[team_id] = await self._team_colors(team_id)
+                if kits[team_id] is None:
+                    return None
+        result = resolve_kits(kits[home_team_id], kits[away_team_id], self.min_distance)
+        self._pairs[pair] = (versions, result)
+        self._pairs.move_to_end(pair)
+        while len(self._pairs) > self.max_pairs:
+            self._pairs.popitem(last=False)
+        return result
+
+    async def _team_colors(self, team_id: str) -> Optional[List[UniformKit]]:
+        team = await self.db_manager.get_team(team_id)
+        if team is None:
+            return None
+        return [
+            UniformKit(id=f"{team_id}:home", team_id=team_id, kit_type="home", primary_color=team.primary_color,
+                       secondary_color=team.secondary_color, accent_color=team.secondary_color),
+            UniformKit(id=f"{team_id}:away", team_id=team_id, kit_type="away", primary_color=team.secondary_color,
+                       secondary_color=team.primary_color, accent_color=team.primary_color),
+        ]
@@ -0,0 +1,433 @@
+import asyncio
+import logging
+import os
+import struct
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from database import DatabaseManager
+from models import Match
+from metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+# Wire format: little-endian structs, every frame starts with HEADER (frame type, tick)
+#
+# client -> server                       server -> clients
+#   INPUT  move x/y, button bits           WELCOME  role, tick rate
+#   STATE  clock, score, ball (host)       TICK     flags, [state], [home input], [away input], events
+#   EVENT  type, clock, position, ids      ENDED    final score
+#   END    final score (host)              PONG     echoes the client's tick
+#   PING                                   ERROR    code
+INPUT, STATE, EVENT, END, PING = 1, 2, 3, 4, 5
+WELCOME, TICK, ENDED, PONG, ERROR = 16, 17, 18, 19, 20
+FRAME_NAMES = {
+    INPUT: "input", STATE: "state", EVENT: "event", END: "end", PING: "ping",
+    WELCOME: "welcome", TICK: "tick", ENDED: "ended", PONG: "pong", ERROR: "error",
+}
+
+HEADER = struct.Struct("<BI")
+INPUT_BODY = struct.Struct("<ffB")
+STATE_BODY = struct.Struct("<fBB3f")
+EVENT_BODY = struct.Struct("<Bf3fBH")
+SCORE_BODY = struct.Struct("<BB")
+WELCOME_BODY = struct.Struct("<BB")
+TICK_FLAGS = struct.Struct("<B")
+EVENT_COUNT = struct.Struct("<H")
+ERROR_BODY = struct.Struct("<B")
+
+HOME, AWAY, SPECTATOR = 0, 1, 2
+ROLES = {"home": HOME, "away": AWAY, "spectator": SPECTATOR}
+
+# TICK flag bits
+HAS_STATE, HAS_HOME_INPUT, HAS_AWAY_INPUT = 1, 2, 4
+
+# ERROR codes
+BAD_FRAME, NOT_ALLOWED = 1, 2
+
+EVENT_TYPES = (
+    "goal", "shot", "save", "foul", "yellow_card", "red_card", "offside",
+    "corner", "substitution", "kickoff", "half_time", "full_time",
+)
+
+live_frames = registry.register(Counter(
+    "football_master_live_frames_total",
+    "WebSocket frames by direction and frame type",
+    ("direction", "type"),
+))
+
+
+class LiveConfig:
+    """Live match settings, read from .env
+
+    LIVE_TICK_HZ         how often pending room updates are coalesced and sent
+    LIVE_SEND_QUEUE      frames buffered per connection; a client further behind is dropped
+    LIVE_IDLE_SECONDS    an empty room is persisted and closed after this long
+    LIVE_MAX_EVENTS      events kept per match (more are refused)
+    """
+
+    def __init__(self):
+        self.tick_hz = float(os.environ.get("LIVE_TICK_HZ", "20"))
+        self.send_queue = int(os.environ.get("LIVE_SEND_QUEUE", "64"))
+        self.idle_seconds = float(os.environ.get("LIVE_IDLE_SECONDS", "60"))
+        self.max_events = int(os.environ.get("LIVE_MAX_EVENTS", "2000"))
+
+
+class LiveConnection:
+    """One socket with its own bounded outbound queue, drained by a writer task
+
+    The queue is a deque plus a single waiter future rather than asyncio.Queue,
+    which costs several times more per put on the fan-out hot path.
+    """
+
+    __slots__ = ("websocket", "role", "user_id", "queue", "queue_size", "waiter", "writer", "closed")
+
+    def __init__(self, websocket: WebSocket, role: int, user_id: Optional[str], queue_size: int):
+        self.websocket = websocket
+        self.role = role
+        self.user_id = user_id
+        self.queue: deque = deque()
+        self.queue_size = queue_size
+        self.waiter: Optional[asyncio.Future] = None
+        self.writer = asyncio.create_task(self._run_writer())
+        self.closed = False
+
+    def send(self, frame) -> bool:
+        """Queue a frame without waiting; False if this client has fallen too far behind"""
+        if len(self.queue) >= self.queue_size:
+            return False
+        self.queue.append(frame)
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+        return True
+
+    def close(self, code: int = 1000):
+        """Close once already queued frames are written, or at once if the queue is full"""
+        if self.closed:
+            return
+        self.closed = True
+        if not self.send(code):
+            self.writer.cancel()
+            asyncio.create_task(self._close_socket(code))
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # already closed by the client
+
+    async def _run_writer(self):
+        try:
+            while True:
+                if not self.queue:
+                    self.waiter = asyncio.get_running_loop().create_future()
+                    await self.waiter
+                    continue
+                frame = self.queue.popleft()
+                if isinstance(frame, int):
+                    await self._close_socket(frame)
+                    return
+                await self.websocket.send_bytes(frame)
+        except Exception:
+            pass  # the client went away; its reader notices and detaches it
+
+
+class LiveRoom:
+    """Relay state for one match; updates between ticks overwrite each other"""
+
+    __slots__ = (
+        "match_id", "players", "spectators", "state", "inputs", "pending_events",
+        "events", "home_score", "away_score", "ended", "last_activity",
+    )
+
+    def __init__(self, match_id: str):
+        self.match_id = match_id
+        self.players: Dict[int, LiveConnection] = {}
+        self.spectators: Set[LiveConnection] = set()
+        self.state: Optional[bytes] = None
+        self.inputs: List[Optional[bytes]] = [None, None]
+        self.pending_events: List[bytes] = []
+        self.events: List[dict] = []
+        self.home_score = 0
+        self.away_score = 0
+        self.ended = False
+        self.last_activity = time.monotonic()
+
+    def connections(self):
+        yield from self.players.values()
+        yield from self.spectators
+
+    @property
+    def empty(self) -> bool:
+        return not self.players and not self.spectators
+
+
+def decode_event(body: memoryview) -> tuple:
+    """Split an EVENT body into (fixed part, player_id, description) and check its lengths"""
+    code, clock, x, y, z, player_id_length, description_length = EVENT_BODY.unpack_from(body)
+    end = EVENT_BODY.size + player_id_length + description_length
+    if code >= len(EVENT_TYPES) or len(body) != end:
+        raise ValueError("malformed event")
+    player_id = bytes(body[EVENT_BODY.size:EVENT_BODY.size + player_id_length]).decode()
+    description = bytes(body[EVENT_BODY.size + player_id_length:end]).decode()
+    return (code, clock, x, y, z), player_id, description
+
+
+def encode_tick(tick: int, room: LiveRoom, with_inputs: bool) -> bytes:
+    flags = 0
+    parts = [b""]
+    if room.state is not None:
+        flags |= HAS_STATE
+        parts.append(room.state)
+    if with_inputs:
+        for side, flag in ((HOME, HAS_HOME_INPUT), (AWAY, HAS_AWAY_INPUT)):
+            if room.inputs[side] is not None:
+                flags |= flag
+                parts.append(room.inputs[side])
+    parts.append(EVENT_COUNT.pack(len(room.pending_events)))
+    parts.extend(room.pending_events)
+    parts[0] = HEADER.pack(TICK, tick) + TICK_FLAGS.pack(flags)
+    return b"".join(parts)
+
+
+class LiveHub:
+    """Every live room in this worker, driven by one ticker task
+
+    Incoming frames only update room state; the ticker visits rooms that
+    changed since the last tick, encodes one frame per audience (players get
+    inputs, spectators do not) and queues that same bytes object on every
+    connection. Idle rooms cost nothing, so a worker can hold thousands.
+    Both players of a match must reach the same worker, so multi-worker
+    deployments route /api/matches/{match_id}/live by match id.
+    """
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        config: Optional[LiveConfig] = None,
+        on_match_completed: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ):
+        self.db_manager = db_manager
+        self.config = config or LiveConfig()
+        self.on_match_completed = on_match_completed
+        self.rooms: Dict[str, LiveRoom] = {}
+        self._dirty: Set[LiveRoom] = set()
+        self._tick = 0
+        self._ticker: Optional[asyncio.Task] = None
+        self._sent_ticks = 0
+
+    def start(self):
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._run_ticker())
+
+    async def stop(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+            self._ticker = None
+        for room in list(self.rooms.values()):
+            await self._close_room(room)
+
+    def open_room(self, match_id: str, match: Optional[Match] = None) -> LiveRoom:
+        """Create the room ahead of the first connection (e.g. once matchmaking pairs the players)
+
+        A room reopened for a match that already has stored events (e.g. after
+        an idle close) starts from them, since _persist writes the whole log.
+        """
+        room = self.rooms.get(match_id)
+        if room is None:
+            room = self.rooms[match_id] = LiveRoom(match_id)
+            if match is not None:
+                room.events = list(match.match_events)
+                room.home_score = match.home_score
+                room.away_score = match.away_score
+        return room
+
+    async def serve(self, websocket: WebSocket, match_id: str, user_id: Optional[str], side: str):
+        """Run one client connection from handshake to disconnect"""
+        match = await self.db_manager.get_match(match_id)
+        if match is None or match.completed:
+            await websocket.close(code=4404 if match is None else 4409)
+            return
+        role = ROLES.get(side)
+        room = self.rooms.get(match_id)
+        seat_owner = {HOME: match.player_id, AWAY: match.away_player_id}.get(role)
+        if role is None or (seat_owner and user_id != seat_owner):
+            await websocket.close(code=4403)
+            return
+        if room is not None and role in room.players:
+            await websocket.close(code=4409)
+            return
+
+        await websocket.accept()
+        # Re-check after the handshake: another client may have taken the seat meanwhile
+        room = self.open_room(match_id, match)
+        if role in room.players:
+            await websocket.close(code=4409)
+            return
+        connection = LiveConnection(websocket, role, user_id, self.config.send_queue)
+        if role == SPECTATOR:
+            room.spectators.add(connection)
+        else:
+            room.players[role] = connection
+        connection.send(HEADER.pack(WELCOME, self._tick) + WELCOME_BODY.pack(role, int(self.config.tick_hz)))
+        if room.state is not None:
+            # Late joiners get the current scoreboard straight away
+            connection.send(HEADER.pack(TICK, self._tick) + TICK_FLAGS.pack(HAS_STATE) + room.state + EVENT_COUNT.pack(0))
+
+        try:
+            while not room.ended:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                frame = message.get("bytes")
+                if frame is None:
+                    connection.send(HEADER.pack(ERROR, self._tick) + ERROR_BODY.pack(BAD_FRAME))
+                    continue
+                await self._handle_frame(room, connection, frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self._disconnect(room, connection)
+
+    async def _handle_frame(self, room: LiveRoom, connection: LiveConnection, frame: bytes):
+        try:
+            frame_type, client_tick = HEADER.unpack_from(frame)
+        except struct.error:
+            connection.send(HEADER.pack(ERROR, self._tick) + ERROR_BODY.pack(BAD_FRAME))
+            return
+        body = memoryview(frame)[HEADER.size:]
+        live_frames.inc("in", FRAME_NAMES.get(frame_type, "unknown"))
+        room.last_activity = time.monotonic()
+
+        if frame_type == PING:
+            connection.send(HEADER.pack(PONG, client_tick))
+            return
+        # Players send input; the home player is the match authority for state, events and the result
+        allowed = connection.role in (HOME, AWAY) if frame_type == INPUT else connection.role == HOME
+        if not allowed or frame_type not in (INPUT, STATE, EVENT, END):
+            connection.send(HEADER.pack(ERROR, self._tick) + ERROR_BODY.pack(NOT_ALLOWED))
+            return
+
+        try:
+            if frame_type == INPUT:
+                INPUT_BODY.unpack_from(body)
+                room.inputs[connection.role] = bytes(body[:INPUT_BODY.size])
+            elif frame_type == STATE:
+                _, room.home_score, room.away_score, *_ = STATE_BODY.unpack_from(body)
+                room.state = bytes(body[:STATE_BODY.size])
+            elif frame_type == EVENT:
+                (code, clock, x, y, z), player_id, description = decode_event(body)
+                if len(room.events) >= self.config.max_events:
+                    raise ValueError("event limit reached")
+                room.pending_events.append(bytes(body))
+                room.events.append({
+                    "event_type": EVENT_TYPES[code],
+                    "game_time": round(clock, 2),
+                    "position": [round(x, 2), round(y, 2), round(z, 2)],
+                    "player_id": player_id or None,
+                    "description": description,
+                })
+            else:
+                room.home_score, room.away_score = SCORE_BODY.unpack_from(body)
+                await self._end_match(room)
+                return
+        except (struct.error, ValueError, UnicodeDecodeError):
+            connection.send(HEADER.pack(ERROR, self._tick) + ERROR_BODY.pack(BAD_FRAME))
+            return
+        self._dirty.add(room)
+
+    def _disconnect(self, room: LiveRoom, connection: LiveConnection, code: int = 1000):
+        if connection.role == SPECTATOR:
+            room.spectators.discard(connection)
+        elif room.players.get(connection.role) is connection:
+            del room.players[connection.role]
+        connection.close(code)
+        room.last_activity = time.monotonic()
+
+    def _fan_out(self, room: LiveRoom, player_frame: bytes, spectator_frame: bytes) -> int:
+        sent = 0
+        slow = []
+        for connection in room.players.values():
+            if connection.send(player_frame):
+                sent += 1
+            else:
+                slow.append(connection)
+        for connection in room.spectators:
+            if connection.send(spectator_frame):
+                sent += 1
+            else:
+                slow.append(connection)
+        for connection in slow:
+            logger.warning(f"Dropping slow live client on match {room.match_id} (role {connection.role})")
+            self._disconnect(room, connection, code=1013)
+        return sent
+
+    def _flush(self, room: LiveRoom):
+        player_frame = encode_tick(self._tick, room, with_inputs=True)
+        has_inputs = room.inputs[HOME] is not None or room.inputs[AWAY] is not None
+        spectator_frame = encode_tick(self._tick, room, with_inputs=False) if room.spectators and has_inputs else player_frame
+        self._sent_ticks += self._fan_out(room, player_frame, spectator_frame)
+        room.inputs = [None, None]
+        room.pending_events = []
+
+    async def _run_ticker(self):
+        interval = 1 / self.config.tick_hz
+        next_tick = time.monotonic()
+        while True:
+            next_tick += interval
+            now = time.monotonic()
+            if next_tick < now - interval:
+                # Behind by more than a tick (overloaded loop): skip ahead rather than send a burst
+                next_tick = now
+            await asyncio.sleep(max(0.0, next_tick - now))
+            self._tick += 1
+            dirty, self._dirty = self._dirty, set()
+            for room in dirty:
+                if not room.ended:
+                    self._flush(room)
+            if self._sent_ticks:
+                live_frames.inc("out", "tick", amount=self._sent_ticks)
+                self._sent_ticks = 0
+            if self._tick % max(1, int(self.config.tick_hz)) == 0:
+                await self._close_idle_rooms()
+
+    async def _close_idle_rooms(self):
+        cutoff = time.monotonic() - self.config.idle_seconds
+        for room in [room for room in self.rooms.values() if room.empty and room.last_activity < cutoff]:
+            await self._close_room(room)
+
+    async def _end_match(self, room: LiveRoom):
+        """Send the final tick and result, persist the match in one write and close the room"""
+        room.ended = True
+        self._dirty.discard(room)
+        self._flush(room)
+        ended = HEADER.pack(ENDED, self._tick) + SCORE_BODY.pack(room.home_score, room.away_score)
+        live_frames.inc("out", "ended", amount=self._fan_out(room, ended, ended))
+        await self._close_room(room)
+
+    async def _close_room(self, room: LiveRoom):
+        self.rooms.pop(room.match_id, None)
+        self._dirty.discard(room)
+        try:
+            await self._persist(room)
+        except Exception as e:
+            logger.error(f"Persisting live match {room.match_id} failed: {e}")
+        for connection in list(room.connections()):
+            self._disconnect(room, connection)
+
+    async def _persist(self, room: LiveRoom):
+        """All of a match's events in one update; an abandoned match keeps its events but stays open"""
+        update = {"match_events": room.events, "home_score": room.home_score, "away_score": room.away_score}
+        if room.ended:
+            update["completed"] = True
+            update["completed_at"] = datetime.utcnow()
+        elif not room.events and room.state is None:
+            return
+        await self.db_manager.update_match(room.match_id, update)
+        if room.ended and self.on_match_completed is not None:
+            await self.on_match_completed(room.match_id)
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Dict, Optional, Union
+
+from database import DatabaseManager
+from kits import KitResolver
+
+# Top-level sections of a match-setup response
+SECTIONS = ("home", "away", "stadium", "kits")
+
+# A field selection: each key maps to True (keep all of it) or a nested selection
+FieldTree = Dict[str, Union[bool, "FieldTree"]]
+
+
+class MatchSetupError(Exception):
+    """A match setup request that cannot be served (bad field selection)"""
+
+
+class MatchSetupNotFound(MatchSetupError):
+    """A team or stadium named by the request does not exist"""
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FieldTree]:
+    """'home.name,home.players.overall_rating,kits' to a nested selection; None selects everything
+
+    A path ending on a list applies to each element, so home.players.name
+    keeps only each player's name. A shorter path wins over a longer one.
+    """
+    if not fields or not fields.strip():
+        return None
+    tree: FieldTree = {}
+    for path in filter(None, (entry.strip() for entry in fields.split(","))):
+        keys = path.split(".")
+        if keys[0] not in SECTIONS:
+            raise MatchSetupError(f"Unknown section '{keys[0]}', expected one of {', '.join(SECTIONS)}")
+        node = tree
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[keys[-1]] = True
+    return tree or None
+
+
+def select_fields(value: Any, tree: Union[bool, FieldTree]) -> Any:
+    """Keep only the selected fields of a JSON-ready value; unknown fields are ignored"""
+    if tree is True:
+        return value
+    if isinstance(value, list):
+        return [select_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: select_fields(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+class MatchSetup:
+    """Everything the client needs to start a match, in one round-trip
+
+    Teams (with rosters), stadium and kits are read concurrently through the
+    cached DatabaseManager lookups and the memoized KitResolver, and only the
+    sections named by the field selection are fetched at all. Without an
+    explicit stadium the match is played at the home team's ground, looked
+    up by name once the home team is known.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, kit_resolver: KitResolver):
+        self.db_manager = db_manager
+        self.kit_resolver = kit_resolver
+
+    async def build(
+        self,
+        home_team_id: str,
+        away_team_id: str,
+        stadium_id: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Dict[str, Any]:
+        tree = parse_fields(fields)
+        wanted = set(tree) if tree else set(SECTIONS)
+
+        async def nothing():
+            return None
+
+        # Teams are always read: they validate the request and are cache hits for the kit resolver
+        home, away, stadium, kits = await asyncio.gather(
+            self.db_manager.get_team(home_team_id),
+            self.db_manager.get_team(away_team_id),
+            self.db_manager.get_stadium(stadium_id) if stadium_id and "stadium" in wanted else nothing(),
+            self.kit_resolver.matchup(home_team_id, away_team_id) if "kits" in wanted else nothing(),
+        )
+        if home is None or away is None:
+            raise MatchSetupNotFound("Team not found")
+        if "stadium" in wanted:
+            if stadium_id and stadium is None:
+                raise MatchSetupNotFound("Stadium not found")
+            if not stadium_id:
+                stadium = await self.db_manager.get_stadium_by_name(home.stadium_name)
+
+        response: Dict[str, Any] = {}
+        if "home" in wanted:
+            response["home"] = home.model_dump(mode="json")
+        if "away" in wanted:
+            response["away"] = away.model_dump(mode="json")
+        if "stadium" in wanted:
+            response["stadium"] = stadium.model_dump(mode="json") if stadium is not None else None
+        if "kits" in wanted:
+            response["kits"] = {
+                "home": kits["home"].model_dump(mode="json"),
+                "away": kits["away"].model_dump(mode="json"),
+                "clash": kits["clash"],
+                "distance": kits["distance"],
+            }
+        return select_fields(response, tree) if tree else response
@@ -0,0 +1,391 @@
+import asyncio
+import logging
+import os
+import uuid
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+
+from database import DatabaseManager
+from live import LiveHub
+from metrics import Counter, Histogram, registry
+from models import GameMode, Match, MatchmakingRequest, MatchmakingTicket, TicketStatus
+
+logger = logging.getLogger(__name__)
+
+# A ticket claimed alone for this long belongs to a pairing that died between its two claims
+CLAIM_GRACE_SECONDS = 30
+# Each incremental sync re-reads this much before the last one, for writes stamped just before it committed
+SYNC_OVERLAP_SECONDS = 5
+
+matchmaking_wait = registry.register(Histogram(
+    "football_master_matchmaking_wait_seconds",
+    "Time from joining the online queue to being paired",
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300),
+))
+matchmaking_tickets = registry.register(Counter(
+    "football_master_matchmaking_tickets_total",
+    "Matchmaking tickets by outcome",
+    ("status",),
+))
+
+
+class MatchmakingConfig:
+    """Matchmaking settings, read from .env
+
+    MATCHMAKING_BUCKET_WIDTH          rating points covered by one queue bucket
+    MATCHMAKING_INITIAL_WINDOW        rating gap accepted as soon as a ticket joins
+    MATCHMAKING_WIDEN_PER_SECOND      how fast the accepted gap grows while a ticket waits
+    MATCHMAKING_MAX_WINDOW            the accepted gap never grows past this
+    MATCHMAKING_INTERVAL_SECONDS      how often waiting tickets are retried with their widened window
+    MATCHMAKING_TICKET_TTL_SECONDS    unpaired tickets expire after this long
+    """
+
+    def __init__(self):
+        self.bucket_width = max(1, int(os.environ.get("MATCHMAKING_BUCKET_WIDTH", "25")))
+        self.initial_window = int(os.environ.get("MATCHMAKING_INITIAL_WINDOW", "50"))
+        self.widen_per_second = float(os.environ.get("MATCHMAKING_WIDEN_PER_SECOND", "10"))
+        self.max_window = int(os.environ.get("MATCHMAKING_MAX_WINDOW", "400"))
+        self.interval = float(os.environ.get("MATCHMAKING_INTERVAL_SECONDS", "1"))
+        self.ticket_ttl = float(os.environ.get("MATCHMAKING_TICKET_TTL_SECONDS", "300"))
+
+
+class RatingBuckets:
+    """Waiting tickets grouped by rating bucket, oldest first within each bucket
+
+    The non-empty bucket keys are kept sorted, so locating a rating is a bisect
+    and a search only visits the buckets inside its window, nearest first; the
+    oldest ticket of the nearest bucket is almost always the answer. Buckets are
+    insertion-ordered dicts, so joining and leaving are O(1) apart from the key list.
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self.keys: List[int] = []
+        self.buckets: Dict[int, Dict[str, MatchmakingTicket]] = {}
+        self.by_user: Dict[str, MatchmakingTicket] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_user)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.by_user
+
+    def get(self, user_id: str) -> Optional[MatchmakingTicket]:
+        return self.by_user.get(user_id)
+
+    def oldest_first(self) -> List[MatchmakingTicket]:
+        return list(self.by_user.values())
+
+    def add(self, ticket: MatchmakingTicket):
+        key = ticket.rating // self.width
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {}
+            insort(self.keys, key)
+        bucket[ticket.user_id] = ticket
+        self.by_user[ticket.user_id] = ticket
+
+    def remove(self, user_id: str) -> Optional[MatchmakingTicket]:
+        ticket = self.by_user.pop(user_id, None)
+        if ticket is None:
+            return None
+        key = ticket.rating // self.width
+        bucket = self.buckets[key]
+        del bucket[user_id]
+        if not bucket:
+            del self.buckets[key]
+            del self.keys[bisect_left(self.keys, key)]
+        return ticket
+
+    def nearest(self, ticket: MatchmakingTicket, window: int) -> Optional[MatchmakingTicket]:
+        """The longest-waiting ticket in the nearest bucket with anyone within window of ticket's rating"""
+        own_key = ticket.rating // self.width
+        low = bisect_left(self.keys, (ticket.rating - window) // self.width)
+        high = bisect_left(self.keys, (ticket.rating + window) // self.width + 1)
+        below, above = bisect_left(self.keys, own_key, low, high) - 1, bisect_left(self.keys, own_key, low, high)
+        while below >= low or above < high:
+            # Walk outwards from the ticket's own bucket, one bucket key at a time
+            if above < high and (below < low or self.keys[above] - own_key <= own_key - self.keys[below]):
+                key, above = self.keys[above], above + 1
+            else:
+                key, below = self.keys[below], below - 1
+            for other in self.buckets[key].values():
+                if other.user_id != ticket.user_id and abs(other.rating - ticket.rating) <= window:
+                    return other
+        return None
+
+
+class Matchmaker:
+    """Pairs online players of similar rating and sets up their match
+
+    Each worker pairs from an in-memory queue that mirrors the searching
+    tickets in `matchmaking_tickets`: every sweep applies the tickets written
+    since the last one (by updated_at), so players who joined through
+    different workers see each other, and a restarted worker reloads every
+    searching ticket (keeping their original join time, and so their
+    widened window). Workers may pick the same pair: both tickets are claimed
+    with a conditional update before a match is created, so a ticket ends up
+    in at most one match. The match has a deterministic id, and recover()
+    recreates one whose tickets were both claimed before a crash, or puts a
+    ticket claimed alone (the crash came between the two claims) back in the
+    queue.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, live_hub: Optional[LiveHub] = None, config: Optional[MatchmakingConfig] = None):
+        self.db_manager = db_manager
+        self.live_hub = live_hub
+        self.config = config or MatchmakingConfig()
+        self.queue = RatingBuckets(self.config.bucket_width)
+        self._lock = asyncio.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._synced_at: Optional[datetime] = None
+
+    @property
+    def collection(self):
+        return self.db_manager.db.matchmaking_tickets
+
+    async def start(self):
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("user_id", ASCENDING), ("enqueued_at", DESCENDING)])
+        await self.collection.create_index("status")
+        await self.collection.create_index("updated_at")
+        await self.recover()
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._run_sweeper())
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+    async def recover(self) -> int:
+        """Reload tickets that were still searching, and finish pairs claimed just before a crash"""
+        await self._expire_stored()
+        await self._repair_matches()
+        async with self._lock:
+            recovered = await self._sync(full=True)
+        if recovered:
+            logger.info(f"Recovered {recovered} matchmaking tickets")
+        return recovered
+
+    async def _sync(self, full: bool = False) -> int:
+        """Mirror the stored searching tickets, whichever worker took them; returns how many were added
+
+        A full sync reloads every searching ticket; otherwise only tickets
+        written since the previous sync are read, so a sweep costs the number
+        of changes rather than the size of the queue.
+        """
+        started = datetime.utcnow()
+        full = full or self._synced_at is None
+        if full:
+            query = {"status": TicketStatus.SEARCHING.value}
+        else:
+            query = {"updated_at": {"$gte": self._synced_at - timedelta(seconds=SYNC_OVERLAP_SECONDS)}}
+        documents = await self.collection.find(query).sort("enqueued_at", ASCENDING).to_list(length=None)
+        searching = [document for document in documents if document["status"] == TicketStatus.SEARCHING.value]
+        if full:
+            kept = {document["id"] for document in searching}
+            for ticket in self.queue.oldest_first():
+                if ticket.id not in kept:
+                    self.queue.remove(ticket.user_id)
+        else:
+            for document in documents:
+                queued = self.queue.get(document["user_id"])
+                if document["status"] != TicketStatus.SEARCHING.value and queued is not None and queued.id == document["id"]:
+                    self.queue.remove(document["user_id"])
+        added = 0
+        for document in searching:
+            if document["user_id"] not in self.queue:
+                self.queue.add(MatchmakingTicket(**document))
+                added += 1
+        self._synced_at = started
+        return added
+
+    async def _repair_matches(self):
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.config.ticket_ttl)
+        pairs: Dict[str, Dict[str, MatchmakingTicket]] = {}
+        async for document in self.collection.find({"status": TicketStatus.MATCHED.value, "matched_at": {"$gte": cutoff}}):
+            ticket = MatchmakingTicket(**document)
+            pairs.setdefault(ticket.match_id, {})[ticket.side] = ticket
+        for match_id, sides in pairs.items():
+            if await self.db_manager.db.matches.count_documents({"id": match_id}, limit=1):
+                continue
+            if len(sides) == 2:
+                await self._upsert_match(sides["home"], sides["away"], match_id)
+                logger.info(f"Recreated match {match_id} for tickets claimed before a restart")
+                continue
+            # No partner ticket and no match: the pairing died after claiming one side
+            ticket = next(iter(sides.values()))
+            if ticket.matched_at < now - timedelta(seconds=CLAIM_GRACE_SECONDS):
+                await self._release(ticket, match_id)
+                logger.info(f"Released ticket {ticket.id} from match {match_id}, whose pairing never finished")
+
+    def window(self, ticket: MatchmakingTicket, now: Optional[datetime] = None) -> int:
+        waited = ((now or datetime.utcnow()) - ticket.enqueued_at).total_seconds()
+        return min(self.config.max_window, int(self.config.initial_window + max(0.0, waited) * self.config.widen_per_second))
+
+    async def join(self, request: MatchmakingRequest) -> MatchmakingTicket:
+        """Queue a player (idempotent while they are already searching) and try to pair them straight away"""
+        waiting = self.queue.get(request.user_id)
+        if waiting is not None:
+            return waiting
+        # Possibly queued through another worker since the last sweep
+        stored = await self.collection.find_one({"user_id": request.user_id, "status": TicketStatus.SEARCHING.value})
+        if stored is not None:
+            return MatchmakingTicket(**stored)
+        profile = await self.db_manager.get_user_profile(request.user_id)
+        if profile is None:
+            raise ValueError("User not found")
+        if await self.db_manager.get_team(request.team_id) is None:
+            raise ValueError("Team not found")
+
+        ticket = MatchmakingTicket(
+            user_id=request.user_id,
+            team_id=request.team_id,
+            stadium_id=request.stadium_id,
+            rating=profile.rating,
+        )
+        await self.collection.insert_one(ticket.model_dump())
+        async with self._lock:
+            queued = self.queue.get(request.user_id)
+            if queued is not None and queued.id != ticket.id:
+                await self.collection.update_one(
+                    {"id": ticket.id}, {"$set": {"status": TicketStatus.CANCELLED.value, "updated_at": datetime.utcnow()}}
+                )
+                return queued
+            if queued is None:
+                self.queue.add(ticket)
+            else:
+                ticket = queued  # the same ticket, already mirrored by a sweep
+            await self._try_pair(ticket)
+        return ticket
+
+    async def cancel(self, user_id: str) -> bool:
+        """Cancel the player's searching ticket, wherever it was queued; False once it has been matched"""
+        async with self._lock:
+            self.queue.remove(user_id)
+        cancelled = await self.collection.update_many(
+            {"user_id": user_id, "status": TicketStatus.SEARCHING.value},
+            {"$set": {"status": TicketStatus.CANCELLED.value, "updated_at": datetime.utcnow()}}
+        )
+        matchmaking_tickets.inc(TicketStatus.CANCELLED.value, amount=cancelled.modified_count)
+        return cancelled.modified_count > 0
+
+    async def get_ticket(self, user_id: str) -> Optional[MatchmakingTicket]:
+        """The player's most recent ticket, as stored (another worker may have matched or cancelled it)"""
+        document = await self.collection.find_one({"user_id": user_id}, sort=[("enqueued_at", DESCENDING)])
+        return MatchmakingTicket(**document) if document else None
+
+    async def sweep(self):
+        """Expire stale tickets, then retry everyone, longest-waiting (widest window) first"""
+        async with self._lock:
+            await self._sync()
+            now = datetime.utcnow()
+            cutoff = now - timedelta(seconds=self.config.ticket_ttl)
+            expired = [ticket for ticket in self.queue.oldest_first() if ticket.enqueued_at < cutoff]
+            for ticket in expired:
+                self.queue.remove(ticket.user_id)
+            if expired:
+                await self._set_status(expired, TicketStatus.EXPIRED)
+            for ticket in self.queue.oldest_first():
+                if ticket.user_id in self.queue:
+                    await self._try_pair(ticket, now)
+
+    async def _run_sweeper(self):
+        while True:
+            await asyncio.sleep(self.config.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Matchmaking sweep failed: {e}")
+
+    async def _try_pair(self, ticket: MatchmakingTicket, now: Optional[datetime] = None) -> Optional[str]:
+        opponent = self.queue.nearest(ticket, self.window(ticket, now))
+        if opponent is None:
+            return None
+        # The longer-waiting player hosts
+        home, away = sorted((ticket, opponent), key=lambda queued: queued.enqueued_at)
+        self.queue.remove(home.user_id)
+        self.queue.remove(away.user_id)
+        match_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"matchmaking:{home.id}:{away.id}"))
+        # Another worker may hold either ticket: claim both before any match exists
+        if not await self._claim(home, match_id, "home"):
+            self.queue.add(away)
+            return None
+        if not await self._claim(away, match_id, "away"):
+            await self._release(home, match_id)
+            self.queue.add(home)
+            return None
+        try:
+            await self._upsert_match(home, away, match_id)
+        except Exception:
+            for claimed in (home, away):
+                await self._release(claimed, match_id)
+                self.queue.add(claimed)
+            raise
+
+        for claimed in (home, away):
+            matchmaking_wait.observe((claimed.matched_at - claimed.enqueued_at).total_seconds())
+        matchmaking_tickets.inc(TicketStatus.MATCHED.value, amount=2)
+        logger.info(f"Paired {home.user_id} ({home.rating}) with {away.user_id} ({away.rating}) in match {match_id}")
+        return match_id
+
+    async def _claim(self, ticket: MatchmakingTicket, match_id: str, side: str) -> bool:
+        matched_at = datetime.utcnow()
+        claimed = await self.collection.update_one(
+            {"id": ticket.id, "status": TicketStatus.SEARCHING.value},
+            {"$set": {"status": TicketStatus.MATCHED.value, "match_id": match_id, "side": side, "matched_at": matched_at, "updated_at": matched_at}},
+        )
+        if claimed.modified_count != 1:
+            return False
+        ticket.status, ticket.match_id, ticket.side, ticket.matched_at = TicketStatus.MATCHED, match_id, side, matched_at
+        return True
+
+    async def _release(self, ticket: MatchmakingTicket, match_id: str):
+        await self.collection.update_one(
+            {"id": ticket.id, "match_id": match_id},
+            {"$set": {"status": TicketStatus.SEARCHING.value, "match_id": None, "side": None, "matched_at": None, "updated_at": datetime.utcnow()}},
+        )
+        ticket.status, ticket.match_id, ticket.side, ticket.matched_at = TicketStatus.SEARCHING, None, None, None
+
+    async def _upsert_match(self, home: MatchmakingTicket, away: MatchmakingTicket, match_id: str):
+        match = Match(
+            id=match_id,
+            home_team_id=home.team_id,
+            away_team_id=away.team_id,
+            stadium_id=home.stadium_id or await self._home_stadium(home.team_id),
+            game_mode=GameMode.ONLINE,
+            player_id=home.user_id,
+            away_player_id=away.user_id,
+        )
+        await self.db_manager.db.matches.update_one({"id": match.id}, {"$setOnInsert": match.model_dump()}, upsert=True)
+        if self.live_hub is not None:
+            self.live_hub.open_room(match.id)
+
+    async def _home_stadium(self, team_id: str) -> str:
+        team = await self.db_manager.get_team(team_id)
+        stadium = await self.db_manager.db.stadiums.find_one({"name": team.stadium_name} if team else {}, {"_id": 0, "id": 1})
+        if stadium is None:
+            stadium = await self.db_manager.db.stadiums.find_one({}, {"_id": 0, "id": 1})
+        return stadium["id"] if stadium else ""
+
+    async def _set_status(self, tickets: List[MatchmakingTicket], status: TicketStatus):
+        for ticket in tickets:
+            ticket.status = status
+        await self.collection.update_many(
+            {"id": {"$in": [ticket.id for ticket in tickets]}, "status": TicketStatus.SEARCHING.value},
+            {"$set": {"status": status.value, "updated_at": datetime.utcnow()}}
+        )
+        matchmaking_tickets.inc(status.value, amount=len(tickets))
+
+    async def _expire_stored(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.config.ticket_ttl)
+        await self.collection.update_many(
+            {"status": TicketStatus.SEARCHING.value, "enqueued_at": {"$lt": cutoff}},
+            {"$set": {"status": TicketStatus.EXPIRED.value, "updated_at": datetime.utcnow()}},
+        )
@@ -0,0 +1,222 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+# Latency buckets in seconds, from 100µs up to 10s
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values
+
+    observe() is a dict lookup, a bisect and two additions, so it stays well
+    under a microsecond; cumulative bucket counts are only built in render().
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.label_names, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "football_master_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+))
+mongo_command_duration = registry.register(Histogram(
+    "football_master_mongo_command_duration_seconds",
+    "MongoDB command latency by collection and operation",
+    ("collection", "command"),
+))
+mongo_documents_returned = registry.register(Counter(
+    "football_master_mongo_documents_returned_total",
+    "Documents returned by MongoDB commands",
+    ("collection", "command"),
+))
+mongo_command_failures = registry.register(Counter(
+    "football_master_mongo_command_failures_total",
+    "Failed MongoDB commands",
+    ("collection", "command"),
+))
+analytics_reads = registry.register(Counter(
+    "football_master_analytics_reads_total",
+    "Calls to read-only analytics methods by the read preference they were routed with",
+    ("method", "read_preference"),
+))
+hydration_duration = registry.register(Histogram(
+    "football_master_hydration_seconds",
+    "Time spent building pydantic models from MongoDB documents",
+    ("model",),
+))
+hydrated_documents = registry.register(Counter(
+    "football_master_hydrated_documents_total",
+    "Documents turned into pydantic models",
+    ("model",),
+))
+event_loop_lag = registry.register(Histogram(
+    "football_master_event_loop_lag_seconds",
+    "How late the event loop ran a periodic probe callback",
+))
+event_loop_blocked = registry.register(Counter(
+    "football_master_event_loop_blocked_total",
+    "Event loop stalls longer than LOOP_LAG_THRESHOLD_MS",
+))
+offloaded_call_duration = registry.register(Histogram(
+    "football_master_offloaded_call_seconds",
+    "Latency of calls run off the event loop, by pool and function",
+    ("pool", "function"),
+))
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware recording request latency per route template
+
+    The template comes from the matched route (scope["route"]), so
+    /api/teams/abc and /api/teams/xyz share /api/teams/{team_id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+            )
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Records per-collection, per-operation command latency and result sizes"""
+
+    def __init__(self):
+        # (connection, request_id) -> (collection, command) for in-flight commands
+        self._pending: Dict[tuple, Tuple[str, str]] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else ""
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def succeeded(self, event):
+        collection, command = self._pending.pop((event.connection_id, event.request_id), ("", event.command_name))
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, collection, command)
+        cursor = event.reply.get("cursor")
+        if cursor:
+            returned = len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+            if returned:
+                mongo_documents_returned.inc(collection, command, amount=returned)
+
+    def failed(self, event):
+        collection, command = self._pending.pop((event.connection_id, event.request_id), ("", event.command_name))
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, collection, command)
+        mongo_command_failures.inc(collection, command)
+
+
+mongo_listener = MongoCommandListener()
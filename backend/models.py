@@ -23,6 +23,7 @@ class GameMode(str, Enum):
     TOURNAMENT = "tournament"
     FUTSAL = "futsal"
     ONLINE = "online"
+    LEAGUE = "league"
 
 class Player(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -61,6 +62,7 @@ class Team(BaseModel):
     stadium_capacity: int = Field(ge=1000, le=100000)
     budget: int = Field(ge=0, default=10000000)
     prestige: int = Field(ge=1, le=10, default=5)
+    elo_rating: int = Field(ge=0, default=1500)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Stadium(BaseModel):
@@ -81,6 +83,7 @@ class UserProfile(BaseModel):
     username: str
     email: str
     level: int = Field(ge=1, default=1)
+    rating: int = Field(ge=0, default=1200)
     experience: int = Field(ge=0, default=0)
     favorite_team_id: Optional[str] = None
     career_teams: List[str] = []
@@ -109,11 +112,43 @@ class Match(BaseModel):
     weather: str = "sunny"
     time_of_day: str = "day"
     completed: bool = False
+    rated: bool = False
     player_id: Optional[str] = None
+    away_player_id: Optional[str] = None
+    tournament_id: Optional[str] = None
+    league: Optional[str] = None
+    season: Optional[int] = Field(ge=1, default=None)
+    round: Optional[int] = Field(ge=1, default=None)
+    scheduled_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
     match_events: List[Dict[str, Any]] = []
     statistics: Dict[str, Any] = {}
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class MatchSummary(BaseModel):
+    """Match list row: everything but the event log and statistics"""
+    id: str
+    home_team_id: str
+    away_team_id: str
+    home_score: int = 0
+    away_score: int = 0
+    stadium_id: str
+    game_mode: GameMode
+    duration: int = 90
+    difficulty: int = 3
+    weather: str = "sunny"
+    time_of_day: str = "day"
+    completed: bool = False
+    player_id: Optional[str] = None
+    away_player_id: Optional[str] = None
+    tournament_id: Optional[str] = None
+    league: Optional[str] = None
+    season: Optional[int] = None
+    round: Optional[int] = None
+    scheduled_at: Optional[datetime] = None
+    event_count: int = 0
+    created_at: datetime
+
 class Tournament(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -164,4 +199,85 @@ class UniformKit(BaseModel):
     sponsor: str = "Generic"
     number_font: str = "standard"
     custom_design: Dict[str, Any] = {}
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    job_type: str
+    payload: Dict[str, Any] = {}
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = Field(ge=0, default=0)
+    max_attempts: int = Field(ge=1, default=3)
+    progress: float = Field(ge=0, le=1, default=0.0)
+    progress_message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    run_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class JobRequest(BaseModel):
+    job_type: str
+    payload: Dict[str, Any] = {}
+    max_attempts: int = Field(ge=1, le=10, default=3)
+
+class TicketStatus(str, Enum):
+    SEARCHING = "searching"
+    MATCHED = "matched"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+
+class MatchmakingTicket(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: str
+    team_id: str
+    stadium_id: Optional[str] = None
+    rating: int = Field(ge=0, default=1200)
+    status: TicketStatus = TicketStatus.SEARCHING
+    match_id: Optional[str] = None
+    side: Optional[str] = None
+    enqueued_at: datetime = Field(default_factory=datetime.utcnow)
+    matched_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class MatchmakingRequest(BaseModel):
+    user_id: str
+    team_id: str
+    stadium_id: Optional[str] = None
+
+class TransferRequest(BaseModel):
+    player_id: str
+    team_id: str  # the other club: the seller when buying, the buyer when selling
+    fee: Optional[int] = Field(default=None, ge=0)  # defaults to the asking price; buys pay at least it, sells get at most 2x
+
+class SaveInfo(BaseModel):
+    id: str
+    user_id: str
+    slot: str
+    version: int
+    snapshot_version: int  # deltas after this version are still chained
+    size: int  # bytes of the latest state
+    stored_bytes: int  # compressed snapshot plus stored deltas
+    chain_length: int
+    created_at: datetime
+    updated_at: datetime
+
+class RatingChange(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    subject_type: str  # "user" or "team"
+    subject_id: str
+    match_id: str
+    opponent_id: str
+    rating_before: int
+    rating_after: int
+    delta: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import Position
+
+# Generic player name pools (copyright-safe)
+FIRST_NAMES = [
+    "Alex", "Marco", "David", "Carlos", "João", "Miguel", "Antonio", "Luis", "Fernando", "Diego",
+    "André", "Pedro", "Rafael", "Gabriel", "Daniel", "Ricardo", "Paulo", "Bruno", "Sergio", "Manuel",
+    "José", "Francisco", "Roberto", "Eduardo", "Adrián", "Alejandro", "Gonzalo", "Martín", "Nicolás", "Sebastián"
+]
+
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Pereira", "Costa", "Rodrigues", "Martins", "Jesus", "Sousa", "Fernandes",
+    "Gonçalves", "Gomes", "Lopes", "Marques", "Alves", "Almeida", "Ribeiro", "Pinto", "Carvalho", "Teixeira",
+    "Moreira", "Ferreira", "Dias", "Mendes", "Nunes", "Correia", "Reis", "Antunes", "Fonseca", "Pires"
+]
+
+COUNTRIES = [
+    "Portugal", "Spain", "Brazil", "Argentina", "France", "Italy", "Germany", "England",
+    "Netherlands", "Belgium", "Croatia", "Colombia", "Mexico", "Chile", "Uruguay", "Morocco"
+]
+
+POSITIONS = [Position.GOALKEEPER, Position.DEFENDER, Position.MIDFIELDER, Position.FORWARD]
+POSITION_COUNTS = (3, 8, 8, 6)
+STATS = ("pace", "shooting", "passing", "defending", "physicality")
+
+# Stat bounds per position as (low floor, low offset, high cap, high offset):
+# low = max(floor, rating + offset), high = min(cap, rating + offset).
+# An offset of +/-999 makes that bound a plain constant.
+_K = 999
+_STAT_BOUNDS = np.array([
+    # goalkeeper
+    [(35, -_K, 55, _K), (15, -_K, 35, _K), (50, -15, 85, 5), (75, -5, 95, 5), (70, -10, 90, 5)],
+    # defender
+    [(45, -20, 85, 0), (25, -_K, 65, _K), (60, -15, 90, 5), (70, -5, 95, 5), (70, -10, 95, 5)],
+    # midfielder
+    [(50, -20, 85, 5), (45, -25, 85, 0), (70, -5, 95, 5), (40, -25, 85, 0), (55, -20, 85, 0)],
+    # forward
+    [(60, -15, 95, 5), (70, -5, 95, 5), (50, -20, 85, 0), (20, -_K, 50, _K), (60, -20, 90, 0)],
+], dtype=np.int64)
+
+# Mirrors DatabaseManager.calculate_player_value
+_VALUE_RATING_FLOORS = np.array([75, 80, 85, 90])
+_VALUE_BY_RATING = np.array([2_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000])
+_AGE_CEILINGS = np.array([21, 25, 29, 32])
+_AGE_MULTIPLIERS = np.array([1.5, 1.2, 1.0, 0.7, 0.4])
+_POSITION_MULTIPLIERS = np.array([0.8, 0.9, 1.0, 1.2])
+
+# Rosters below this many teams are generated in-process
+PARALLEL_THRESHOLD = 64
+
+
+def team_seed(team_name: str, base_seed: int = 0) -> int:
+    """Stable 64-bit seed for a team, independent of generation order"""
+    digest = hashlib.blake2b(f"{base_seed}:{team_name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def safe_randint(rng: np.random.Generator, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Vectorized randint clamped to 1-99; returns low where low >= high"""
+    low = np.maximum(1, low)
+    high = np.minimum(99, high)
+    return rng.integers(low, np.maximum(low, high), endpoint=True)
+
+
+def player_values(ratings: np.ndarray, position_codes: np.ndarray, ages: np.ndarray) -> np.ndarray:
+    base = _VALUE_BY_RATING[np.searchsorted(_VALUE_RATING_FLOORS, ratings, side="right")]
+    age_multiplier = _AGE_MULTIPLIERS[np.searchsorted(_AGE_CEILINGS, ages, side="left")]
+    values = (base * age_multiplier * _POSITION_MULTIPLIERS[position_codes]).astype(np.int64)
+    return np.maximum(100_000, values)
+
+
+def generate_roster_arrays(team_name: str, team_rating: int, base_seed: int = 0) -> dict:
+    """Generate a whole roster as column arrays with one vectorized draw per column"""
+    rng = np.random.default_rng(team_seed(team_name, base_seed))
+    position_codes = np.repeat(np.arange(len(POSITIONS)), POSITION_COUNTS)
+    slot = np.concatenate([np.arange(count) for count in POSITION_COUNTS])
+    is_star = slot < 2
+    size = len(position_codes)
+
+    star_ratings = team_rating + rng.integers(-2, 3, size=size, endpoint=True)
+    squad_ratings = team_rating - rng.integers(3, 12, size=size, endpoint=True)
+    ratings = np.clip(np.where(is_star, star_ratings, squad_ratings), 50, 99)
+
+    bounds = _STAT_BOUNDS[position_codes]  # (players, stats, 4)
+    rating_column = ratings[:, None]
+    low = np.maximum(bounds[..., 0], rating_column + bounds[..., 1])
+    high = np.minimum(bounds[..., 2], rating_column + bounds[..., 3])
+    stats = safe_randint(rng, low, high)
+
+    ages = rng.integers(18, 35, size=size, endpoint=True)
+    skill_moves = np.where(is_star & (position_codes == 3), 5, rng.integers(2, 4, size=size, endpoint=True))
+
+    columns = {
+        "position": position_codes,
+        "overall_rating": ratings,
+        "age": ages,
+        "value": player_values(ratings, position_codes, ages),
+        "stamina": rng.integers(75, 95, size=size, endpoint=True),
+        "skill_moves": skill_moves,
+        "weak_foot": rng.integers(2, 4, size=size, endpoint=True),
+        "first_name": rng.integers(0, len(FIRST_NAMES), size=size),
+        "last_name": rng.integers(0, len(LAST_NAMES), size=size),
+        "nationality": rng.integers(0, len(COUNTRIES), size=size),
+        "id_bytes": rng.bytes(16 * size),
+    }
+    for stat_index, stat in enumerate(STATS):
+        columns[stat] = stats[:, stat_index]
+    return columns
+
+
+def generate_roster(team_name: str, team_rating: int, base_seed: int = 0) -> List[dict]:
+    """Generate a reproducible roster as player dicts ready for Team(players=...)"""
+    columns = generate_roster_arrays(team_name, team_rating, base_seed)
+    id_bytes = columns["id_bytes"]
+    players = []
+    for row in range(len(columns["position"])):
+        player = {
+            "id": str(uuid.UUID(bytes=id_bytes[row * 16:(row + 1) * 16], version=4)),
+            "name": f"{FIRST_NAMES[columns['first_name'][row]]} {LAST_NAMES[columns['last_name'][row]]}",
+            "position": POSITIONS[columns["position"][row]],
+            "nationality": COUNTRIES[columns["nationality"][row]],
+        }
+        for field in ("overall_rating", "age", "value", "stamina", "skill_moves", "weak_foot") + STATS:
+            player[field] = int(columns[field][row])
+        players.append(player)
+    return players
+
+
+def _generate_chunk(teams: Sequence[Tuple[str, int]], base_seed: int) -> List[List[dict]]:
+    return [generate_roster(name, rating, base_seed) for name, rating in teams]
+
+
+def generate_rosters(teams: Sequence[Tuple[str, int]], base_seed: int = 0, processes: Optional[int] = None) -> List[List[dict]]:
+    """Generate rosters for many (team_name, team_rating) pairs, in a process pool when large
+
+    Output is identical whatever the process count, since each team draws from
+    its own seeded generator.
+    """
+    if len(teams) < PARALLEL_THRESHOLD or processes == 1:
+        return _generate_chunk(teams, base_seed)
+
+    workers = processes or os.cpu_count() or 1
+    chunk_size = max(1, -(-len(teams) // (workers * 4)))
+    chunks = [teams[start:start + chunk_size] for start in range(0, len(teams), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_generate_chunk, chunks, [base_seed] * len(chunks))
+        return [roster for chunk in results for roster in chunk]
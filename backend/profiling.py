@@ -0,0 +1,245 @@
+import contextvars
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import monitoring
+
+# Keys that are noise (or huge payloads) in a command summary
+_IGNORED_COMMAND_KEYS = {"lsid", "$db", "$clusterTime", "$readPreference", "documents", "txnNumber"}
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("profiling_trace", default=None)
+
+
+class ProfilerConfig:
+    """Profiler settings, read from .env
+
+    PROFILE_SAMPLE_RATE      fraction of requests traced (0 disables the profiler entirely)
+    PROFILE_SLOW_REQUEST_MS  traced requests at least this slow are kept
+    PROFILE_SLOW_QUERY_MS    any Mongo command at least this slow is kept (0 disables)
+    PROFILE_INTERVAL_MS      stack sampling interval while traced requests are in flight
+    PROFILE_BUFFER_SIZE      ring buffer capacity for slow requests and slow queries
+    """
+
+    def __init__(self):
+        self.sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+        self.slow_request_ms = float(os.environ.get("PROFILE_SLOW_REQUEST_MS", "250"))
+        self.slow_query_ms = float(os.environ.get("PROFILE_SLOW_QUERY_MS", "0"))
+        self.interval_ms = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+        self.buffer_size = int(os.environ.get("PROFILE_BUFFER_SIZE", "100"))
+
+
+class RequestTrace:
+    def __init__(self, method: str, path: str, thread_id: int):
+        self.method = method
+        self.path = path
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.commands: List[Dict[str, Any]] = []
+        self.samples: Counter = Counter()
+
+
+def summarize_command(command_name: str, command) -> Dict[str, Any]:
+    target = command.get(command_name)
+    if command_name == "getMore":
+        target = command.get("collection")
+    details = {key: value for key, value in command.items() if key not in _IGNORED_COMMAND_KEYS and key != command_name}
+    return {
+        "command": command_name,
+        "collection": target if isinstance(target, str) else "",
+        "details": repr(details)[:500],
+    }
+
+
+def fold_stack(frame, max_depth: int = 64) -> str:
+    """Collapse a frame chain into flamegraph 'folded' form, root first"""
+    parts = []
+    while frame is not None and len(parts) < max_depth:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class StackSampler:
+    """Background thread sampling the event-loop thread while traced requests are in flight
+
+    All requests in one worker share the loop thread, so a sample is credited to
+    every trace active at that moment; the sampler sleeps when none are.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[int, RequestTrace] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, trace: RequestTrace) -> None:
+        with self._lock:
+            self._active[id(trace)] = trace
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, trace: RequestTrace) -> None:
+        with self._lock:
+            self._active.pop(id(trace), None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                traces = list(self._active.values())
+            if not traces:
+                self._wakeup.clear()
+                self._wakeup.wait()
+                continue
+            frames = sys._current_frames()
+            folded: Dict[int, str] = {}
+            for trace in traces:
+                if trace.thread_id not in folded:
+                    frame = frames.get(trace.thread_id)
+                    folded[trace.thread_id] = fold_stack(frame) if frame is not None else ""
+                if folded[trace.thread_id]:
+                    trace.samples[folded[trace.thread_id]] += 1
+            time.sleep(self.interval)
+
+
+class Profiler:
+    """Slow-request and slow-query capture into bounded ring buffers"""
+
+    def __init__(self, config: Optional[ProfilerConfig] = None):
+        self.config = config or ProfilerConfig()
+        self.slow_requests: deque = deque(maxlen=self.config.buffer_size)
+        self.slow_queries: deque = deque(maxlen=self.config.buffer_size)
+        self.sampler = StackSampler(self.config.interval_ms / 1000)
+        self._ids = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.sample_rate > 0
+
+    @property
+    def listener_enabled(self) -> bool:
+        return self.enabled or self.config.slow_query_ms > 0
+
+    def start_trace(self, method: str, path: str) -> Optional[RequestTrace]:
+        if random.random() >= self.config.sample_rate:
+            return None
+        trace = RequestTrace(method, path, threading.get_ident())
+        self.sampler.add(trace)
+        return trace
+
+    def finish_trace(self, trace: RequestTrace, route: str, status: int) -> None:
+        self.sampler.remove(trace)
+        duration_ms = (time.perf_counter() - trace.started) * 1000
+        if duration_ms < self.config.slow_request_ms:
+            return
+        self.slow_requests.append({
+            "id": next(self._ids),
+            "method": trace.method,
+            "path": trace.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+            "captured_at": datetime.utcnow().isoformat(),
+            "commands": list(trace.commands),
+            "samples": sum(trace.samples.values()),
+            "stacks": [{"stack": stack, "count": count} for stack, count in trace.samples.most_common(50)],
+        })
+
+    def record_query(self, summary: Dict[str, Any], duration_ms: float) -> None:
+        trace = summary.pop("trace", None)
+        summary["duration_ms"] = round(duration_ms, 3)
+        if trace is not None:
+            trace.commands.append(summary)
+        if self.config.slow_query_ms > 0 and duration_ms >= self.config.slow_query_ms:
+            self.slow_queries.append(dict(summary, captured_at=datetime.utcnow().isoformat()))
+
+    def get_profile(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        for profile in self.slow_requests:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+
+class ProfilingCommandListener(monitoring.CommandListener):
+    """Attaches Mongo commands to the traced request that issued them
+
+    Motor copies contextvars into its executor threads, so the request's
+    trace is visible here.
+    """
+
+    def __init__(self, profiler: Profiler):
+        self.profiler = profiler
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+
+    def started(self, event):
+        trace = _current_trace.get()
+        if trace is None and self.profiler.config.slow_query_ms <= 0:
+            return
+        summary = summarize_command(event.command_name, event.command)
+        summary["trace"] = trace
+        self._pending[(event.connection_id, event.request_id)] = summary
+
+    def succeeded(self, event):
+        summary = self._pending.pop((event.connection_id, event.request_id), None)
+        if summary is not None:
+            self.profiler.record_query(summary, event.duration_micros / 1000)
+
+    def failed(self, event):
+        summary = self._pending.pop((event.connection_id, event.request_id), None)
+        if summary is not None:
+            summary["failure"] = str(event.failure)[:200]
+            self.profiler.record_query(summary, event.duration_micros / 1000)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware tracing a sampled fraction of requests; only installed when enabled"""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = self.profiler.start_trace(scope["method"], scope["path"])
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            route = scope.get("route")
+            self.profiler.finish_trace(trace, route.path if route is not None else scope["path"], status)
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    """Process-wide profiler, configured from the environment on first use"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
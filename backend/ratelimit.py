@@ -0,0 +1,231 @@
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from starlette.routing import compile_path
+
+from metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+# Token cost per request for the expensive cost class (scans, sorts, aggregations); everything else costs 1
+EXPENSIVE_ROUTES = (
+    "/api/search/teams",
+    "/api/search/players",
+    "/api/transfers/market",
+    "/api/leagues/{league}/table",
+    "/api/leaderboard",
+    "/api/archive/matches",
+)
+
+rate_limited_requests = registry.register(Counter(
+    "football_master_rate_limited_requests_total",
+    "Requests rejected with 429 by route cost",
+    ("cost",),
+))
+
+
+class RateLimitConfig:
+    """Rate limiting settings, read from .env
+
+    RATE_LIMIT_ENABLED              turn the middleware on or off
+    RATE_LIMIT_CAPACITY             bucket size in tokens (the burst a client may spend at once)
+    RATE_LIMIT_REFILL_PER_SECOND    tokens added back per second (the sustained rate)
+    RATE_LIMIT_EXPENSIVE_COST       tokens per request to an EXPENSIVE_ROUTES route
+    RATE_LIMIT_ROUTE_COSTS          per-route overrides, e.g. "/api/search/players=20,/api/teams=2"
+    RATE_LIMIT_MAX_CLIENTS          buckets kept in memory; the least recently seen client is dropped first
+    RATE_LIMIT_TRUST_FORWARDED      key clients by the first X-Forwarded-For address (only behind a trusted proxy)
+    RATE_LIMIT_REDIS                share buckets across workers through REDIS_URL
+    RATE_LIMIT_API_KEYS             comma-separated API keys that get their own bucket; any other
+                                    X-API-Key is ignored and the client is keyed by IP
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.capacity = float(os.environ.get("RATE_LIMIT_CAPACITY", "60"))
+        self.refill_per_second = float(os.environ.get("RATE_LIMIT_REFILL_PER_SECOND", "10"))
+        self.max_clients = int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "10000"))
+        self.trust_forwarded = os.environ.get("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+        self.use_redis = os.environ.get("RATE_LIMIT_REDIS", "false").lower() in ("1", "true", "yes")
+        self.api_keys = frozenset(filter(None, (key.strip() for key in os.environ.get("RATE_LIMIT_API_KEYS", "").split(","))))
+        expensive = float(os.environ.get("RATE_LIMIT_EXPENSIVE_COST", "10"))
+        self.route_costs: Dict[str, float] = {route: expensive for route in EXPENSIVE_ROUTES}
+        for entry in filter(None, os.environ.get("RATE_LIMIT_ROUTE_COSTS", "").split(",")):
+            route, _, cost = entry.partition("=")
+            self.route_costs[route.strip()] = float(cost)
+
+
+class TokenBuckets:
+    """In-process token buckets: two floats per client, bounded by an LRU"""
+
+    def __init__(self, capacity: float, refill_per_second: float, max_clients: int):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, client: str, cost: float, now: Optional[float] = None) -> Tuple[bool, float]:
+        """Spend cost tokens if the client has them; returns (allowed, tokens left)"""
+        now = time.monotonic() if now is None else now
+        tokens, updated = self._buckets.get(client, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[client] = (tokens, now)
+        self._buckets.move_to_end(client)
+        # A dropped client comes back with a full bucket, which is what it would have refilled to when idle
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+# Atomic refill-and-take on a hash {t: tokens, u: updated (seconds)}, timed by the Redis clock
+# so workers with skewed clocks agree. Full buckets expire, since a missing bucket is a full one.
+TAKE_SCRIPT = """
+local capacity, rate, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisTokenBuckets:
+    """Token buckets shared by every worker, one small hash per client in Redis"""
+
+    def __init__(self, client, capacity: float, refill_per_second: float, prefix: str = "football_master:ratelimit"):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    async def take(self, client: str, cost: float) -> Tuple[bool, float]:
+        allowed, tokens = await self._take(keys=[f"{self.prefix}:{client}"], args=[self.capacity, self.refill_per_second, cost])
+        return bool(int(allowed)), float(tokens)
+
+
+class RateLimiter:
+    """Per-client token buckets with route cost classes, local or shared
+
+    A Redis failure falls back to the local buckets for that request, so a
+    broken shared backend degrades to per-worker limits instead of errors.
+    """
+
+    def __init__(self, config: Optional[RateLimitConfig] = None, shared: Optional[RedisTokenBuckets] = None):
+        self.config = config or RateLimitConfig()
+        self.local = TokenBuckets(self.config.capacity, self.config.refill_per_second, self.config.max_clients)
+        self.shared = shared
+        self._routes: List[Tuple[Pattern, float]] = [
+            (compile_path(route)[0], cost) for route, cost in self.config.route_costs.items()
+        ]
+
+    def cost(self, path: str) -> float:
+        for pattern, cost in self._routes:
+            if pattern.match(path):
+                return min(cost, self.config.capacity)
+        return 1.0
+
+    def client_key(self, scope) -> str:
+        # Only configured keys count: an arbitrary X-API-Key would otherwise buy a fresh bucket per request
+        headers = dict(scope.get("headers") or [])
+        api_key = headers.get(b"x-api-key")
+        if api_key and api_key.decode("latin-1") in self.config.api_keys:
+            return "key:" + api_key.decode("latin-1")
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded and self.config.trust_forwarded:
+            return "ip:" + forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def take(self, client: str, cost: float) -> Tuple[bool, float]:
+        if self.shared is not None:
+            try:
+                return await self.shared.take(client, cost)
+            except Exception as e:
+                logger.warning(f"Shared rate limit backend failed, using local buckets: {e}")
+        return self.local.take(client, cost)
+
+    def retry_after(self, tokens: float, cost: float) -> int:
+        """Whole seconds until the bucket holds cost tokens again"""
+        return max(1, math.ceil((cost - tokens) / self.config.refill_per_second))
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware answering 429 with Retry-After once a client's bucket runs dry
+
+    Only /api HTTP requests are limited (not CORS preflights, WebSockets or
+    /metrics). Allowed responses carry X-RateLimit-Remaining.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        cost = self.limiter.cost(scope["path"])
+        allowed, tokens = await self.limiter.take(self.limiter.client_key(scope), cost)
+        limit_headers = [
+            (b"x-ratelimit-limit", str(int(self.limiter.config.capacity)).encode()),
+            (b"x-ratelimit-remaining", str(int(tokens)).encode()),
+        ]
+        if not allowed:
+            rate_limited_requests.inc(f"{cost:g}")
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.limiter.retry_after(tokens, cost)).encode()),
+                    *limit_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *limit_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """Build the limiter from RATE_LIMIT_* settings; None when disabled"""
+    config = RateLimitConfig()
+    if not config.enabled:
+        return None
+    redis_url = os.environ.get("REDIS_URL")
+    if not (config.use_redis and redis_url):
+        return RateLimiter(config)
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("RATE_LIMIT_REDIS is set but the redis package is not installed; using local buckets only")
+        return RateLimiter(config)
+    shared = RedisTokenBuckets(aioredis.from_url(redis_url), config.capacity, config.refill_per_second)
+    return RateLimiter(config, shared)
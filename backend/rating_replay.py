@@ -0,0 +1,65 @@
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+def match_layers(home: Sequence[int], away: Sequence[int], frozen: np.ndarray) -> np.ndarray:
+    """Give each match the earliest layer after both sides' previous matches
+
+    Matches in one layer share no (unfrozen) participant, so a layer can be
+    rated in one vectorized step while every participant still sees its own
+    matches in chronological order, which is all Elo depends on.
+    """
+    last_layer = np.full(len(frozen), -1, dtype=np.int64)
+    layers = np.empty(len(home), dtype=np.int64)
+    for position, (home_index, away_index) in enumerate(zip(home, away)):
+        layer = max(last_layer[home_index], last_layer[away_index]) + 1
+        layers[position] = layer
+        if not frozen[home_index]:
+            last_layer[home_index] = layer
+        if not frozen[away_index]:
+            last_layer[away_index] = layer
+    return layers
+
+
+def replay_elo(
+    home: Sequence[int],
+    away: Sequence[int],
+    home_goals: Sequence[int],
+    away_goals: Sequence[int],
+    initial: Sequence[float],
+    frozen: Sequence[bool],
+    k_factor: float,
+) -> Dict[str, np.ndarray]:
+    """Rate matches (oldest first) between participant indices from their initial ratings
+
+    Frozen participants (AI opponents) keep their rating. Deltas are rounded
+    like ratings.elo_delta, so a replay reproduces the incremental updates.
+    Returns final ratings plus each match's ratings before and deltas.
+    Module-level and numpy-only so it can run in a process pool.
+    """
+    home = np.asarray(home, dtype=np.int64)
+    away = np.asarray(away, dtype=np.int64)
+    home_goals = np.asarray(home_goals, dtype=np.int64)
+    away_goals = np.asarray(away_goals, dtype=np.int64)
+    ratings = np.asarray(initial, dtype=np.float64).copy()
+    frozen = np.asarray(frozen, dtype=bool)
+
+    score = np.where(home_goals > away_goals, 1.0, np.where(home_goals == away_goals, 0.5, 0.0))
+    margin = np.abs(home_goals - away_goals)
+    multiplier = np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11 + margin) / 8))
+
+    home_before = np.empty(len(home), dtype=np.float64)
+    away_before = np.empty(len(home), dtype=np.float64)
+    delta = np.empty(len(home), dtype=np.float64)
+    layers = match_layers(home, away, frozen)
+    order = np.argsort(layers, kind="stable")
+    boundaries = np.flatnonzero(np.diff(layers[order])) + 1
+    for rows in np.split(order, boundaries):
+        home_rating, away_rating = ratings[home[rows]], ratings[away[rows]]
+        expected = 1.0 / (1.0 + 10 ** ((away_rating - home_rating) / 400))
+        step = np.rint(k_factor * multiplier[rows] * (score[rows] - expected))
+        home_before[rows], away_before[rows], delta[rows] = home_rating, away_rating, step
+        ratings[home[rows]] = np.where(frozen[home[rows]], home_rating, home_rating + step)
+        ratings[away[rows]] = np.where(frozen[away[rows]], away_rating, away_rating - step)
+    return {"ratings": ratings, "home_before": home_before, "away_before": away_before, "delta": delta}
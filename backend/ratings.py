@@ -0,0 +1,317 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from archive import MatchArchive
+from database import DatabaseManager, analytics_read
+from executors import run_cpu
+from models import Match, RatingChange, Team, UserProfile
+
+logger = logging.getLogger(__name__)
+
+USER_DEFAULT = UserProfile.model_fields["rating"].default
+TEAM_DEFAULT = Team.model_fields["elo_rating"].default
+HISTORY_CHUNK = 5000
+REBUILD_LEASE_ID = "ratings"
+
+
+class RatingConfig:
+    """Elo settings, read from .env
+
+    RATING_K_FACTOR               points at stake per match before the goal-margin multiplier
+    RATING_AI_BASE                rating of the AI opponent at difficulty 3
+    RATING_AI_STEP                rating added or removed per difficulty level
+    RATING_REBUILD_LEASE_SECONDS  how long a rebuild holds off apply_match if it dies without releasing its lease
+    """
+
+    def __init__(self):
+        self.k_factor = float(os.environ.get("RATING_K_FACTOR", "32"))
+        self.ai_base = int(os.environ.get("RATING_AI_BASE", "1200"))
+        self.ai_step = int(os.environ.get("RATING_AI_STEP", "200"))
+        self.rebuild_lease_seconds = float(os.environ.get("RATING_REBUILD_LEASE_SECONDS", "3600"))
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / 400))
+
+
+def goal_multiplier(margin: int) -> float:
+    """World Football Elo margin weighting: wins by more goals move ratings further"""
+    margin = abs(margin)
+    if margin <= 1:
+        return 1.0
+    return 1.5 if margin == 2 else (11 + margin) / 8
+
+
+def elo_delta(home_rating: float, away_rating: float, home_goals: int, away_goals: int, k_factor: float) -> int:
+    """Points the home side gains (the away side loses the same)"""
+    score = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+    return int(round(k_factor * goal_multiplier(home_goals - away_goals) * (score - expected_score(home_rating, away_rating))))
+
+
+def ai_rating(difficulty: int, config: RatingConfig) -> int:
+    return config.ai_base + (difficulty - 3) * config.ai_step
+
+
+def recommended_difficulty(rating: float, config: RatingConfig) -> int:
+    """The AI difficulty whose rating is closest to the player's"""
+    return max(1, min(5, round(3 + (rating - config.ai_base) / config.ai_step)))
+
+
+class RatingService:
+    """Elo ratings for users and teams, updated as each match completes
+
+    Teams are rated on every completed match. The user behind player_id is
+    rated against away_player_id online, otherwise against the AI at the
+    match difficulty (AI ratings never move). A match is claimed with its
+    `rated` flag before any rating changes, so completing it twice rates it once;
+    the claim is released if rating fails. Matches are rated in completion
+    order, and rebuild() replays them in that order (completed_at).
+
+    A rebuild holds a lease (`rating_leases`) while it replays and rewrites
+    ratings; apply_match leaves matches unrated meanwhile, since the rewrite
+    would overwrite its increments, and the rebuild rates them once done.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, config: Optional[RatingConfig] = None):
+        self.db_manager = db_manager
+        self.config = config or RatingConfig()
+
+    @property
+    def db(self):
+        return self.db_manager.db
+
+    async def ensure_indexes(self):
+        await self.db.rating_history.create_index([("subject_id", ASCENDING), ("created_at", DESCENDING)])
+        await self.db.user_profiles.create_index([("rating", DESCENDING)])
+
+    async def apply_match(self, match_id: str) -> Optional[Dict[str, Any]]:
+        """Rate a completed match once; returns the deltas, or None if it was already rated or a rebuild will rate it"""
+        if await self._rebuilding():
+            return None
+        claimed = await self.db.matches.update_one(
+            {"id": match_id, "completed": True, "rated": {"$ne": True}},
+            {"$set": {"rated": True}}
+        )
+        if not claimed.modified_count:
+            return None
+        try:
+            return await self._rate(match_id)
+        except Exception:
+            # Give the claim back so the match can be rated again rather than silently lost
+            await self.db.matches.update_one({"id": match_id}, {"$set": {"rated": False}})
+            logger.exception(f"Rating match {match_id} failed; claim released")
+            raise
+
+    async def _rate(self, match_id: str) -> Optional[Dict[str, Any]]:
+        # Every read and delta first, then the writes, so a failure while reading writes nothing
+        match = await self.db_manager.get_match(match_id)
+        result: Dict[str, Any] = {"match_id": match_id}
+        team_changes: List[RatingChange] = []
+        user_changes: List[RatingChange] = []
+
+        if match.home_team_id != match.away_team_id:
+            teams = await self._current(self.db.teams, "elo_rating", TEAM_DEFAULT, [match.home_team_id, match.away_team_id])
+            delta = elo_delta(teams[match.home_team_id], teams[match.away_team_id], match.home_score, match.away_score, self.config.k_factor)
+            team_changes = self._changes("team", match, match.home_team_id, match.away_team_id, teams, delta)
+            result["team_delta"] = delta
+
+        if match.player_id:
+            users = await self._current(self.db.user_profiles, "rating", USER_DEFAULT, [match.player_id, match.away_player_id])
+            opponent = match.away_player_id or f"ai:{match.difficulty}"
+            users.setdefault(opponent, ai_rating(match.difficulty, self.config))
+            delta = elo_delta(users[match.player_id], users[opponent], match.home_score, match.away_score, self.config.k_factor)
+            user_changes = self._changes("user", match, match.player_id, opponent, users, delta)
+            if not match.away_player_id:
+                user_changes = user_changes[:1]
+            result["user_delta"] = delta
+
+        if await self._rebuilding():
+            # A rebuild started while this match was being read: it replays the match itself
+            await self.db.matches.update_one({"id": match_id}, {"$set": {"rated": False}})
+            return None
+        if team_changes:
+            await self._increment(self.db.teams, "elo_rating", TEAM_DEFAULT, team_changes)
+            # Only the two teams' own entries: Elo is not a roster change, so lists keep their
+            # cached copies (Elo there may lag by CACHE_TTL_SECONDS) and the roster index stays valid
+            await self.db_manager.cache.discard("teams", f"id:{match.home_team_id}", f"id:{match.away_team_id}")
+        if user_changes:
+            await self._increment(self.db.user_profiles, "rating", USER_DEFAULT, user_changes)
+        if team_changes or user_changes:
+            await self.db.rating_history.insert_many([change.model_dump() for change in team_changes + user_changes])
+        return result
+
+    async def history(self, subject_id: str, limit: int = 50) -> List[RatingChange]:
+        cursor = self.db.rating_history.find({"subject_id": subject_id}).sort("created_at", DESCENDING).limit(limit)
+        return [RatingChange(**document) for document in await cursor.to_list(length=limit)]
+
+    @analytics_read
+    async def leaderboard(self, limit: int = 50) -> List[Dict[str, Any]]:
+        cursor = self.db.user_profiles.find(
+            {}, {"_id": 0, "id": 1, "username": 1, "rating": 1, "level": 1}
+        ).sort("rating", DESCENDING).limit(limit)
+        return [
+            {**user, "rating": user.get("rating", USER_DEFAULT)} for user in await cursor.to_list(length=limit)
+        ]
+
+    async def rebuild(self, progress: Optional[Callable[[float, str], Awaitable[None]]] = None) -> Dict[str, int]:
+        """Recompute every rating and the whole history by replaying completed matches (archived too), oldest first
+
+        The replay runs vectorized in the process pool (see rating_replay),
+        then ratings and history are rewritten in bulk. Only the replayed
+        matches are marked rated; any completed meanwhile are rated one by
+        one after the lease is released.
+        """
+        owner = await self._acquire_rebuild_lease()
+        try:
+            summary = await self._rebuild(progress)
+        finally:
+            await self.db.rating_leases.delete_one({"_id": REBUILD_LEASE_ID, "owner": owner})
+        late = await self.db.matches.find(
+            {"completed": True, "rated": {"$ne": True}}, {"_id": 0, "id": 1, "completed_at": 1, "created_at": 1}
+        ).to_list(length=None)
+        late.sort(key=lambda match: match.get("completed_at") or match["created_at"])
+        for match in late:
+            await self.apply_match(match["id"])
+        summary["rated_after"] = len(late)
+        return summary
+
+    async def _rebuild(self, progress: Optional[Callable[[float, str], Awaitable[None]]]) -> Dict[str, int]:
+        from rating_replay import replay_elo
+
+        fields = ["id", "home_team_id", "away_team_id", "player_id", "away_player_id", "home_score", "away_score", "difficulty", "created_at", "completed_at"]
+        matches = [match async for match in MatchArchive(self.db_manager).iter_matches(fields)]
+        hot = await self.db.matches.find(
+            {"completed": True}, {"_id": 0, **{field: 1 for field in fields}}
+        ).to_list(length=None)
+        matches += hot
+        # Completion order is the order apply_match rated them in; matches from before completed_at fall back to created_at
+        matches.sort(key=lambda match: match.get("completed_at") or match["created_at"])
+        if progress:
+            await progress(0.1, f"Replaying {len(matches)} matches")
+
+        participants: Dict[Tuple[str, str], int] = {}
+        initial: List[float] = []
+        frozen: List[bool] = []
+
+        def index(subject_type: str, subject_id: str, rating: float, is_frozen: bool = False) -> int:
+            key = (subject_type, subject_id)
+            if key not in participants:
+                participants[key] = len(initial)
+                initial.append(rating)
+                frozen.append(is_frozen)
+            return participants[key]
+
+        rows: List[Tuple[str, dict]] = []
+        home, away, home_goals, away_goals = [], [], [], []
+        for match in matches:
+            sides = []
+            if match["home_team_id"] != match["away_team_id"]:
+                sides.append(("team", index("team", match["home_team_id"], TEAM_DEFAULT), index("team", match["away_team_id"], TEAM_DEFAULT)))
+            if match.get("player_id"):
+                difficulty = match.get("difficulty", 3)
+                opponent = (
+                    index("user", match["away_player_id"], USER_DEFAULT) if match.get("away_player_id")
+                    else index("ai", str(difficulty), ai_rating(difficulty, self.config), True)
+                )
+                sides.append(("user", index("user", match["player_id"], USER_DEFAULT), opponent))
+            for subject_type, home_index, away_index in sides:
+                rows.append((subject_type, match))
+                home.append(home_index)
+                away.append(away_index)
+                home_goals.append(match["home_score"])
+                away_goals.append(match["away_score"])
+
+        replay = await run_cpu(replay_elo, home, away, home_goals, away_goals, initial, frozen, self.config.k_factor)
+        if progress:
+            await progress(0.5, "Writing ratings")
+
+        ratings = replay["ratings"]
+        subject_ids = {index_: key for key, index_ in participants.items()}
+        await self.db.teams.update_many({}, {"$set": {"elo_rating": TEAM_DEFAULT}})
+        await self.db.user_profiles.update_many({}, {"$set": {"rating": USER_DEFAULT}})
+        team_updates = [UpdateOne({"id": key[1]}, {"$set": {"elo_rating": int(ratings[i])}}) for i, key in subject_ids.items() if key[0] == "team"]
+        user_updates = [UpdateOne({"id": key[1]}, {"$set": {"rating": int(ratings[i])}}) for i, key in subject_ids.items() if key[0] == "user"]
+        if team_updates:
+            await self.db.teams.bulk_write(team_updates, ordered=False)
+        if user_updates:
+            await self.db.user_profiles.bulk_write(user_updates, ordered=False)
+        await self.db_manager.cache.invalidate("teams")
+
+        history = []
+        for row, ((subject_type, match), home_index, away_index) in enumerate(zip(rows, home, away)):
+            delta = int(replay["delta"][row])
+            before = (int(replay["home_before"][row]), int(replay["away_before"][row]))
+            for subject_index, opponent_index, rating_before, signed in ((home_index, away_index, before[0], delta), (away_index, home_index, before[1], -delta)):
+                if frozen[subject_index]:
+                    continue
+                history.append(RatingChange(
+                    subject_type=subject_type,
+                    subject_id=subject_ids[subject_index][1],
+                    match_id=match["id"],
+                    opponent_id=self._opponent_id(subject_ids[opponent_index]),
+                    rating_before=rating_before,
+                    rating_after=rating_before + signed,
+                    delta=signed,
+                    created_at=match.get("completed_at") or match.get("created_at") or datetime.utcnow(),
+                ).model_dump())
+        await self.db.rating_history.delete_many({})
+        for start in range(0, len(history), HISTORY_CHUNK):
+            await self.db.rating_history.insert_many(history[start:start + HISTORY_CHUNK], ordered=False)
+        replayed = [match["id"] for match in hot]
+        for start in range(0, len(replayed), HISTORY_CHUNK):
+            await self.db.matches.update_many({"id": {"$in": replayed[start:start + HISTORY_CHUNK]}}, {"$set": {"rated": True}})
+
+        logger.info(f"Rebuilt ratings from {len(matches)} matches ({len(team_updates)} teams, {len(user_updates)} users)")
+        return {"matches": len(matches), "teams": len(team_updates), "users": len(user_updates), "history": len(history)}
+
+    async def _acquire_rebuild_lease(self) -> str:
+        now = datetime.utcnow()
+        owner = uuid.uuid4().hex
+        await self.db.rating_leases.delete_one({"_id": REBUILD_LEASE_ID, "expires_at": {"$lt": now}})
+        try:
+            await self.db.rating_leases.insert_one({
+                "_id": REBUILD_LEASE_ID, "owner": owner,
+                "expires_at": now + timedelta(seconds=self.config.rebuild_lease_seconds),
+            })
+        except DuplicateKeyError:
+            raise RuntimeError("A rating rebuild is already running")
+        return owner
+
+    async def _rebuilding(self) -> bool:
+        return await self.db.rating_leases.find_one(
+            {"_id": REBUILD_LEASE_ID, "expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1}
+        ) is not None
+
+    @staticmethod
+    def _opponent_id(key: Tuple[str, str]) -> str:
+        return f"ai:{key[1]}" if key[0] == "ai" else key[1]
+
+    async def _current(self, collection, field: str, default: int, ids: List[Optional[str]]) -> Dict[str, int]:
+        ids = [subject_id for subject_id in ids if subject_id]
+        documents = await collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, field: 1}).to_list(length=None)
+        current = {document["id"]: document.get(field, default) for document in documents}
+        return {subject_id: current.get(subject_id, default) for subject_id in ids}
+
+    def _changes(self, subject_type: str, match: Match, home_id: str, away_id: str, ratings: Dict[str, int], delta: int) -> List[RatingChange]:
+        return [
+            RatingChange(
+                subject_type=subject_type, subject_id=subject_id, match_id=match.id, opponent_id=opponent_id,
+                rating_before=ratings[subject_id], rating_after=ratings[subject_id] + signed, delta=signed,
+            )
+            for subject_id, opponent_id, signed in ((home_id, away_id, delta), (away_id, home_id, -delta))
+        ]
+
+    async def _increment(self, collection, field: str, default: int, changes: List[RatingChange]):
+        """$inc so concurrent matches of the same subject both count; documents predating the field start at default"""
+        ids = [change.subject_id for change in changes]
+        await collection.update_many({"id": {"$in": ids}, field: {"$exists": False}}, {"$set": {field: default}})
+        await collection.bulk_write(
+            [UpdateOne({"id": change.subject_id}, {"$inc": {field: change.delta}}) for change in changes],
+            ordered=False
+        )
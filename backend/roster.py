@@ -0,0 +1,166 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models import Formation, Player, Position
+
+# Position <-> compact code used in the position column
+POSITIONS = [Position.GOALKEEPER, Position.DEFENDER, Position.MIDFIELDER, Position.FORWARD]
+POSITION_CODES = {position: code for code, position in enumerate(POSITIONS)}
+
+ATTRIBUTES = ("overall_rating", "pace", "shooting", "passing", "defending", "physicality", "age", "stamina", "skill_moves", "weak_foot")
+
+# One row per player; attributes are 1-99 so they fit in a byte
+PLAYER_DTYPE = np.dtype(
+    [("team", np.int32), ("position", np.int8)]
+    + [(name, np.uint8) for name in ATTRIBUTES]
+    + [("is_custom", np.bool_), ("value", np.int64), ("created_at", "datetime64[ms]")]
+)
+
+
+class RosterIndex:
+    """Read-only, columnar view of every roster in the catalog
+
+    Players are stored as one NumPy structured array with each team's players
+    contiguous, so scans (search, ratings, market filters) are vectorized and a
+    roster costs ~30 bytes of numeric data per player instead of a pydantic
+    model. Player models are only built for rows that leave through the API.
+    """
+
+    __slots__ = (
+        "team_ids", "team_names", "team_formations", "team_positions", "offsets",
+        "players", "player_ids", "names", "names_lower", "nationalities",
+    )
+
+    def __init__(self, team_ids: List[str], team_names: List[str], team_formations: List[str], offsets: np.ndarray,
+                 players: np.ndarray, player_ids: np.ndarray, names: np.ndarray, nationalities: np.ndarray):
+        self.team_ids = team_ids
+        self.team_names = team_names
+        self.team_formations = team_formations
+        self.team_positions: Dict[str, int] = {team_id: index for index, team_id in enumerate(team_ids)}
+        self.offsets = offsets
+        self.players = players
+        self.player_ids = player_ids
+        self.names = names
+        self.names_lower = np.char.lower(names)
+        self.nationalities = nationalities
+
+    @classmethod
+    def from_documents(cls, team_documents: Iterable[dict]) -> "RosterIndex":
+        """Build from raw team documents (only id, name, formation and players are read)"""
+        team_ids, team_names, team_formations, offsets = [], [], [], [0]
+        columns: Dict[str, list] = {name: [] for name in PLAYER_DTYPE.names}
+        player_ids, names, nationalities = [], [], []
+
+        for team_index, team in enumerate(team_documents):
+            team_ids.append(team["id"])
+            team_names.append(team["name"])
+            team_formations.append(team.get("formation", Formation.F_4_4_2))
+            for player in team.get("players", []):
+                columns["team"].append(team_index)
+                columns["position"].append(POSITION_CODES[Position(player["position"])])
+                for name in ATTRIBUTES:
+                    columns[name].append(player.get(name, 0))
+                columns["is_custom"].append(player.get("is_custom", False))
+                columns["value"].append(player.get("value", 0))
+                columns["created_at"].append(player.get("created_at") or datetime.utcnow())
+                player_ids.append(player["id"])
+                names.append(player["name"])
+                nationalities.append(player["nationality"])
+            offsets.append(len(player_ids))
+
+        players = np.empty(len(player_ids), dtype=PLAYER_DTYPE)
+        for name in PLAYER_DTYPE.names:
+            players[name] = np.array(columns[name], dtype=PLAYER_DTYPE[name])
+
+        return cls(
+            team_ids,
+            team_names,
+            team_formations,
+            np.array(offsets, dtype=np.int64),
+            players,
+            np.array(player_ids, dtype=object),
+            np.array(names, dtype=str),
+            np.array(nationalities, dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index (numeric columns and string data)"""
+        strings = sum(len(value) for value in self.player_ids) + sum(len(value) for value in self.nationalities)
+        return self.players.nbytes + self.names.nbytes + self.names_lower.nbytes + self.offsets.nbytes + strings
+
+    def team_rows(self, team_id: str) -> Optional[np.ndarray]:
+        team_index = self.team_positions.get(team_id)
+        if team_index is None:
+            return None
+        return np.arange(self.offsets[team_index], self.offsets[team_index + 1])
+
+    def search(self, query: str, position: Optional[Position] = None, limit: int = 10) -> np.ndarray:
+        """Rows whose name contains query (case-insensitive), in catalog order"""
+        mask = np.char.find(self.names_lower, query.lower()) >= 0
+        if position is not None:
+            mask &= self.players["position"] == POSITION_CODES[position]
+        return np.flatnonzero(mask)[:limit]
+
+    def market(
+        self,
+        position: Optional[Position] = None,
+        min_rating: int = 1,
+        max_rating: int = 99,
+        min_age: int = 16,
+        max_age: int = 40,
+        min_value: int = 0,
+        max_value: Optional[int] = None,
+        exclude_team_id: Optional[str] = None,
+        sort: str = "value",
+        limit: int = 20,
+    ) -> np.ndarray:
+        """Rows matching the transfer-market filters, best first by sort ("value", "rating" or "age")"""
+        players = self.players
+        mask = (
+            (players["overall_rating"] >= min_rating) & (players["overall_rating"] <= max_rating)
+            & (players["age"] >= min_age) & (players["age"] <= max_age)
+            & (players["value"] >= min_value)
+        )
+        if max_value is not None:
+            mask &= players["value"] <= max_value
+        if position is not None:
+            mask &= players["position"] == POSITION_CODES[position]
+        excluded = self.team_positions.get(exclude_team_id) if exclude_team_id else None
+        if excluded is not None:
+            mask &= players["team"] != excluded
+        rows = np.flatnonzero(mask)
+        if sort == "age":
+            keys = players["age"][rows].astype(np.int64)
+        else:
+            keys = -(players["value"][rows] if sort == "value" else players["overall_rating"][rows].astype(np.int64))
+        if len(rows) > limit:
+            # Partial sort: only the page has to be ordered
+            top = np.argpartition(keys, limit - 1)[:limit]
+            rows, keys = rows[top], keys[top]
+        return rows[np.argsort(keys, kind="stable")]
+
+    def team_of(self, row: int) -> Tuple[str, str]:
+        team_index = int(self.players["team"][row])
+        return self.team_ids[team_index], self.team_names[team_index]
+
+    def to_player(self, row: int) -> Player:
+        record = self.players[row]
+        return Player(
+            id=self.player_ids[row],
+            name=str(self.names[row]),
+            position=POSITIONS[record["position"]],
+            nationality=self.nationalities[row],
+            is_custom=bool(record["is_custom"]),
+            value=int(record["value"]),
+            created_at=record["created_at"].astype(datetime),
+            **{name: int(record[name]) for name in ATTRIBUTES},
+        )
+
+    def to_players(self, rows: Iterable[int]) -> List[Player]:
+        return [self.to_player(int(row)) for row in rows]
@@ -0,0 +1,152 @@
+import struct
+import zlib
+from typing import Dict, List, Tuple, Union
+
+# Layout: HEADER (magic, version, source length, source crc32, target length, target crc32), then ops:
+#   COPY    op byte, u32 source offset, u32 length     (bytes taken from the source)
+#   INSERT  op byte, u32 length, literal bytes          (bytes the source does not have)
+#
+# The source fields let the server check a delta applies to the save version it
+# claims to, and the target fields give the new version's size and checksum,
+# all without rebuilding the save. crc32 is zlib's (the same as System.IO.Hashing.Crc32).
+MAGIC = b"SD"
+VERSION = 1
+HEADER = struct.Struct("<2sBIIII")
+COPY_OP = struct.Struct("<BII")
+INSERT_OP = struct.Struct("<BI")
+COPY, INSERT = 1, 2
+# Granularity of source matching: shorter finds more matches, longer scans faster
+BLOCK_SIZE = 32
+
+Op = Tuple[int, Union[Tuple[int, int], bytes]]
+
+
+class DeltaError(ValueError):
+    """A delta that is malformed or does not apply to the given source"""
+
+
+def checksum(data: bytes) -> int:
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def make_delta(source: bytes, target: bytes, block_size: int = BLOCK_SIZE) -> bytes:
+    """Encode target as copies from source plus inserted literals
+
+    Source blocks at block_size-aligned offsets are indexed by content; the
+    target is scanned for them, and each hit is widened backwards and forwards
+    to the full matching run.
+    """
+    index: Dict[bytes, int] = {}
+    for offset in range(0, len(source) - block_size + 1, block_size):
+        index.setdefault(source[offset:offset + block_size], offset)
+
+    ops: List[Op] = []
+    literal_start = position = 0
+    while position + block_size <= len(target):
+        offset = index.get(target[position:position + block_size])
+        if offset is None:
+            position += 1
+            continue
+        start, source_start = position, offset
+        while start > literal_start and source_start > 0 and target[start - 1] == source[source_start - 1]:
+            start -= 1
+            source_start -= 1
+        end, source_end = position + block_size, offset + block_size
+        while (
+            end + block_size <= len(target) and source_end + block_size <= len(source)
+            and target[end:end + block_size] == source[source_end:source_end + block_size]
+        ):
+            end += block_size
+            source_end += block_size
+        while end < len(target) and source_end < len(source) and target[end] == source[source_end]:
+            end += 1
+            source_end += 1
+        if start > literal_start:
+            ops.append((INSERT, target[literal_start:start]))
+        ops.append((COPY, (source_start, end - start)))
+        literal_start = position = end
+    if literal_start < len(target):
+        ops.append((INSERT, target[literal_start:]))
+    return encode_delta(ops, source, target)
+
+
+def encode_delta(ops: List[Op], source: bytes, target: bytes) -> bytes:
+    parts = [HEADER.pack(MAGIC, VERSION, len(source), checksum(source), len(target), checksum(target))]
+    for kind, value in ops:
+        if kind == COPY:
+            parts.append(COPY_OP.pack(COPY, *value))
+        else:
+            parts.append(INSERT_OP.pack(INSERT, len(value)))
+            parts.append(value)
+    return b"".join(parts)
+
+
+def read_header(delta: bytes) -> Dict[str, int]:
+    """Source and target size and checksum of a delta"""
+    if len(delta) < HEADER.size:
+        raise DeltaError("Delta is shorter than its header")
+    magic, version, source_size, source_crc, target_size, target_crc = HEADER.unpack_from(delta)
+    if magic != MAGIC or version != VERSION:
+        raise DeltaError("Not a save delta (bad magic or version)")
+    return {"source_size": source_size, "source_crc": source_crc, "target_size": target_size, "target_crc": target_crc}
+
+
+def _ops(delta: bytes):
+    view = memoryview(delta)
+    position = HEADER.size
+    while position < len(view):
+        kind = view[position]
+        if kind == COPY:
+            if position + COPY_OP.size > len(view):
+                raise DeltaError("Truncated copy")
+            _, offset, length = COPY_OP.unpack_from(view, position)
+            position += COPY_OP.size
+            yield COPY, (offset, length)
+        elif kind == INSERT:
+            if position + INSERT_OP.size > len(view):
+                raise DeltaError("Truncated insert")
+            _, length = INSERT_OP.unpack_from(view, position)
+            position += INSERT_OP.size
+            if position + length > len(view):
+                raise DeltaError("Truncated insert literal")
+            yield INSERT, view[position:position + length]
+            position += length
+        else:
+            raise DeltaError(f"Unknown delta op {kind}")
+
+
+def validate_delta(delta: bytes) -> Dict[str, int]:
+    """Check a delta's structure against its own header, without the source; returns the header"""
+    header = read_header(delta)
+    size = 0
+    for kind, value in _ops(delta):
+        if kind == COPY:
+            offset, length = value
+            if offset + length > header["source_size"]:
+                raise DeltaError("Copy reaches past the end of the source")
+            size += length
+        else:
+            size += len(value)
+    if size != header["target_size"]:
+        raise DeltaError(f"Delta produces {size} bytes, header says {header['target_size']}")
+    return header
+
+
+def apply_delta(source: bytes, delta: bytes) -> bytes:
+    """Rebuild the target a delta describes from its source"""
+    header = read_header(delta)
+    if len(source) != header["source_size"] or checksum(source) != header["source_crc"]:
+        raise DeltaError("Delta does not apply to this source")
+    parts = []
+    for kind, value in _ops(delta):
+        if kind == COPY:
+            offset, length = value
+            if offset + length > len(source):
+                raise DeltaError("Copy reaches past the end of the source")
+            parts.append(source[offset:offset + length])
+        else:
+            parts.append(bytes(value))
+    target = b"".join(parts)
+    if len(target) != header["target_size"] or checksum(target) != header["target_crc"]:
+        raise DeltaError("Delta target does not match its checksum")
+    return target
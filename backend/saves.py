@@ -0,0 +1,359 @@
+import logging
+import os
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from bson import Binary
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from database import DatabaseManager
+from executors import run_threaded
+from metrics import Counter, registry
+from models import SaveInfo
+from save_delta import DeltaError, apply_delta, checksum, make_delta, validate_delta
+
+if TYPE_CHECKING:
+    from jobs import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# A delta inserted by a push that never committed (crashed between its two writes) is replaced after this long
+ORPHAN_DELTA_SECONDS = 60
+
+save_sync_bytes = registry.register(Counter(
+    "football_master_save_sync_bytes_total",
+    "Save payload bytes sent and received, by direction and format",
+    ("direction", "format"),
+))
+
+
+class SaveConfig:
+    """Save sync settings, read from .env
+
+    SAVE_COMPRESSION_LEVEL       zlib level for stored snapshots and deltas
+    SAVE_MAX_BYTES               largest save (and largest delta) accepted
+    SAVE_COMPACT_CHAIN_LENGTH    queue compaction once this many deltas follow the snapshot
+    SAVE_COMPACT_CHAIN_RATIO     ... or once the deltas take this fraction of the snapshot's stored size
+    """
+
+    def __init__(self):
+        self.compression_level = int(os.environ.get("SAVE_COMPRESSION_LEVEL", "6"))
+        self.max_bytes = int(os.environ.get("SAVE_MAX_BYTES", str(8 * 1024 * 1024)))
+        self.compact_chain_length = int(os.environ.get("SAVE_COMPACT_CHAIN_LENGTH", "32"))
+        self.compact_chain_ratio = float(os.environ.get("SAVE_COMPACT_CHAIN_RATIO", "0.5"))
+
+
+class SaveError(Exception):
+    """A save upload or download that cannot be served (malformed or mismatched delta)"""
+
+
+class SaveNotFound(SaveError):
+    """No save in this slot"""
+
+
+class SaveConflict(SaveError):
+    """The client's base version is not the server's current version; it must pull first"""
+
+    def __init__(self, message: str, version: Optional[int]):
+        super().__init__(message)
+        self.version = version
+
+
+class SaveTooLarge(SaveError):
+    """A save or delta over SAVE_MAX_BYTES"""
+
+
+def _stored_delta(delta: bytes, compression_level: int) -> Tuple[bytes, bool]:
+    """Deltas are stored zlib'd only when that makes them smaller (copy-heavy deltas rarely shrink)"""
+    compressed = zlib.compress(delta, compression_level)
+    return (compressed, True) if len(compressed) < len(delta) else (delta, False)
+
+
+def rebuild(
+    snapshot: bytes, snapshot_version: int, deltas: List[Tuple[int, bytes, bool]], since_version: Optional[int] = None
+) -> Tuple[bytes, Optional[bytes]]:
+    """Latest state from a zlib'd snapshot and its (version, delta, compressed) chain, plus the state at since_version"""
+    state = zlib.decompress(snapshot)
+    since_state = state if since_version == snapshot_version else None
+    for version, delta, compressed in deltas:
+        state = apply_delta(state, zlib.decompress(delta) if compressed else delta)
+        if version == since_version:
+            since_state = state
+    return state, since_state
+
+
+def verify_push(snapshot: bytes, snapshot_version: int, deltas: List[Tuple[int, bytes, bool]], delta: bytes) -> None:
+    """Apply a pushed delta to the current state, so a bad target checksum is refused instead of stored"""
+    state, _ = rebuild(snapshot, snapshot_version, deltas)
+    apply_delta(state, delta)
+
+
+def diff_since(
+    snapshot: bytes, snapshot_version: int, deltas: List[Tuple[int, bytes, bool]], since_version: int
+) -> bytes:
+    """One delta taking the state at since_version to the latest, however many pushes lie between"""
+    state, since_state = rebuild(snapshot, snapshot_version, deltas, since_version)
+    return make_delta(since_state, state)
+
+
+class SaveSync:
+    """Server-side save games: a compressed snapshot per slot plus a chain of binary deltas
+
+    Clients upload a full snapshot once (or to reset), then push deltas (see
+    save_delta) against the version they hold; a push only writes the delta
+    and a few counters, so write volume follows what changed rather than the
+    save's size. Pulls get the latest state whole, or one delta from the
+    client's version when that version is still in the chain.
+
+    Long chains are folded into a new snapshot by the compact_saves job,
+    queued once a slot passes SAVE_COMPACT_CHAIN_LENGTH or
+    SAVE_COMPACT_CHAIN_RATIO. Every write is conditional on the version it
+    read, so concurrent pushes, uploads and compaction resolve to one winner
+    and SaveConflict for the rest.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, job_queue: Optional["JobQueue"] = None, config: Optional[SaveConfig] = None):
+        self.db_manager = db_manager
+        self.job_queue = job_queue
+        self.config = config or SaveConfig()
+
+    @property
+    def db(self):
+        return self.db_manager.db
+
+    async def ensure_indexes(self):
+        await self.db.saves.create_index([("user_id", ASCENDING), ("slot", ASCENDING)], unique=True)
+        await self.db.saves.create_index("id", unique=True)
+        await self.db.save_deltas.create_index([("save_id", ASCENDING), ("version", ASCENDING)], unique=True)
+
+    async def list_saves(self, user_id: str) -> List[SaveInfo]:
+        cursor = self.db.saves.find({"user_id": user_id}, {"_id": 0, "snapshot": 0}).sort("slot", ASCENDING)
+        return [self._info(save) async for save in cursor]
+
+    @staticmethod
+    def _info(save: Dict[str, Any]) -> SaveInfo:
+        return SaveInfo(
+            id=save["id"], user_id=save["user_id"], slot=save["slot"], version=save["version"],
+            snapshot_version=save["snapshot_version"], size=save["size"],
+            stored_bytes=save["snapshot_bytes"] + save["chain_bytes"], chain_length=save["chain_length"],
+            created_at=save["created_at"], updated_at=save["updated_at"],
+        )
+
+    async def _load(self, user_id: str, slot: str, with_snapshot: bool = False) -> Dict[str, Any]:
+        save = await self.db.saves.find_one({"user_id": user_id, "slot": slot}, None if with_snapshot else {"snapshot": 0})
+        if save is None:
+            raise SaveNotFound(f"No save in slot '{slot}'")
+        return save
+
+    async def upload_snapshot(self, user_id: str, slot: str, data: bytes, base_version: Optional[int] = None) -> SaveInfo:
+        """Replace a slot's state with a full save; base_version (when given) must be the current version"""
+        if len(data) > self.config.max_bytes:
+            raise SaveTooLarge(f"Save is {len(data)} bytes, the limit is {self.config.max_bytes}")
+        blob = await run_threaded(zlib.compress, data, self.config.compression_level)
+        now = datetime.utcnow()
+        fields = {
+            "snapshot": Binary(blob), "snapshot_bytes": len(blob), "size": len(data), "crc": checksum(data),
+            "chain_length": 0, "chain_bytes": 0, "compaction_queued": False, "updated_at": now,
+        }
+        existing = await self.db.saves.find_one({"user_id": user_id, "slot": slot}, {"snapshot": 0})
+        if existing is None:
+            if base_version:
+                raise SaveConflict("Save does not exist yet", None)
+            save = {"id": str(uuid.uuid4()), "user_id": user_id, "slot": slot, "version": 1, "snapshot_version": 1, "created_at": now, **fields}
+            try:
+                await self.db.saves.insert_one(save)
+            except DuplicateKeyError:
+                raise SaveConflict("Save was created concurrently", None)
+        else:
+            if base_version is not None and base_version != existing["version"]:
+                raise SaveConflict(f"Save is at version {existing['version']}", existing["version"])
+            version = existing["version"] + 1
+            result = await self.db.saves.update_one(
+                {"id": existing["id"], "version": existing["version"]},
+                {"$set": {"version": version, "snapshot_version": version, **fields}}
+            )
+            if result.matched_count == 0:
+                raise SaveConflict("Save changed during upload", None)
+            await self.db.save_deltas.delete_many({"save_id": existing["id"], "version": {"$lte": version}})
+            save = {**existing, "version": version, "snapshot_version": version, **fields}
+        save_sync_bytes.inc("upload", "snapshot", amount=len(data))
+        return self._info(save)
+
+    async def push_delta(self, user_id: str, slot: str, base_version: int, delta: bytes) -> SaveInfo:
+        """Append a delta made against base_version, which must be the current version"""
+        if len(delta) > self.config.max_bytes:
+            raise SaveTooLarge(f"Delta is {len(delta)} bytes, the limit is {self.config.max_bytes}")
+        try:
+            header = validate_delta(delta)
+        except DeltaError as e:
+            raise SaveError(str(e))
+        if header["target_size"] > self.config.max_bytes:
+            raise SaveTooLarge(f"Save would be {header['target_size']} bytes, the limit is {self.config.max_bytes}")
+        save = await self._load(user_id, slot)
+        if save["version"] != base_version:
+            raise SaveConflict(f"Save is at version {save['version']}", save["version"])
+        if (header["source_size"], header["source_crc"]) != (save["size"], save["crc"]):
+            raise SaveError(f"Delta was not made against version {base_version}")
+        # The header only vouches for itself: apply the delta (the chain is kept short by compaction)
+        # so a wrong target checksum can never make the slot unreadable
+        current, deltas = await self._consistent(user_id, slot)
+        if current["version"] != base_version:
+            raise SaveConflict(f"Save is at version {current['version']}", current["version"])
+        await self._run(verify_push, bytes(current["snapshot"]), current["snapshot_version"], deltas, delta)
+
+        stored, compressed = _stored_delta(delta, self.config.compression_level)
+        entry = {
+            "id": str(uuid.uuid4()), "save_id": save["id"], "version": base_version + 1,
+            "delta": Binary(stored), "compressed": compressed, "stored_bytes": len(stored), "created_at": datetime.utcnow(),
+        }
+        await self._insert_delta(entry, save["version"])
+        now = datetime.utcnow()
+        result = await self.db.saves.update_one(
+            {"id": save["id"], "version": base_version},
+            {
+                "$set": {"version": entry["version"], "size": header["target_size"], "crc": header["target_crc"], "updated_at": now},
+                "$inc": {"chain_length": 1, "chain_bytes": len(stored)},
+            }
+        )
+        if result.matched_count == 0:
+            await self.db.save_deltas.delete_one({"id": entry["id"]})
+            raise SaveConflict("Save changed during upload", None)
+        save_sync_bytes.inc("upload", "delta", amount=len(delta))
+
+        save.update(
+            version=entry["version"], size=header["target_size"], crc=header["target_crc"], updated_at=now,
+            chain_length=save["chain_length"] + 1, chain_bytes=save["chain_bytes"] + len(stored),
+        )
+        await self._maybe_queue_compaction(save)
+        return self._info(save)
+
+    async def _insert_delta(self, entry: Dict[str, Any], current_version: int):
+        try:
+            await self.db.save_deltas.insert_one(entry)
+            return
+        except DuplicateKeyError:
+            pass
+        # Another push holds this version: either in flight (a real conflict) or abandoned before it committed
+        stale_before = datetime.utcnow() - timedelta(seconds=ORPHAN_DELTA_SECONDS)
+        removed = await self.db.save_deltas.delete_one(
+            {"save_id": entry["save_id"], "version": entry["version"], "created_at": {"$lt": stale_before}}
+        )
+        if removed.deleted_count == 0:
+            raise SaveConflict("Another upload for this version is in progress", current_version)
+        try:
+            await self.db.save_deltas.insert_one(entry)
+        except DuplicateKeyError:
+            raise SaveConflict("Another upload for this version is in progress", current_version)
+
+    def _needs_compaction(self, save: Dict[str, Any]) -> bool:
+        return save["chain_length"] > 0 and (
+            save["chain_length"] >= self.config.compact_chain_length
+            or save["chain_bytes"] >= self.config.compact_chain_ratio * save["snapshot_bytes"]
+        )
+
+    async def _maybe_queue_compaction(self, save: Dict[str, Any]):
+        if self.job_queue is None or save.get("compaction_queued") or not self._needs_compaction(save):
+            return
+        result = await self.db.saves.update_one(
+            {"id": save["id"], "compaction_queued": {"$ne": True}}, {"$set": {"compaction_queued": True}}
+        )
+        if result.modified_count:
+            await self.job_queue.enqueue("compact_saves", {"save_ids": [save["id"]]})
+
+    async def _chain(self, save: Dict[str, Any]) -> Optional[List[Tuple[int, bytes, bool]]]:
+        """The deltas after the snapshot, or None if compaction removed some since save was read"""
+        cursor = self.db.save_deltas.find(
+            {"save_id": save["id"], "version": {"$gt": save["snapshot_version"], "$lte": save["version"]}},
+            {"_id": 0, "version": 1, "delta": 1, "compressed": 1}
+        ).sort("version", ASCENDING)
+        deltas = [(entry["version"], bytes(entry["delta"]), entry["compressed"]) async for entry in cursor]
+        return deltas if len(deltas) == save["version"] - save["snapshot_version"] else None
+
+    @staticmethod
+    async def _run(fn, *args):
+        """Run a delta-applying function in the thread pool, reporting a broken delta as SaveError"""
+        try:
+            return await run_threaded(fn, *args)
+        except DeltaError as e:
+            raise SaveError(f"Save delta is invalid: {e}")
+
+    async def _consistent(self, user_id: str, slot: str) -> Tuple[Dict[str, Any], List[Tuple[int, bytes, bool]]]:
+        for _ in range(3):
+            save = await self._load(user_id, slot, with_snapshot=True)
+            deltas = await self._chain(save)
+            if deltas is not None:
+                return save, deltas
+        raise SaveError("Save is being rewritten, try again")
+
+    async def pull(self, user_id: str, slot: str, since_version: Optional[int] = None) -> Tuple[str, int, bytes]:
+        """(format, version, body): "current" with no body, "delta" from since_version, or the whole "snapshot" """
+        save = await self._load(user_id, slot)
+        if since_version is not None and since_version > save["version"]:
+            raise SaveConflict(f"Save is at version {save['version']}", save["version"])
+        if since_version == save["version"]:
+            return "current", save["version"], b""
+
+        # The latest push is stored as exactly the delta the client needs
+        if since_version is not None and since_version == save["version"] - 1 and since_version >= save["snapshot_version"]:
+            entry = await self.db.save_deltas.find_one({"save_id": save["id"], "version": save["version"]})
+            if entry is not None:
+                delta = bytes(entry["delta"])
+                delta = await run_threaded(zlib.decompress, delta) if entry["compressed"] else delta
+                save_sync_bytes.inc("download", "delta", amount=len(delta))
+                return "delta", save["version"], delta
+
+        save, deltas = await self._consistent(user_id, slot)
+        snapshot = bytes(save["snapshot"])
+        if since_version is not None and save["snapshot_version"] <= since_version < save["version"]:
+            delta = await self._run(diff_since, snapshot, save["snapshot_version"], deltas, since_version)
+            if len(delta) < save["size"]:
+                save_sync_bytes.inc("download", "delta", amount=len(delta))
+                return "delta", save["version"], delta
+        state, _ = await self._run(rebuild, snapshot, save["snapshot_version"], deltas)
+        save_sync_bytes.inc("download", "snapshot", amount=len(state))
+        return "snapshot", save["version"], state
+
+    async def compact(self, save_id: str) -> Dict[str, int]:
+        """Fold a save's delta chain into a new snapshot"""
+        save = await self.db.saves.find_one({"id": save_id})
+        if save is None:
+            return {"deltas": 0, "bytes_freed": 0}
+        deltas = await self._chain(save)
+        if not deltas:
+            await self.db.saves.update_one({"id": save_id}, {"$set": {"compaction_queued": False}})
+            return {"deltas": 0, "bytes_freed": 0}
+        state, _ = await self._run(rebuild, bytes(save["snapshot"]), save["snapshot_version"], deltas)
+        blob = await run_threaded(zlib.compress, state, self.config.compression_level)
+        chain_bytes = sum(len(delta) for _, delta, _ in deltas)
+        result = await self.db.saves.update_one(
+            {"id": save_id, "snapshot_version": save["snapshot_version"], "version": {"$gte": save["version"]}},
+            {
+                "$set": {"snapshot": Binary(blob), "snapshot_bytes": len(blob), "snapshot_version": save["version"], "compaction_queued": False},
+                "$inc": {"chain_length": -len(deltas), "chain_bytes": -chain_bytes},
+            }
+        )
+        if result.matched_count == 0:
+            # A snapshot upload or another compaction got there first
+            return {"deltas": 0, "bytes_freed": 0}
+        await self.db.save_deltas.delete_many({"save_id": save_id, "version": {"$lte": save["version"]}})
+        freed = save["snapshot_bytes"] + chain_bytes - len(blob)
+        logger.info(f"Compacted save {save_id}: {len(deltas)} deltas into version {save['version']}, {freed} bytes freed")
+        return {"deltas": len(deltas), "bytes_freed": freed}
+
+    async def compact_all(self, save_ids: Optional[List[str]] = None, progress=None) -> Dict[str, int]:
+        """Compact the given saves, or every save past the chain thresholds"""
+        if save_ids is None:
+            cursor = self.db.saves.find({"chain_length": {"$gt": 0}}, {"_id": 0, "id": 1, "chain_length": 1, "chain_bytes": 1, "snapshot_bytes": 1})
+            save_ids = [save["id"] async for save in cursor if self._needs_compaction(save)]
+        totals = {"saves": 0, "deltas": 0, "bytes_freed": 0}
+        for index, save_id in enumerate(save_ids):
+            result = await self.compact(save_id)
+            totals["saves"] += bool(result["deltas"])
+            totals["deltas"] += result["deltas"]
+            totals["bytes_freed"] += result["bytes_freed"]
+            if progress is not None:
+                await progress((index + 1) / len(save_ids))
+        return totals
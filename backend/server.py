@@ -1,8 +1,14 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Path as FastAPIPath
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request, Response, WebSocket, Path as FastAPIPath
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import contextmanager
 import os
+import hmac
+import json
 import logging
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -10,26 +16,74 @@ from datetime import datetime, timedelta
 import asyncio
 
 # Import our models and database
-from models import *
+from models import Achievement, Career, GameMode, Job, JobRequest, Match, MatchSummary, MatchmakingRequest, MatchmakingTicket, Player, RatingChange, Position, SaveInfo, Stadium, Team, Tournament, TransferRequest, UniformKit, UserProfile
+from archive import MatchArchive
 from database import DatabaseManager
+from event_codec import EventLog
+from fixtures import FixtureGenerator
+from jobs import JobRunner
+from kits import KitResolver
+from live import LiveHub
+from match_setup import MatchSetup, MatchSetupError, MatchSetupNotFound
+from matchmaking import Matchmaker
+from ratings import RatingService, recommended_difficulty
+from saves import SaveConflict, SaveError, SaveNotFound, SaveSync, SaveTooLarge
+from transfers import TransferError, TransferMarket
+from metrics import PrometheusMiddleware, registry
+from profiling import ProfilingMiddleware, get_profiler
+from ratelimit import RateLimitMiddleware, create_rate_limiter
+from executors import LoopLagMonitor, shutdown_executors
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-# Initialize database manager
+# Initialize database manager (owns the MongoDB connection and the read cache; connects at startup)
 db_manager = DatabaseManager()
 
+# Background job workers run inside this process (JOB_WORKERS) and/or separately via `python jobs.py`
+job_runner = JobRunner(db_manager)
+
+# Cold storage for old completed matches (moved by the archive_matches job)
+match_archive = MatchArchive(db_manager)
+
+# League seasons (round-robin fixtures, generated by the generate_fixtures job)
+fixture_generator = FixtureGenerator(db_manager)
+
+# Elo ratings for users and teams, updated as matches complete
+rating_service = RatingService(db_manager)
+
+# Kit choice per fixture (clash resolution memoized per team pair)
+kit_resolver = KitResolver(db_manager)
+
+# One-call match loading: teams, stadium and kits fetched concurrently
+match_setup = MatchSetup(db_manager, kit_resolver)
+
+# Server-side save games: compressed snapshots plus binary delta chains
+save_sync = SaveSync(db_manager, job_runner.queue)
+
+# Career-mode transfer market (search over the roster index, atomic transfers)
+transfer_market = TransferMarket(db_manager)
+
+# Live match rooms for this worker (WebSocket relay, one shared ticker)
+live_hub = LiveHub(db_manager, on_match_completed=rating_service.apply_match)
+
+# Online queue; pairs players into matches and opens their live rooms on this worker
+matchmaker = Matchmaker(db_manager, live_hub)
+
+# Seeding runs on every worker boot unless disabled (e.g. when a deploy step seeds once)
+SEED_ON_STARTUP = os.environ.get("SEED_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
 # Create the main app
 app = FastAPI(title="Football Master API", version="1.0.0")
 
 # Create API router
 api_router = APIRouter(prefix="/api")
 
+# Per-client token buckets (API key or IP), expensive routes cost more; inside CORS so 429s carry CORS headers
+rate_limiter = create_rate_limiter()
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,8 +91,20 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-Save-Version", "X-Save-Format"],
 )
 
+# Per-route latency histograms, exposed on /metrics
+app.add_middleware(PrometheusMiddleware)
+
+# Sampled slow-request profiler; not installed at all unless PROFILE_SAMPLE_RATE > 0
+profiler = get_profiler()
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Logs (with the blocking stack) whenever something stalls the event loop past LOOP_LAG_THRESHOLD_MS
+loop_monitor = LoopLagMonitor()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,12 +112,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Startup timings per phase in milliseconds (import, connect, cache, seed, jobs, matchmaking)
+startup_timings: Dict[str, float] = {}
+
+@contextmanager
+def startup_phase(name: str):
+    started = time.perf_counter()
+    yield
+    startup_timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"Startup phase '{name}' took {startup_timings[name]}ms")
+
+startup_timings["import"] = round((time.perf_counter() - _import_started) * 1000, 2)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    logger.info("Initializing Football Master database...")
-    await db_manager.initialize_data()
-    logger.info("Database initialized successfully!")
+    logger.info(f"Startup phase 'import' took {startup_timings['import']}ms")
+    loop_monitor.start()
+    with startup_phase("connect"):
+        await db_manager.connect()
+        await db_manager.ensure_indexes()
+    with startup_phase("cache"):
+        await db_manager.cache.start()
+    if SEED_ON_STARTUP:
+        logger.info("Initializing Football Master database...")
+        with startup_phase("seed"):
+            await db_manager.initialize_data()
+        logger.info("Database initialized successfully!")
+    with startup_phase("jobs"):
+        await rating_service.ensure_indexes()
+        await match_archive.ensure_indexes()
+        await fixture_generator.ensure_indexes()
+        await save_sync.ensure_indexes()
+        await job_runner.start()
+    live_hub.start()
+    with startup_phase("matchmaking"):
+        await matchmaker.start()
 
 # Root endpoint
 @api_router.get("/")
@@ -63,6 +159,45 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+# Prometheus exposition (outside /api so scrapers don't need the API prefix)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ============ ADMIN ENDPOINTS ============
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard admin endpoints with ADMIN_TOKEN; they stay closed while it is unset"""
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    if not admin_token or not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@api_router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def get_slow_request_profiles(limit: int = Query(20, ge=1, le=1000)):
+    """Get the most recent slow request profiles (call stacks and Mongo commands)"""
+    profiles = list(profiler.slow_requests)[-limit:]
+    return {
+        "enabled": profiler.enabled,
+        "sample_rate": profiler.config.sample_rate,
+        "slow_request_ms": profiler.config.slow_request_ms,
+        "profiles": list(reversed(profiles))
+    }
+
+@api_router.get("/admin/profiles/slow-queries", dependencies=[Depends(require_admin)])
+async def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """Get the most recent slow Mongo commands"""
+    queries = list(profiler.slow_queries)[-limit:]
+    return {"slow_query_ms": profiler.config.slow_query_ms, "queries": list(reversed(queries))}
+
+@api_router.get("/admin/profiles/{profile_id}/folded", dependencies=[Depends(require_admin)])
+async def get_profile_folded_stacks(profile_id: int):
+    """Get a profile's stack samples in folded format (flamegraph.pl / speedscope)"""
+    profile = profiler.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    folded = "\n".join(f"{entry['stack']} {entry['count']}" for entry in profile["stacks"])
+    return PlainTextResponse(folded + "\n")
+
 # ============ USER PROFILE ENDPOINTS ============
 
 @api_router.post("/users", response_model=dict)
@@ -89,7 +224,7 @@ async def update_user_settings(
 ):
     """Update user control settings"""
     try:
-        await db.user_profiles.update_one(
+        await db_manager.db.user_profiles.update_one(
             {"id": user_id},
             {"$set": {"control_settings": settings}}
         )
@@ -127,10 +262,10 @@ async def get_team_by_id(team_id: str = FastAPIPath(..., description="Team ID"))
 @api_router.get("/teams/{team_id}/players", response_model=List[Player])
 async def get_team_players(team_id: str = FastAPIPath(..., description="Team ID")):
     """Get all players from a team"""
-    team = await db_manager.get_team(team_id)
-    if not team:
+    players = await db_manager.get_team_players(team_id)
+    if players is None:
         raise HTTPException(status_code=404, detail="Team not found")
-    return team.players
+    return players
 
 @api_router.post("/teams/{team_id}/players")
 async def add_player_to_team(
@@ -139,10 +274,7 @@ async def add_player_to_team(
 ):
     """Add a player to a team"""
     try:
-        await db.teams.update_one(
-            {"id": team_id},
-            {"$push": {"players": player.dict()}}
-        )
+        await db_manager.add_player_to_team(team_id, player)
         return {"message": "Player added to team successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -150,14 +282,28 @@ async def add_player_to_team(
 @api_router.get("/leagues")
 async def get_leagues():
     """Get all available leagues"""
-    cursor = db.teams.distinct("league")
+    cursor = db_manager.db.teams.distinct("league")
     leagues = await cursor
     return {"leagues": leagues}
 
+@api_router.get("/leagues/{league}/fixtures")
+async def get_league_fixtures(league: str, season: int = Query(..., ge=1), round: Optional[int] = Query(None, ge=1)):
+    """Get a league season's fixtures (optionally one round), in round order"""
+    fixtures = await fixture_generator.get_fixtures(league, season, round)
+    return {"league": league, "season": season, "fixtures": fixtures}
+
+@api_router.get("/leagues/{league}/table")
+async def get_league_table(league: str):
+    """Get the standings table for a league"""
+    table = await db_manager.get_league_table(league)
+    if not table:
+        raise HTTPException(status_code=404, detail="League not found")
+    return {"league": league, "table": table}
+
 @api_router.get("/countries")
 async def get_countries():
     """Get all available countries"""
-    cursor = db.teams.distinct("country")
+    cursor = db_manager.db.teams.distinct("country")
     countries = await cursor
     return {"countries": countries}
 
@@ -171,13 +317,28 @@ async def get_all_stadiums():
 @api_router.get("/stadiums/{stadium_id}", response_model=Stadium)
 async def get_stadium_by_id(stadium_id: str):
     """Get stadium by ID"""
-    result = await db.stadiums.find_one({"id": stadium_id})
-    if not result:
+    stadium = await db_manager.get_stadium(stadium_id)
+    if not stadium:
         raise HTTPException(status_code=404, detail="Stadium not found")
-    return Stadium(**result)
+    return stadium
 
 # ============ MATCH ENDPOINTS ============
 
+@api_router.get("/match-setup")
+async def get_match_setup(
+    home: str = Query(..., description="Home team ID"),
+    away: str = Query(..., description="Away team ID"),
+    stadium: Optional[str] = Query(None, description="Stadium ID (default: the home team's stadium)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. home.name,home.players.overall_rating,kits")
+):
+    """Get both teams with rosters, the stadium and the fixture's kits in one response"""
+    try:
+        return await match_setup.build(home, away, stadium, fields)
+    except MatchSetupNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except MatchSetupError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @api_router.post("/matches", response_model=dict)
 async def create_match(match: Match):
     """Create a new match"""
@@ -190,15 +351,61 @@ async def create_match(match: Match):
 @api_router.get("/matches/{match_id}", response_model=Match)
 async def get_match_by_id(match_id: str):
     """Get match by ID"""
-    result = await db.matches.find_one({"id": match_id})
+    match = await db_manager.get_match(match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return match
+
+@api_router.get("/matches/{match_id}/events")
+async def get_match_events(
+    match_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    stream: bool = False
+):
+    """Get a match's event log (or a window of it) and statistics; stream=true sends NDJSON for replays"""
+    result = await db_manager.get_match_events(match_id)
     if not result:
         raise HTTPException(status_code=404, detail="Match not found")
-    return Match(**result)
+    events = result.get("match_events", [])
+    stop = None if limit is None else offset + limit
+    window = events.iter(offset, stop) if isinstance(events, EventLog) else iter(events[offset:stop])
+    if stream:
+        return StreamingResponse((json.dumps(event) + "\n" for event in window), media_type="application/x-ndjson")
+    return {
+        "match_id": result["id"],
+        "total_events": len(events),
+        "events": list(window),
+        "statistics": result.get("statistics", {})
+    }
 
-@api_router.get("/users/{user_id}/matches", response_model=List[Match])
-async def get_user_matches(user_id: str):
-    """Get all matches for a user"""
-    return await db_manager.get_matches_by_player(user_id)
+@api_router.get("/users/{user_id}/matches", response_model=List[MatchSummary])
+async def get_user_matches(
+    response: Response,
+    user_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    game_mode: Optional[GameMode] = None,
+    completed: Optional[bool] = None
+):
+    """Get a user's matches, newest first, without event logs; pass X-Next-Cursor back as cursor for the next page"""
+    try:
+        matches, next_cursor = await db_manager.get_match_page(user_id, limit, cursor, game_mode, completed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return matches
+
+@api_router.websocket("/matches/{match_id}/live")
+async def live_match(
+    websocket: WebSocket,
+    match_id: str,
+    user_id: Optional[str] = None,
+    side: str = "spectator"
+):
+    """Live match channel: binary frames relayed between both players and broadcast to spectators (see live.py)"""
+    await live_hub.serve(websocket, match_id, user_id, side)
 
 @api_router.put("/matches/{match_id}/complete")
 async def complete_match(
@@ -207,20 +414,46 @@ async def complete_match(
 ):
     """Complete a match with results"""
     try:
-        await db.matches.update_one(
-            {"id": match_id},
-            {"$set": {
-                "completed": True,
-                "home_score": match_result.get("home_score", 0),
-                "away_score": match_result.get("away_score", 0),
-                "statistics": match_result.get("statistics", {}),
-                "match_events": match_result.get("events", [])
-            }}
-        )
-        return {"message": "Match completed successfully"}
+        await db_manager.update_match(match_id, {
+            "completed": True,
+            "completed_at": datetime.utcnow(),
+            "home_score": match_result.get("home_score", 0),
+            "away_score": match_result.get("away_score", 0),
+            "statistics": match_result.get("statistics", {}),
+            "match_events": match_result.get("events", [])
+        })
+        ratings = await rating_service.apply_match(match_id)
+        return {"message": "Match completed successfully", "ratings": ratings}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ============ MATCHMAKING ENDPOINTS ============
+
+@api_router.post("/matchmaking/tickets", response_model=MatchmakingTicket)
+async def join_matchmaking(request: MatchmakingRequest):
+    """Join the online queue; the ticket carries match_id and side once paired"""
+    try:
+        return await matchmaker.join(request)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@api_router.get("/matchmaking/tickets/{user_id}", response_model=MatchmakingTicket)
+async def get_matchmaking_ticket(user_id: str):
+    """Get a user's current (or most recent) matchmaking ticket"""
+    ticket = await matchmaker.get_ticket(user_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ticket
+
+@api_router.delete("/matchmaking/tickets/{user_id}")
+async def leave_matchmaking(user_id: str):
+    """Leave the online queue"""
+    if not await matchmaker.cancel(user_id):
+        raise HTTPException(status_code=404, detail="User is not searching")
+    return {"message": "Left matchmaking"}
+
 # ============ TOURNAMENT ENDPOINTS ============
 
 @api_router.post("/tournaments", response_model=dict)
@@ -235,19 +468,27 @@ async def create_tournament(tournament: Tournament):
 @api_router.get("/tournaments", response_model=List[Tournament])
 async def get_all_tournaments():
     """Get all tournaments"""
-    cursor = db.tournaments.find()
-    tournaments = []
-    async for tournament_doc in cursor:
-        tournaments.append(Tournament(**tournament_doc))
-    return tournaments
+    return await db_manager.get_tournaments(limit=None)
 
 @api_router.get("/tournaments/{tournament_id}", response_model=Tournament)
 async def get_tournament_by_id(tournament_id: str):
     """Get tournament by ID"""
-    result = await db.tournaments.find_one({"id": tournament_id})
-    if not result:
+    tournament = await db_manager.get_tournament(tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    return tournament
+
+@api_router.post("/tournaments/{tournament_id}/next-round", response_model=dict)
+async def advance_tournament_round(tournament_id: str, simulate: bool = Query(False, description="Simulate unplayed matches of the current round first")):
+    """Queue drawing of the tournament's next round"""
+    tournament = await db_manager.get_tournament(tournament_id)
+    if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
-    return Tournament(**result)
+    try:
+        job = await job_runner.queue.enqueue("tournament_round", {"tournament_id": tournament_id, "simulate": simulate})
+        return {"message": "Round draw queued", "job_id": job.id}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # ============ CAREER MODE ENDPOINTS ============
 
@@ -263,23 +504,209 @@ async def create_career(career: Career):
 @api_router.get("/users/{user_id}/career", response_model=Career)
 async def get_user_career(user_id: str):
     """Get user's career"""
-    career = await db_manager.get_user_career(user_id)
+    career = await db_manager.get_career_by_user(user_id)
     if not career:
         raise HTTPException(status_code=404, detail="Career not found")
     return career
 
 @api_router.put("/careers/{career_id}/advance-season")
 async def advance_career_season(career_id: str):
-    """Advance to next season"""
+    """Queue advancement to the next season; poll /api/jobs/{job_id} for completion"""
+    career = await db_manager.get_career(career_id)
+    if not career:
+        raise HTTPException(status_code=404, detail="Career not found")
     try:
-        await db.careers.update_one(
-            {"id": career_id},
-            {"$inc": {"current_season": 1}}
-        )
-        return {"message": "Season advanced successfully"}
+        job = await job_runner.queue.enqueue("advance_season", {"career_id": career_id, "from_season": career.current_season})
+        return {"message": "Season advancement queued", "job_id": job.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# ============ TRANSFER MARKET ENDPOINTS ============
+
+@api_router.get("/transfers/market")
+async def search_transfer_market(
+    position: Optional[Position] = None,
+    min_rating: int = Query(1, ge=1, le=99),
+    max_rating: int = Query(99, ge=1, le=99),
+    min_age: int = Query(16, ge=16, le=40),
+    max_age: int = Query(40, ge=16, le=40),
+    min_value: int = Query(0, ge=0),
+    max_value: Optional[int] = Query(None, ge=0),
+    exclude_team_id: Optional[str] = None,
+    sort: str = Query("value", pattern="^(value|rating|age)$"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search transfer listings by position, rating, age and value range"""
+    return await transfer_market.search(
+        position, min_rating, max_rating, min_age, max_age, min_value, max_value, exclude_team_id, sort, limit
+    )
+
+@api_router.post("/careers/{career_id}/transfers/buy")
+async def buy_player(career_id: str, request: TransferRequest):
+    """Sign a player from another team for the career's club"""
+    try:
+        transfer = await transfer_market.buy(career_id, request)
+        return {"message": "Transfer completed", "transfer": transfer}
+    except TransferError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/careers/{career_id}/transfers/sell")
+async def sell_player(career_id: str, request: TransferRequest):
+    """Sell one of the career club's players to another team"""
+    try:
+        transfer = await transfer_market.sell(career_id, request)
+        return {"message": "Transfer completed", "transfer": transfer}
+    except TransferError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ============ JOB ENDPOINTS ============
+
+@api_router.post("/jobs", response_model=dict)
+async def create_job(request: JobRequest):
+    """Queue a background job (advance_season, tournament_round, recalculate_ratings, statistics_backfill, rebuild_ratings, archive_matches, transfer_window, generate_fixtures, compact_saves)"""
+    try:
+        job = await job_runner.queue.enqueue(request.job_type, request.payload, request.max_attempts)
+        return {"job_id": job.id, "status": job.status, "message": "Job queued successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """Get job status, progress and result"""
+    job = await job_runner.queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+# ============ RATING ENDPOINTS ============
+
+@api_router.get("/users/{user_id}/rating")
+async def get_user_rating(user_id: str, limit: int = Query(20, ge=1, le=500)):
+    """Get a user's Elo rating, the matching AI difficulty and recent rating changes"""
+    profile = await db_manager.get_user_profile(user_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    history = await rating_service.history(user_id, limit)
+    return {
+        "user_id": user_id,
+        "rating": profile.rating,
+        "recommended_difficulty": recommended_difficulty(profile.rating, rating_service.config),
+        "history": history,
+    }
+
+@api_router.get("/teams/{team_id}/rating/history", response_model=List[RatingChange])
+async def get_team_rating_history(team_id: str, limit: int = Query(20, ge=1, le=500)):
+    """Get a team's recent Elo rating changes"""
+    return await rating_service.history(team_id, limit)
+
+@api_router.get("/leaderboard")
+async def get_leaderboard(limit: int = Query(50, ge=1, le=500)):
+    """Get the top users by Elo rating"""
+    return await rating_service.leaderboard(limit)
+
+# ============ ARCHIVE ENDPOINTS ============
+
+@api_router.get("/archive/matches", response_model=List[MatchSummary])
+async def get_archived_matches(
+    response: Response,
+    team_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Get archived matches of a team or user, newest first (slower: reads compressed segments)"""
+    if not team_id and not user_id:
+        raise HTTPException(status_code=400, detail="team_id or user_id is required")
+    try:
+        matches, next_cursor = await match_archive.find(team_id, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return matches
+
+@api_router.get("/archive/matches/{match_id}", response_model=Match)
+async def get_archived_match(match_id: str):
+    """Get a full archived match, event log included"""
+    match = await match_archive.get_match(match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found in archive")
+    return match
+
+@api_router.post("/admin/archive", dependencies=[Depends(require_admin)])
+async def archive_old_matches(older_than_days: Optional[float] = Query(None, ge=0)):
+    """Queue archival of completed matches older than older_than_days (default ARCHIVE_AFTER_DAYS)"""
+    payload = {} if older_than_days is None else {"older_than_days": older_than_days}
+    job = await job_runner.queue.enqueue("archive_matches", payload)
+    return {"job_id": job.id, "status": job.status, "message": "Archival queued"}
+
+@api_router.post("/admin/seasons/{season}/fixtures", dependencies=[Depends(require_admin)])
+async def schedule_season_fixtures(
+    season: int = FastAPIPath(..., ge=1),
+    leagues: Optional[List[str]] = Query(None),
+    start_date: Optional[datetime] = None,
+    round_interval_days: float = Query(7, gt=0)
+):
+    """Queue fixture generation for a season across every league (or the given ones)"""
+    payload: Dict[str, Any] = {"season": season, "round_interval_days": round_interval_days}
+    if leagues:
+        payload["leagues"] = leagues
+    if start_date:
+        payload["start_date"] = start_date.isoformat()
+    job = await job_runner.queue.enqueue("generate_fixtures", payload)
+    return {"job_id": job.id, "status": job.status, "message": "Fixture generation queued"}
+
+# ============ SAVE SYNC ENDPOINTS ============
+
+def _save_http_error(e: SaveError) -> HTTPException:
+    if isinstance(e, SaveNotFound):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, SaveConflict):
+        headers = {"X-Save-Version": str(e.version)} if e.version is not None else None
+        return HTTPException(status_code=409, detail=str(e), headers=headers)
+    if isinstance(e, SaveTooLarge):
+        return HTTPException(status_code=413, detail=str(e))
+    return HTTPException(status_code=400, detail=str(e))
+
+@api_router.get("/users/{user_id}/saves", response_model=List[SaveInfo])
+async def get_user_saves(user_id: str):
+    """Get the versions and sizes of a user's save slots"""
+    return await save_sync.list_saves(user_id)
+
+@api_router.get("/users/{user_id}/saves/{slot}")
+async def pull_save(user_id: str, slot: str, since_version: Optional[int] = Query(None, ge=0)):
+    """Get a save: 204 if since_version is current, a binary delta from it (X-Save-Format: delta), or the whole save"""
+    try:
+        save_format, version, body = await save_sync.pull(user_id, slot, since_version)
+    except SaveError as e:
+        raise _save_http_error(e)
+    headers = {"X-Save-Version": str(version), "X-Save-Format": save_format}
+    if save_format == "current":
+        return Response(status_code=204, headers=headers)
+    return Response(content=body, media_type="application/octet-stream", headers=headers)
+
+@api_router.put("/users/{user_id}/saves/{slot}", response_model=SaveInfo)
+async def upload_save(user_id: str, slot: str, request: Request, base_version: Optional[int] = Query(None, ge=0)):
+    """Upload a whole save (raw bytes) as the slot's new snapshot"""
+    try:
+        return await save_sync.upload_snapshot(user_id, slot, await request.body(), base_version)
+    except SaveError as e:
+        raise _save_http_error(e)
+
+@api_router.post("/users/{user_id}/saves/{slot}/deltas", response_model=SaveInfo)
+async def push_save_delta(user_id: str, slot: str, request: Request, base_version: int = Query(..., ge=1)):
+    """Upload a binary delta against base_version; 409 with X-Save-Version if the slot has moved on"""
+    try:
+        return await save_sync.push_delta(user_id, slot, base_version, await request.body())
+    except SaveError as e:
+        raise _save_http_error(e)
+
+@api_router.post("/admin/saves/compact", dependencies=[Depends(require_admin)])
+async def compact_saves():
+    """Queue compaction of every save whose delta chain is past the thresholds"""
+    job = await job_runner.queue.enqueue("compact_saves", {})
+    return {"job_id": job.id, "status": job.status, "message": "Save compaction queued"}
+
 # ============ ACHIEVEMENT ENDPOINTS ============
 
 @api_router.get("/achievements", response_model=List[Achievement])
@@ -295,7 +722,7 @@ async def get_user_achievements(user_id: str):
         raise HTTPException(status_code=404, detail="User not found")
     
     achieved_ids = profile.achievements
-    cursor = db.achievements.find({"id": {"$in": achieved_ids}})
+    cursor = db_manager.db.achievements.find({"id": {"$in": achieved_ids}})
     achievements = []
     async for achievement_doc in cursor:
         achievements.append(Achievement(**achievement_doc))
@@ -366,18 +793,30 @@ async def get_game_modes():
 @api_router.get("/teams/{team_id}/uniforms", response_model=List[UniformKit])
 async def get_team_uniforms(team_id: str):
     """Get team's uniform kits"""
-    cursor = db.uniform_kits.find({"team_id": team_id})
-    uniforms = []
-    async for uniform_doc in cursor:
-        uniforms.append(UniformKit(**uniform_doc))
-    return uniforms
+    return await db_manager.get_team_uniforms(team_id)
+
+@api_router.get("/uniforms", response_model=Dict[str, List[UniformKit]])
+async def get_uniforms(team_ids: str = Query(..., description="Comma-separated team IDs")):
+    """Get the uniform kits of several teams in one call, keyed by team ID"""
+    ids = [team_id.strip() for team_id in team_ids.split(",") if team_id.strip()]
+    if not ids or len(ids) > 100:
+        raise HTTPException(status_code=400, detail="team_ids must list 1 to 100 team IDs")
+    return await db_manager.get_uniforms_for_teams(ids)
+
+@api_router.get("/uniforms/matchup")
+async def get_uniform_matchup(home_team_id: str, away_team_id: str):
+    """Get the kits both teams wear in a fixture; the away side changes kit when primary colors clash"""
+    matchup = await kit_resolver.matchup(home_team_id, away_team_id)
+    if matchup is None:
+        raise HTTPException(status_code=404, detail="Team not found")
+    return matchup
 
 @api_router.post("/teams/{team_id}/uniforms")
 async def create_team_uniform(team_id: str, uniform: UniformKit):
     """Create a new uniform kit for a team"""
     try:
         uniform.team_id = team_id
-        await db.uniform_kits.insert_one(uniform.dict())
+        await db_manager.create_team_uniform(uniform)
         return {"message": "Uniform created successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -391,12 +830,8 @@ async def get_user_statistics(user_id: str):
     if not profile:
         raise HTTPException(status_code=404, detail="User not found")
     
-    matches = await db_manager.get_user_matches(user_id)
-    
-    # Calculate additional stats
-    total_goals = sum(match.statistics.get("goals_scored", 0) for match in matches if match.statistics)
-    total_assists = sum(match.statistics.get("assists", 0) for match in matches if match.statistics)
-    total_cards = sum(match.statistics.get("cards", 0) for match in matches if match.statistics)
+    # Per-match totals are summed by MongoDB, not on the event loop
+    totals = await db_manager.get_user_match_totals(user_id)
     
     win_rate = (profile.total_wins / profile.total_matches * 100) if profile.total_matches > 0 else 0
     
@@ -411,9 +846,9 @@ async def get_user_statistics(user_id: str):
             "goals_scored": profile.total_goals_scored,
             "goals_conceded": profile.total_goals_conceded,
             "goal_difference": profile.total_goals_scored - profile.total_goals_conceded,
-            "total_goals": total_goals,
-            "total_assists": total_assists,
-            "total_cards": total_cards
+            "total_goals": totals["total_goals"],
+            "total_assists": totals["total_assists"],
+            "total_cards": totals["total_cards"]
         },
         "achievements_unlocked": len(profile.achievements),
         "level": profile.level,
@@ -428,7 +863,7 @@ async def search_teams(
     limit: int = Query(10, ge=1, le=50)
 ):
     """Search teams by name or league"""
-    cursor = db.teams.find({
+    cursor = db_manager.db.teams.find({
         "$or": [
             {"name": {"$regex": query, "$options": "i"}},
             {"league": {"$regex": query, "$options": "i"}},
@@ -449,25 +884,7 @@ async def search_players(
     limit: int = Query(10, ge=1, le=50)
 ):
     """Search players by name or position"""
-    # This would require a different data structure for efficient player search
-    # For now, we'll search through all teams
-    all_teams = await db_manager.get_teams()
-    players = []
-    
-    for team in all_teams:
-        for player in team.players:
-            if query.lower() in player.name.lower():
-                if position is None or player.position == position:
-                    players.append({
-                        "player": player,
-                        "team": {"id": team.id, "name": team.name}
-                    })
-                    
-                    if len(players) >= limit:
-                        break
-        if len(players) >= limit:
-            break
-    
+    players = await db_manager.search_players(query, position, limit)
     return {"query": query, "results": players}
 
 # Include the router in the main app
@@ -476,7 +893,12 @@ app.include_router(api_router)
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await matchmaker.stop()
+    await live_hub.stop()
+    await job_runner.stop()
+    await db_manager.close()
+    await loop_monitor.stop()
+    shutdown_executors()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from models import Formation
+from roster import RosterIndex
+
+# Starting XI slots per formation, as (goalkeepers, defenders, midfielders, forwards)
+FORMATION_SLOTS = {
+    Formation.F_4_4_2: (1, 4, 4, 2),
+    Formation.F_4_3_3: (1, 4, 3, 3),
+    Formation.F_3_5_2: (1, 3, 5, 2),
+    Formation.F_4_2_3_1: (1, 4, 5, 1),
+    Formation.F_5_4_1: (1, 5, 4, 1),
+}
+FORMATION_CODES = {formation: code for code, formation in enumerate(FORMATION_SLOTS)}
+_SLOT_MATRIX = np.array(list(FORMATION_SLOTS.values()), dtype=np.int64)
+
+# Positional score weights per position code (goalkeeper, defender, midfielder, forward)
+_SCORE_ATTRIBUTES = ("overall_rating", "pace", "shooting", "passing", "defending", "physicality")
+_SCORE_WEIGHTS = np.array([
+    # overall pace  shoot  pass   def    phys
+    [0.60, 0.00, 0.00, 0.00, 0.30, 0.10],
+    [0.10, 0.15, 0.00, 0.10, 0.45, 0.20],
+    [0.20, 0.10, 0.15, 0.40, 0.15, 0.00],
+    [0.10, 0.25, 0.45, 0.10, 0.00, 0.10],
+], dtype=np.float64)
+
+GOALKEEPER, DEFENDER, MIDFIELDER, FORWARD = range(4)
+
+
+def positional_scores(players: np.ndarray) -> np.ndarray:
+    """Score every player for their own position from the relevant attributes"""
+    attributes = np.stack([players[name].astype(np.float64) for name in _SCORE_ATTRIBUTES], axis=1)
+    weights = _SCORE_WEIGHTS[players["position"]]
+    return (attributes * weights).sum(axis=1)
+
+
+def compute_team_ratings(index: RosterIndex, team_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+    """Derive overall/attack/midfield/defense ratings from each team's best XI
+
+    One vectorized pass over the roster index: players are ranked within
+    (team, position) by positional score and the top N per position are kept,
+    where N comes from the team's formation. Only teams in team_ids (default:
+    all) are computed; teams without players are left out of the result.
+    """
+    players = index.players
+    teams = players["team"].astype(np.int64)
+    if team_ids is not None:
+        wanted = [index.team_positions[team_id] for team_id in team_ids if team_id in index.team_positions]
+        mask = np.isin(teams, wanted)
+        players, teams = players[mask], teams[mask]
+    if len(players) == 0:
+        return {}
+
+    positions = players["position"].astype(np.int64)
+    scores = positional_scores(players)
+
+    # Rank inside each (team, position) group by descending score
+    order = np.lexsort((-scores, positions, teams))
+    group = (teams * 4 + positions)[order]
+    boundaries = np.ones(len(order), dtype=bool)
+    boundaries[1:] = group[1:] != group[:-1]
+    group_start = np.maximum.accumulate(np.where(boundaries, np.arange(len(order)), 0))
+    rank = np.arange(len(order)) - group_start
+
+    formations = np.array([FORMATION_CODES.get(Formation(code), 0) for code in index.team_formations], dtype=np.int64)
+    slots = _SLOT_MATRIX[formations[teams[order]], positions[order]]
+    starters = order[rank < slots]
+
+    team_count = len(index.team_ids)
+    starter_teams = teams[starters]
+    starter_positions = positions[starters]
+    starter_scores = scores[starters]
+
+    def mean_by_team(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        totals = np.bincount(starter_teams[mask], weights=values[mask], minlength=team_count)
+        counts = np.bincount(starter_teams[mask], minlength=team_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return totals / counts
+
+    everyone = np.ones(len(starters), dtype=bool)
+    overall = mean_by_team(players["overall_rating"][starters].astype(np.float64), everyone)
+    defense = mean_by_team(starter_scores, starter_positions <= DEFENDER)
+    midfield = mean_by_team(starter_scores, starter_positions == MIDFIELDER)
+    attack = mean_by_team(starter_scores, starter_positions == FORWARD)
+
+    # A side without players in an area falls back to its overall rating there
+    defense = np.where(np.isnan(defense), overall, defense)
+    midfield = np.where(np.isnan(midfield), overall, midfield)
+    attack = np.where(np.isnan(attack), overall, attack)
+
+    ratings = {}
+    for team_index in np.unique(starter_teams):
+        ratings[index.team_ids[team_index]] = {
+            "overall_rating": _to_rating(overall[team_index]),
+            "attack_rating": _to_rating(attack[team_index]),
+            "midfield_rating": _to_rating(midfield[team_index]),
+            "defense_rating": _to_rating(defense[team_index]),
+        }
+    return ratings
+
+
+def _to_rating(value: float) -> int:
+    return int(min(99, max(1, round(float(value)))))
@@ -0,0 +1,116 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from player_generator import POSITION_COUNTS
+
+# Squad depth an AI club aims for per position code (the generated squad shape)
+SQUAD_TARGET = POSITION_COUNTS
+# Score bonus per missing player at the position, so thin squads buy before deep ones upgrade
+NEED_WEIGHT = 5.0
+
+
+def plan_transfer_window(
+    player_team: np.ndarray,
+    player_position: np.ndarray,
+    player_rating: np.ndarray,
+    fees: np.ndarray,
+    budgets: Sequence[int],
+    excluded: Sequence[bool],
+    max_per_team: int,
+    seed: int,
+) -> List[Tuple[int, int, int]]:
+    """Match AI buyers and sellers for one transfer window
+
+    Each club's needs vector is SQUAD_TARGET minus its squad count per
+    position. A club lists its players beyond the target at a position plus
+    its last choice there; a club buys where it is short, or at full depth
+    to upgrade on its average. Every round scores all clubs at once: per
+    position, the best listed player each budget affords (a prefix of the
+    fee-ordered list, so one running maximum serves every club), scored as
+    the player's rating over the club's average there plus NEED_WEIGHT per
+    missing player. Each club bids on its best positive option, a contested
+    player goes to the highest score, then budgets, needs and averages are
+    updated for the next round. Excluded clubs (managed in career mode)
+    neither buy nor sell.
+
+    Returns (player row, buying team index, fee) per transfer. Module-level
+    so it can run in a process pool.
+    """
+    player_team = np.asarray(player_team, dtype=np.int64)
+    player_position = np.asarray(player_position, dtype=np.int64)
+    player_rating = np.asarray(player_rating, dtype=np.float64)
+    fees = np.asarray(fees, dtype=np.int64)
+    budgets = np.asarray(budgets, dtype=np.int64).copy()
+    excluded = np.asarray(excluded, dtype=bool)
+    teams, positions = len(budgets), len(SQUAD_TARGET)
+    target = np.asarray(SQUAD_TARGET, dtype=np.int64)
+
+    cell = player_team * positions + player_position
+    counts = np.bincount(cell, minlength=teams * positions).reshape(teams, positions)
+    totals = np.bincount(cell, weights=player_rating, minlength=teams * positions).reshape(teams, positions)
+    means = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+    needs = target - counts
+
+    # Rank within (team, position) by rating, best first; the last choice and anyone past the target are listed
+    order = np.lexsort((-player_rating, cell))
+    starts = np.searchsorted(cell[order], cell[order])
+    rank = np.empty(len(cell), dtype=np.int64)
+    rank[order] = np.arange(len(cell)) - starts
+    sellable = (rank >= target[player_position] - 1) & ~excluded[player_team]
+    candidates = np.flatnonzero(sellable)
+    if not len(candidates):
+        return []
+
+    # Per position, listed players ordered by fee: a buyer can afford a prefix of the list,
+    # and its best option is the top-rated available player in that prefix
+    tiebreak = np.random.default_rng(seed).random(len(player_rating)) * 0.5
+    markets = []
+    for position in range(positions):
+        listed = candidates[player_position[candidates] == position]
+        markets.append(listed[np.argsort(fees[listed], kind="stable")])
+    available = np.ones(len(player_rating), dtype=bool)
+    bought = np.zeros(teams, dtype=np.int64)
+    teams_range = np.arange(teams)
+    transfers: List[Tuple[int, int, int]] = []
+
+    while True:
+        choice = np.full((teams, positions), -1, dtype=np.int64)
+        score = np.full((teams, positions), -np.inf)
+        for position, listed in enumerate(markets):
+            if not len(listed):
+                continue
+            key = np.where(available[listed], player_rating[listed] + tiebreak[listed], -np.inf)
+            leader = np.maximum.accumulate(np.where(key == np.maximum.accumulate(key), np.arange(len(listed)), 0))
+            affordable = np.searchsorted(fees[listed], budgets, side="right")
+            has = affordable > 0
+            row = listed[leader[np.maximum(affordable, 1) - 1]]
+            value = player_rating[row] - means[:, position] + NEED_WEIGHT * needs[:, position]
+            # A club whose best option is its own listed player sits this position out for the round
+            ok = has & available[row] & (player_team[row] != teams_range) & (needs[:, position] >= 0) & (value > 0)
+            choice[:, position] = np.where(ok, row, -1)
+            score[:, position] = np.where(ok, value + tiebreak[row], -np.inf)
+        score[excluded | (bought >= max_per_team)] = -np.inf
+        position_choice = score.argmax(axis=1)
+        best_score = score[teams_range, position_choice]
+        best = choice[teams_range, position_choice]
+        bidders = np.flatnonzero(np.isfinite(best_score))
+        if not len(bidders):
+            break
+        # Highest bid first; np.unique keeps each contested player's first (best) bidder
+        bidders = bidders[np.argsort(-best_score[bidders], kind="stable")]
+        _, first = np.unique(best[bidders], return_index=True)
+        for buyer in bidders[np.sort(first)]:
+            row = best[buyer]
+            position, fee, seller = player_position[row], int(fees[row]), player_team[row]
+            available[row] = False
+            budgets[buyer] -= fee
+            budgets[seller] += fee
+            bought[buyer] += 1
+            means[buyer, position] = (means[buyer, position] * counts[buyer, position] + player_rating[row]) / (counts[buyer, position] + 1)
+            counts[buyer, position] += 1
+            needs[buyer, position] -= 1
+            counts[seller, position] -= 1
+            needs[seller, position] += 1
+            transfers.append((int(row), int(buyer), fee))
+    return transfers
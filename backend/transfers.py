@@ -0,0 +1,205 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from database import DatabaseManager
+from executors import run_threaded
+from models import Career, Position, TransferRequest
+
+logger = logging.getLogger(__name__)
+
+# An AI club pays at most this multiple of a player's asking price
+MAX_SELL_MULTIPLE = 2
+
+
+class TransferError(Exception):
+    """A transfer that cannot go ahead (unknown player or team, not enough budget)"""
+
+
+class TransferMarket:
+    """Market search over the roster index and atomic transfers for career mode
+
+    A transfer touches three documents: the selling team (loses the player),
+    the buying team (gains them) and the career (budget and transfer_history;
+    the career's club pays or receives through career.budget, the other club
+    through its Team.budget). On a replica set it runs in one transaction. A
+    standalone server has no transactions, so the same steps run as
+    conditional updates in an order where the only step that can fail after a
+    write (taking the player off the seller) undoes the payment before raising.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._transactions: Optional[bool] = None
+
+    @property
+    def db(self):
+        return self.db_manager.db
+
+    async def search(
+        self,
+        position: Optional[Position] = None,
+        min_rating: int = 1,
+        max_rating: int = 99,
+        min_age: int = 16,
+        max_age: int = 40,
+        min_value: int = 0,
+        max_value: Optional[int] = None,
+        exclude_team_id: Optional[str] = None,
+        sort: str = "value",
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Listings (player, current team, asking price) from the columnar roster index"""
+        index = await self.db_manager.get_roster_index()
+        filters = (position, min_rating, max_rating, min_age, max_age, min_value, max_value, exclude_team_id, sort, limit)
+        if len(index) >= self.db_manager.offload_min_players:
+            rows = await run_threaded(index.market, *filters)
+        else:
+            rows = index.market(*filters)
+        listings = []
+        for row in rows:
+            team_id, team_name = index.team_of(row)
+            player = index.to_player(row)
+            listings.append({"player": player, "team": {"id": team_id, "name": team_name}, "asking_price": self.asking_price(player.model_dump())})
+        return listings
+
+    def asking_price(self, player: dict) -> int:
+        return player.get("value") or self.db_manager.calculate_player_value(
+            player["overall_rating"], Position(player["position"]), player["age"]
+        )
+
+    async def buy(self, career_id: str, request: TransferRequest) -> Dict[str, Any]:
+        """Sign request.player_id from request.team_id for the career's club"""
+        career = await self._career(career_id)
+        return await self._transfer(career, request, seller=request.team_id, buyer=career.current_team_id, career_pays=True)
+
+    async def sell(self, career_id: str, request: TransferRequest) -> Dict[str, Any]:
+        """Sell request.player_id from the career's club to request.team_id"""
+        career = await self._career(career_id)
+        return await self._transfer(career, request, seller=career.current_team_id, buyer=request.team_id, career_pays=False)
+
+    async def _career(self, career_id: str) -> Career:
+        career = await self.db_manager.get_career(career_id)
+        if career is None:
+            raise TransferError("Career not found")
+        return career
+
+    async def _transfer(self, career: Career, request: TransferRequest, seller: str, buyer: str, career_pays: bool) -> Dict[str, Any]:
+        if seller == buyer:
+            raise TransferError("A player cannot move to the team they already play for")
+        selling = await self.db.teams.find_one({"id": seller, "players.id": request.player_id}, {"_id": 0, "players": 1})
+        if selling is None:
+            raise TransferError(f"Player {request.player_id} is not at team {seller}")
+        if await self.db.teams.count_documents({"id": buyer}, limit=1) == 0:
+            raise TransferError(f"Team {buyer} not found")
+        player = next(player for player in selling["players"] if player["id"] == request.player_id)
+        asking_price = self.asking_price(player)
+        fee = asking_price if request.fee is None else request.fee
+        # The fee comes from the client: a career cannot buy below the asking price or sell far above it
+        if career_pays and fee < asking_price:
+            raise TransferError(f"The asking price for {player['name']} is {asking_price}")
+        if not career_pays and fee > asking_price * MAX_SELL_MULTIPLE:
+            raise TransferError(f"Team {buyer} will pay at most {asking_price * MAX_SELL_MULTIPLE} for {player['name']}")
+        entry = {
+            "player_id": player["id"],
+            "player_name": player["name"],
+            "from_team_id": seller,
+            "to_team_id": buyer,
+            "fee": fee,
+            "type": "buy" if career_pays else "sell",
+            "season": career.current_season,
+            "date": datetime.utcnow(),
+        }
+
+        if await self._supports_transactions():
+            async with await self.db_manager.client.start_session() as session:
+                async with session.start_transaction():
+                    await self._apply(career.id, player, seller, buyer, fee, career_pays, entry, session)
+        else:
+            await self._apply(career.id, player, seller, buyer, fee, career_pays, entry, None)
+
+        await self.db_manager.cache.invalidate("teams")
+        self.db_manager.mark_rosters_changed([seller, buyer])
+        logger.info(f"Transfer: {player['name']} {seller} -> {buyer} for {fee} (career {career.id})")
+        return entry
+
+    async def _apply(self, career_id: str, player: dict, seller: str, buyer: str, fee: int, career_pays: bool, entry: dict, session):
+        careers, teams = self.db.careers, self.db.teams
+        # 1. The payer's budget, conditional on covering the fee
+        if career_pays:
+            paid = await careers.update_one(
+                {"id": career_id, "budget": {"$gte": fee}}, {"$inc": {"budget": -fee}}, session=session
+            )
+        else:
+            paid = await teams.update_one(
+                {"id": buyer, "budget": {"$gte": fee}}, {"$inc": {"budget": -fee}}, session=session
+            )
+        if not paid.modified_count:
+            raise TransferError("Not enough budget for this transfer")
+
+        # 2. Take the player off the seller, conditional on them still being there
+        released = await teams.update_one(
+            {"id": seller, "players.id": player["id"]}, {"$pull": {"players": {"id": player["id"]}}}, session=session
+        )
+        if not released.modified_count:
+            if session is None:
+                payer, payer_id = (careers, career_id) if career_pays else (teams, buyer)
+                await payer.update_one({"id": payer_id}, {"$inc": {"budget": fee}})
+            raise TransferError("The player has already moved")
+
+        # 3. Nothing below is conditional: the player joins the buyer and the seller is paid
+        await teams.update_one({"id": buyer}, {"$push": {"players": player}}, session=session)
+        if career_pays:
+            await teams.update_one({"id": seller}, {"$inc": {"budget": fee}}, session=session)
+            await careers.update_one({"id": career_id}, {"$push": {"transfer_history": entry}}, session=session)
+        else:
+            await careers.update_one(
+                {"id": career_id}, {"$inc": {"budget": fee}, "$push": {"transfer_history": entry}}, session=session
+            )
+
+    async def club_transfer(self, player: dict, seller: str, buyer: str, fee: int) -> bool:
+        """Move a player between two clubs outside any career (AI transfer windows)
+
+        Runs the same steps as a career transfer: the buyer pays only if its
+        budget covers the fee, and the player joins it only once they have
+        been taken off the seller. False when the player has moved or the
+        buyer cannot pay; nothing is left half-applied.
+        """
+        try:
+            if await self._supports_transactions():
+                async with await self.db_manager.client.start_session() as session:
+                    async with session.start_transaction():
+                        await self._apply_club(player, seller, buyer, fee, session)
+            else:
+                await self._apply_club(player, seller, buyer, fee, None)
+        except TransferError:
+            return False
+        return True
+
+    async def _apply_club(self, player: dict, seller: str, buyer: str, fee: int, session):
+        teams = self.db.teams
+        paid = await teams.update_one(
+            {"id": buyer, "budget": {"$gte": fee}, "players.id": {"$ne": player["id"]}}, {"$inc": {"budget": -fee}}, session=session
+        )
+        if not paid.modified_count:
+            raise TransferError("Not enough budget for this transfer")
+        released = await teams.update_one(
+            {"id": seller, "players.id": player["id"]}, {"$pull": {"players": {"id": player["id"]}}, "$inc": {"budget": fee}}, session=session
+        )
+        if not released.modified_count:
+            if session is None:
+                await teams.update_one({"id": buyer}, {"$inc": {"budget": fee}})
+            raise TransferError("The player has already moved")
+        await teams.update_one({"id": buyer}, {"$push": {"players": player}}, session=session)
+
+    async def _supports_transactions(self) -> bool:
+        """Transactions need a replica set or mongos; checked once per process"""
+        if self._transactions is None:
+            try:
+                hello = await self.db_manager.client.admin.command("hello")
+                self._transactions = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+            except Exception:
+                self._transactions = False
+            if not self._transactions:
+                logger.info("MongoDB has no transactions here; transfers use conditional updates")
+        return self._transactions
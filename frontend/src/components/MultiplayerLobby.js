@@ -35,11 +35,10 @@ const MultiplayerLobby = ({ userId }) => {
 
   const fetchActiveMatches = async () => {
     try {
-      const response = await axios.get(`${API}/users/${userId}/matches`);
-      const onlineMatches = response.data.filter(match => 
-        match.game_mode === 'online' && !match.completed
-      );
-      setActiveMatches(onlineMatches);
+      const response = await axios.get(`${API}/users/${userId}/matches`, {
+        params: { game_mode: 'online', completed: false }
+      });
+      setActiveMatches(response.data);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching active matches:', error);